@@ -19,6 +19,10 @@ def create_app(config_name=None):
     from app.config import config
     app.config.from_object(config[config_name])
     
+    # Use the fast JSON provider for jsonify and request parsing
+    from app.utils.json_provider import FastJSONProvider
+    app.json = FastJSONProvider(app)
+    
     # Initialize extensions
     from app.extensions import db, migrate, login_manager, mail, jwt, socketio, cors
     
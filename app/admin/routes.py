@@ -2,9 +2,10 @@ from flask import render_template
 from flask_login import login_required
 from app.admin import admin_bp
 from app.utils.utils import roles_required
+from app.admin.warehouse import dashboard_data
 
 @admin_bp.route('/dashboard')
 @roles_required('admin')
 @login_required
 def dashboard():
-    return render_template('admin/dashboard.html')
+    return render_template('admin/dashboard.html', **dashboard_data())
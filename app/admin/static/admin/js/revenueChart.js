@@ -14,14 +14,10 @@ let revenueChart = null;
 let isChartInitialized = false;
 
 function updateRevenueChart() {
-    const monthlyRevenue = [
-        { month: 'May', revenue: 45000 },
-        { month: 'Jun', revenue: 52000 },
-        { month: 'Jul', revenue: 48000 },
-        { month: 'Aug', revenue: 61000 },
-        { month: 'Sep', revenue: 55000 },
-        { month: 'Oct', revenue: 67000 }
-    ];
+    // Monthly revenue from the analytics warehouse, rendered by the dashboard
+    const canvas = document.getElementById('safari-revenue-chart');
+    if (!canvas) return;
+    const monthlyRevenue = JSON.parse(canvas.dataset.trend || '[]');
 
     // Clear and repopulate data
     revenueData.labels = [];
@@ -0,0 +1,407 @@
+"""
+Analytics warehouse ETL and admin dashboard queries
+
+The `etl-warehouse` command copies trips, vendors, participants, payments
+and bookings into the star schema in app/models/warehouse.py. Each source
+is read in keyset batches of rows whose updated_at is past the source's
+watermark (less WAREHOUSE_ETL_OVERLAP seconds), upserted by source id, and
+committed together with the advanced watermark, so an interrupted run
+resumes where it stopped. The daily trip facts of every trip whose
+participant or payment facts changed since the daily watermark are then
+rebuilt from the fact tables.
+
+Deleted source rows are not seen by an incremental run; `--full` reloads
+everything.
+
+The admin dashboard reads only from these tables.
+"""
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+from flask import current_app
+from sqlalchemy import and_, or_, case, delete, extract, func, insert
+
+from app.extensions import db
+from app.models.trip import Trip
+from app.models.vendor import Vendor
+from app.models.participant import Participant
+from app.models.payment import Payment
+from app.models.booking import Booking
+from app.models.warehouse import (
+    EtlWatermark, TripDimension, VendorDimension, ParticipantFact, PaymentFact, BookingFact, TripDailyFact
+)
+
+# A source table: its model, the warehouse table it loads, the projected
+# columns read, and how a projected row becomes a warehouse row
+WarehouseSource = namedtuple('WarehouseSource', 'name model target columns to_row')
+
+ACTIVE_TRIP_STATUSES = ('active', 'full', 'in_progress')
+ACTIVE_BOOKING_STATUSES = ('pending', 'confirmed', 'in_progress')
+
+
+def _day(value):
+    return value.date() if value else None
+
+
+def _trip_row(row):
+    return {
+        'trip_id': row.id,
+        'title': row.title,
+        'destination': row.destination,
+        'category': row.category,
+        'organizer_id': row.organizer_id,
+        'status': row.status,
+        'start_date': row.start_date,
+        'end_date': row.end_date,
+        'price_per_student': row.price_per_student,
+        'max_participants': row.max_participants,
+        'source_updated_at': row.updated_at,
+    }
+
+
+def _vendor_row(row):
+    return {
+        'vendor_id': row.id,
+        'business_name': row.business_name,
+        'business_type': row.business_type,
+        'city': row.city,
+        'contact_phone': row.contact_phone,
+        'is_verified': bool(row.is_verified),
+        'is_active': bool(row.is_active),
+        'average_rating': row.average_rating or 0.0,
+        'source_updated_at': row.updated_at,
+    }
+
+
+def _participant_row(row):
+    return {
+        'participant_id': row.id,
+        'trip_id': row.trip_id,
+        'registration_date': _day(row.registration_date),
+        'status': row.status,
+        'payment_status': row.payment_status,
+        'amount_paid': row.amount_paid or 0,
+        'source_updated_at': row.updated_at,
+    }
+
+
+def _payment_row(row):
+    return {
+        'payment_id': row.id,
+        'trip_id': row.trip_id,
+        'participant_id': row.participant_id,
+        'booking_id': row.booking_id,
+        'payment_date': _day(row.payment_date),
+        'amount': row.amount,
+        'currency': row.currency,
+        'status': row.status,
+        'payment_method': row.payment_method,
+        'payer_name': row.payer_name,
+        'source_updated_at': row.updated_at,
+    }
+
+
+def _booking_row(row):
+    return {
+        'booking_id': row.id,
+        'vendor_id': row.vendor_id,
+        'trip_id': row.trip_id,
+        'booking_type': row.booking_type,
+        'status': row.status,
+        'booking_date': _day(row.booking_date),
+        'completed_date': _day(row.completed_date),
+        'amount': row.amount,
+        'rating': row.rating,
+        'source_updated_at': row.updated_at,
+    }
+
+
+SOURCES = (
+    WarehouseSource('trips', Trip, TripDimension, (
+        Trip.id, Trip.updated_at, Trip.title, Trip.destination, Trip.category, Trip.organizer_id,
+        Trip.status, Trip.start_date, Trip.end_date, Trip.price_per_student, Trip.max_participants
+    ), _trip_row),
+    WarehouseSource('vendors', Vendor, VendorDimension, (
+        Vendor.id, Vendor.updated_at, Vendor.business_name, Vendor.business_type, Vendor.city,
+        Vendor.contact_phone, Vendor.is_verified, Vendor.is_active, Vendor.average_rating
+    ), _vendor_row),
+    WarehouseSource('participants', Participant, ParticipantFact, (
+        Participant.id, Participant.updated_at, Participant.trip_id, Participant.registration_date,
+        Participant.status, Participant.payment_status, Participant.amount_paid
+    ), _participant_row),
+    WarehouseSource('payments', Payment, PaymentFact, (
+        Payment.id, Payment.updated_at, Payment.trip_id, Payment.participant_id, Payment.booking_id,
+        Payment.payment_date, Payment.amount, Payment.currency, Payment.status, Payment.payment_method,
+        Payment.payer_name
+    ), _payment_row),
+    WarehouseSource('bookings', Booking, BookingFact, (
+        Booking.id, Booking.updated_at, Booking.vendor_id, Booking.trip_id, Booking.booking_type,
+        Booking.status, Booking.booking_date, Booking.completed_date,
+        func.coalesce(Booking.final_amount, Booking.quoted_amount, 0).label('amount'), Booking.rating
+    ), _booking_row),
+)
+
+# Name of the daily trip facts' watermark over the participant and payment facts
+TRIP_DAILY_WATERMARK = 'trip_daily'
+
+
+def _primary_key(table):
+    return table.__table__.primary_key.columns.values()[0]
+
+
+def _watermark(name):
+    """A watermark row and the updated_at to read from (None for everything)"""
+    watermark = db.session.get(EtlWatermark, name) or EtlWatermark(source=name, rows_loaded=0)
+    db.session.add(watermark)
+    if watermark.high_water is None:
+        return watermark, None
+    return watermark, watermark.high_water - timedelta(seconds=current_app.config['WAREHOUSE_ETL_OVERLAP'])
+
+
+def load_source(source, batch_size):
+    """Upsert a source's rows changed since its watermark, returning how many were loaded"""
+    watermark, since = _watermark(source.name)
+
+    model = source.model
+    query = db.session.query(*source.columns).order_by(model.updated_at, model.id)
+    if since is not None:
+        query = query.filter(model.updated_at >= since)
+
+    key = _primary_key(source.target)
+    loaded, last = 0, None
+    while True:
+        batch = query
+        if last is not None:
+            batch = batch.filter(or_(
+                model.updated_at > last.updated_at,
+                and_(model.updated_at == last.updated_at, model.id > last.id)
+            ))
+        rows = batch.limit(batch_size).all()
+        if not rows:
+            break
+
+        values = [source.to_row(row) for row in rows]
+        db.session.execute(delete(source.target).where(key.in_([row.id for row in rows])))
+        db.session.execute(insert(source.target), values)
+
+        last = rows[-1]
+        loaded += len(rows)
+        watermark.high_water = max(watermark.high_water or last.updated_at, last.updated_at)
+        watermark.rows_loaded += len(rows)
+        watermark.run_at = datetime.now()
+        db.session.commit()
+
+    if not loaded:
+        watermark.run_at = datetime.now()
+        db.session.commit()
+    return loaded
+
+
+def rebuild_trip_daily(trip_ids, batch_size=500):
+    """Replace the daily facts of the given trips from the participant and payment facts"""
+    trip_ids = sorted(trip_ids)
+    for start in range(0, len(trip_ids), batch_size):
+        chunk = trip_ids[start:start + batch_size]
+        days = {}
+
+        registrations = db.session.query(
+            ParticipantFact.trip_id, ParticipantFact.registration_date, func.count(ParticipantFact.participant_id)
+        ).filter(
+            ParticipantFact.trip_id.in_(chunk),
+            ParticipantFact.registration_date.isnot(None)
+        ).group_by(ParticipantFact.trip_id, ParticipantFact.registration_date)
+        for trip_id, day, count in registrations:
+            days.setdefault((trip_id, day), {'registrations': 0, 'payments': 0, 'revenue': 0})['registrations'] = count
+
+        payments = db.session.query(
+            PaymentFact.trip_id, PaymentFact.payment_date, func.count(PaymentFact.payment_id), func.sum(PaymentFact.amount)
+        ).filter(
+            PaymentFact.trip_id.in_(chunk),
+            PaymentFact.payment_date.isnot(None),
+            PaymentFact.status == 'completed'
+        ).group_by(PaymentFact.trip_id, PaymentFact.payment_date)
+        for trip_id, day, count, revenue in payments:
+            totals = days.setdefault((trip_id, day), {'registrations': 0, 'payments': 0, 'revenue': 0})
+            totals['payments'], totals['revenue'] = count, revenue or 0
+
+        db.session.execute(delete(TripDailyFact).where(TripDailyFact.trip_id.in_(chunk)))
+        if days:
+            db.session.execute(insert(TripDailyFact), [
+                {'trip_id': trip_id, 'day': day, **totals}
+                for (trip_id, day), totals in days.items()
+            ])
+        db.session.commit()
+
+
+def refresh_trip_daily():
+    """
+    Rebuild the daily facts of trips whose participant or payment facts
+    changed since the daily watermark, returning how many trips were rebuilt
+    """
+    watermark, since = _watermark(TRIP_DAILY_WATERMARK)
+
+    updated = {}
+    for fact in (ParticipantFact, PaymentFact):
+        query = db.session.query(fact.trip_id, func.max(fact.source_updated_at)).filter(fact.trip_id.isnot(None))
+        if since is not None:
+            query = query.filter(fact.source_updated_at >= since)
+        for trip_id, source_updated_at in query.group_by(fact.trip_id):
+            updated[trip_id] = max(updated.get(trip_id, source_updated_at), source_updated_at)
+
+    rebuild_trip_daily(updated)
+    if updated:
+        watermark.high_water = max(filter(None, [watermark.high_water, *updated.values()]))
+        watermark.rows_loaded += len(updated)
+    watermark.run_at = datetime.now()
+    db.session.commit()
+    return len(updated)
+
+
+def run_etl(full=False, batch_size=1000):
+    """
+    Load every source into the warehouse, then rebuild the affected daily facts
+    With full, the warehouse is emptied and reloaded from scratch.
+    Returns a dict of source name -> rows loaded.
+    """
+    if full:
+        for table in (TripDailyFact, BookingFact, PaymentFact, ParticipantFact, VendorDimension, TripDimension,
+                      EtlWatermark):
+            db.session.execute(delete(table))
+        db.session.commit()
+
+    loaded = {source.name: load_source(source, batch_size) for source in SOURCES}
+    loaded[TRIP_DAILY_WATERMARK] = refresh_trip_daily()
+    return loaded
+
+
+def _month_starts(today, count):
+    """First days of the last count months, oldest first"""
+    year, month = today.year, today.month
+    starts = []
+    for _ in range(count):
+        starts.append(date(year, month, 1))
+        year, month = (year - 1, 12) if month == 1 else (year, month - 1)
+    return starts[::-1]
+
+
+def _by_month(query, month_column, *measures):
+    """Run a grouped query, returning {first day of month: measures}"""
+    year, month = extract('year', month_column), extract('month', month_column)
+    return {
+        date(int(row_year), int(row_month), 1): tuple(values)
+        for row_year, row_month, *values in db.session.query(year, month, *measures)
+        .select_from(query).group_by(year, month)
+    }
+
+
+def dashboard_data(today=None):
+    """Everything the admin dashboard shows, from the warehouse tables only"""
+    today = today or date.today()
+    rows = current_app.config.get('WAREHOUSE_DASHBOARD_ROWS', 20)
+
+    # Trip status counts
+    status_counts = dict(
+        db.session.query(TripDimension.status, func.count(TripDimension.trip_id))
+        .group_by(TripDimension.status)
+        .all()
+    )
+    finished = status_counts.get('completed', 0) + status_counts.get('cancelled', 0)
+
+    # Revenue for the last 30 days and the 30 before
+    recent, previous = db.session.query(
+        func.sum(case((TripDailyFact.day > today - timedelta(days=30), TripDailyFact.revenue), else_=0)),
+        func.sum(case((TripDailyFact.day <= today - timedelta(days=30), TripDailyFact.revenue), else_=0))
+    ).filter(TripDailyFact.day > today - timedelta(days=60)).one()
+    recent, previous = float(recent or 0), float(previous or 0)
+
+    # Participants and balances on trips that have not finished
+    active_participants, owed, paid = db.session.query(
+        func.count(ParticipantFact.participant_id),
+        func.sum(TripDimension.price_per_student),
+        func.sum(ParticipantFact.amount_paid)
+    ).join(TripDimension, TripDimension.trip_id == ParticipantFact.trip_id).filter(
+        TripDimension.status.in_(ACTIVE_TRIP_STATUSES),
+        ParticipantFact.status.in_(('registered', 'confirmed'))
+    ).one()
+
+    pending_bookings = db.session.query(func.count(BookingFact.booking_id)).filter(
+        BookingFact.status == 'pending'
+    ).scalar()
+
+    # Monthly performance over the last six months
+    months = _month_starts(today, 6)
+    daily = db.session.query(
+        TripDailyFact.day.label('month_day'), TripDailyFact.revenue, TripDailyFact.registrations
+    ).filter(TripDailyFact.day >= months[0]).subquery()
+    monthly_revenue = _by_month(daily, daily.c.month_day, func.sum(daily.c.revenue), func.sum(daily.c.registrations))
+
+    started = db.session.query(TripDimension.start_date.label('month_day')).filter(
+        TripDimension.start_date >= months[0], TripDimension.start_date <= today
+    ).subquery()
+    monthly_trips = _by_month(started, started.c.month_day, func.count())
+
+    rated = db.session.query(BookingFact.completed_date.label('month_day'), BookingFact.rating).filter(
+        BookingFact.completed_date >= months[0], BookingFact.rating.isnot(None)
+    ).subquery()
+    monthly_ratings = _by_month(rated, rated.c.month_day, func.avg(rated.c.rating))
+
+    monthly = [
+        {
+            'month': month,
+            'revenue': float(monthly_revenue.get(month, (0, 0))[0] or 0),
+            'participants': int(monthly_revenue.get(month, (0, 0))[1] or 0),
+            'trips': monthly_trips.get(month, (0,))[0],
+            'rating': float(monthly_ratings[month][0]) if month in monthly_ratings else None,
+        }
+        for month in months
+    ]
+
+    # Latest trips, with their confirmed participants and collected payments
+    trips = TripDimension.query.order_by(
+        TripDimension.start_date.desc(), TripDimension.trip_id.desc()
+    ).limit(rows).all()
+    trip_totals = {}
+    if trips:
+        trip_totals = {
+            trip_id: (int(confirmed or 0), float(collected or 0))
+            for trip_id, confirmed, collected in db.session.query(
+                ParticipantFact.trip_id,
+                func.sum(case((ParticipantFact.status == 'confirmed', 1), else_=0)),
+                func.sum(ParticipantFact.amount_paid)
+            ).filter(
+                ParticipantFact.trip_id.in_([trip.trip_id for trip in trips])
+            ).group_by(ParticipantFact.trip_id)
+        }
+
+    # Top-rated active vendors, with their open bookings
+    vendors = VendorDimension.query.filter(VendorDimension.is_active == True).order_by(
+        VendorDimension.average_rating.desc(), VendorDimension.vendor_id
+    ).limit(rows).all()
+    vendor_bookings = {}
+    if vendors:
+        vendor_bookings = dict(
+            db.session.query(BookingFact.vendor_id, func.count(BookingFact.booking_id)).filter(
+                BookingFact.vendor_id.in_([vendor.vendor_id for vendor in vendors]),
+                BookingFact.status.in_(ACTIVE_BOOKING_STATUSES)
+            ).group_by(BookingFact.vendor_id).all()
+        )
+
+    payments = PaymentFact.query.order_by(
+        PaymentFact.payment_date.desc(), PaymentFact.payment_id.desc()
+    ).limit(rows).all()
+
+    return {
+        'refreshed_at': db.session.query(func.min(EtlWatermark.run_at)).scalar(),
+        'active_trips': status_counts.get('active', 0) + status_counts.get('full', 0),
+        'in_progress_trips': status_counts.get('in_progress', 0),
+        'pending_bookings': pending_bookings or 0,
+        'revenue_30d': recent,
+        'revenue_change': round((recent - previous) / previous * 100) if previous else None,
+        'active_participants': active_participants or 0,
+        'outstanding_balance': max(0.0, float(owed or 0) - float(paid or 0)),
+        'completion_rate': round(status_counts.get('completed', 0) / finished * 100) if finished else None,
+        'monthly': monthly,
+        'revenue_trend': [{'month': row['month'].strftime('%b'), 'revenue': row['revenue']} for row in monthly],
+        'trips': [(trip, *trip_totals.get(trip.trip_id, (0, 0.0))) for trip in trips],
+        'vendors': [(vendor, vendor_bookings.get(vendor.vendor_id, 0)) for vendor in vendors],
+        'payments': payments,
+    }
@@ -3,5 +3,5 @@ from flask import Blueprint
 api_bp = Blueprint('api', __name__)
 
 from app.api import routes
-from app.api.main import trip_details, dash, trips
+from app.api.main import trip_details, dash, trips, jobs
 
@@ -67,7 +67,7 @@ def get_featured_trips():
         
         # Serialize trips with additional computed fields
         trips_data = []
-        for trip in featured_trips:
+        for trip in Trip.preload_for_serialization(featured_trips):
             trip_dict = trip.serialize()
             
             # Add additional fields for frontend
@@ -0,0 +1,94 @@
+import os
+from flask import jsonify, request, send_file
+from flask_login import login_required, current_user
+from app.models.job import Job
+from app.models.trip import Trip
+from app.extensions import db
+from app.api import api_bp as jobs_api
+from app.jobs import enqueue_job
+from app.trips.paperwork import check_pack_format, PackUnavailable
+
+# Job types that can be started from the API (imports start from an upload)
+EXPORT_JOB_TYPES = ('participant_export', 'trip_paperwork')
+
+
+def _get_own_job(job_id):
+    """Job visible to the current user, or None"""
+    job = db.session.get(Job, job_id)
+    if job is None or (job.user_id != current_user.id and not current_user.is_admin()):
+        return None
+    return job
+
+
+@jobs_api.route('/jobs', methods=['GET'])
+@login_required
+def list_jobs():
+    """Current user's most recent jobs"""
+    jobs = Job.query.filter_by(user_id=current_user.id).order_by(
+        Job.created_at.desc(), Job.id.desc()
+    ).limit(20).all()
+    return jsonify({
+        'success': True,
+        'jobs': [job.serialize() for job in jobs]
+    }), 200
+
+
+@jobs_api.route('/jobs', methods=['POST'])
+@login_required
+def create_job():
+    """
+    Start an export job
+    JSON body:
+    - job_type: one of EXPORT_JOB_TYPES
+    - trip_id: trip to export
+    - format: for trip_paperwork, 'zip' (default) or 'pdf'
+    """
+    data = request.get_json(silent=True) or {}
+    job_type = data.get('job_type')
+    if job_type not in EXPORT_JOB_TYPES:
+        return jsonify({'success': False, 'error': 'Unsupported job type'}), 400
+
+    trip = db.session.get(Trip, data.get('trip_id') or 0)
+    if trip is None:
+        return jsonify({'success': False, 'error': 'Trip not found'}), 404
+    if not current_user.is_admin() and trip.organizer_id != current_user.id:
+        return jsonify({'success': False, 'error': 'Permission denied'}), 403
+
+    params = None
+    if job_type == 'trip_paperwork':
+        params = {'format': data.get('format') or 'zip'}
+        try:
+            check_pack_format(params['format'])
+        except PackUnavailable as e:
+            return jsonify({'success': False, 'error': str(e)}), 400
+
+    job = enqueue_job(job_type, current_user.id, trip_id=trip.id, params=params)
+    return jsonify({'success': True, 'job': job.serialize()}), 202
+
+
+@jobs_api.route('/jobs/<int:job_id>', methods=['GET'])
+@login_required
+def get_job(job_id):
+    """Job state and progress"""
+    job = _get_own_job(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify({'success': True, 'job': job.serialize()}), 200
+
+
+@jobs_api.route('/jobs/<int:job_id>/download', methods=['GET'])
+@login_required
+def download_job_result(job_id):
+    """Download a finished job's export file or error report"""
+    job = _get_own_job(job_id)
+    if job is None:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    if not job.is_finished or not job.result_path or not os.path.exists(job.result_path):
+        return jsonify({'success': False, 'error': 'No result available for this job'}), 404
+
+    # Content type follows the result (CSV, ZIP or PDF)
+    return send_file(
+        job.result_path,
+        as_attachment=True,
+        download_name=job.result_filename or os.path.basename(job.result_path)
+    )
@@ -1,7 +1,10 @@
 from flask import Blueprint, jsonify, request
-from sqlalchemy.orm import joinedload
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload, load_only
 from app.models.trip import Trip
 from app.models.user import User
+from app.models.participant import Participant
+from app.models.location import Location
 from app.extensions import db
 from datetime import date
 from app.api import api_bp as trip_api
@@ -16,12 +19,9 @@ def get_trip_details(trip_id):
     Returns comprehensive trip data including organizer info, participants, and statistics
     """
     try:
-        # Fetch trip with eager loading for related data
-        trip = Trip.query.options(
-            joinedload(Trip.organizer),
-            joinedload(Trip.participants),
-            joinedload(Trip.locations)
-        ).get(trip_id)
+        # Fetch trip with its organizer; participants and locations are
+        # aggregated/projected below instead of loaded as full rows
+        trip = Trip.query.options(joinedload(Trip.organizer)).get(trip_id)
         
         if not trip:
             return jsonify({
@@ -29,6 +29,10 @@ def get_trip_details(trip_id):
                 'error': 'Trip not found'
             }), 404
         
+        breakdown = Participant.status_breakdown(trip.id)
+        trip._confirmed_count = breakdown['confirmed']
+        waypoints = Location.get_waypoints_for_trip(trip.id)
+        
         # Build comprehensive response
         trip_data = {
             'success': True,
@@ -82,15 +86,18 @@ def get_trip_details(trip_id):
                     'profile_picture': trip.organizer.profile_picture
                 } if trip.organizer else None,
                 
-                # Locations
+                # Named waypoints only, not raw GPS fixes
                 'locations': [
                     {
                         'id': loc.id,
-                        'name': loc.name if hasattr(loc, 'name') else None,
-                        'address': loc.address if hasattr(loc, 'address') else None,
-                        'type': loc.type if hasattr(loc, 'type') else None
-                    } for loc in trip.locations
-                ] if trip.locations else [],
+                        'name': loc.name,
+                        'address': loc.address,
+                        'type': loc.location_type,
+                        'latitude': loc.latitude,
+                        'longitude': loc.longitude,
+                        'timestamp': loc.timestamp.isoformat() if loc.timestamp else None
+                    } for loc in waypoints
+                ],
                 
                 # Timestamps
                 'created_at': trip.created_at.isoformat() if trip.created_at else None,
@@ -98,26 +105,16 @@ def get_trip_details(trip_id):
             }
         }
         
-        # Add participant statistics
-        # confirmed_participants = trip.participants.filter_by(status='confirmed').all()
-        # trip_data['trip']['participant_breakdown'] = {
-        #     'confirmed': len(confirmed_participants),
-        #     'pending': trip.participants.filter_by(status='pending').count(),
-        #     'cancelled': trip.participants.filter_by(status='cancelled').count()
-        # }
-        confirmed_participants = [p for p in trip.participants if p.status == 'confirmed']
-        pending_participants = [p for p in trip.participants if p.status == 'pending']
-        cancelled_participants = [p for p in trip.participants if p.status == 'cancelled']
-
+        # Add participant statistics (registered participants are pending confirmation)
         trip_data['trip']['participant_breakdown'] = {
-            'confirmed': len(confirmed_participants),
-            'pending': len(pending_participants),
-            'cancelled': len(cancelled_participants)
+            'confirmed': breakdown['confirmed'],
+            'pending': breakdown['registered'],
+            'cancelled': breakdown['cancelled'],
+            'completed': breakdown['completed']
         }
         
         # Add booking statistics if available
-        confirmed_bookings = trip.get_confirmed_vendor_bookings()
-        trip_data['trip']['vendor_bookings'] = len(confirmed_bookings)
+        trip_data['trip']['vendor_bookings'] = trip.bookings.filter_by(status='confirmed').count()
         
         return jsonify(trip_data), 200
         
@@ -135,14 +132,29 @@ def get_trip_summary(trip_id):
     Useful for cards, lists, and quick previews
     """
     try:
-        trip = Trip.query.get(trip_id)
+        # Load only the summary columns plus the confirmed count in one query
+        confirmed_count = db.select(func.count(Participant.id)).where(
+            Participant.trip_id == Trip.id,
+            Participant.status == 'confirmed'
+        ).correlate(Trip).scalar_subquery()
         
-        if not trip:
+        row = db.session.query(Trip, confirmed_count).options(
+            load_only(
+                Trip.title, Trip.destination, Trip.category, Trip.start_date,
+                Trip.end_date, Trip.registration_deadline, Trip.max_participants,
+                Trip.price_per_student, Trip.status
+            )
+        ).filter(Trip.id == trip_id).first()
+        
+        if not row:
             return jsonify({
                 'success': False,
                 'error': 'Trip not found'
             }), 404
         
+        trip = row[0]
+        trip._confirmed_count = row[1]
+        
         summary = {
             'success': True,
             'trip': {
@@ -2,8 +2,13 @@ from flask import Blueprint, jsonify, request
 from sqlalchemy import or_, and_, func
 from datetime import datetime, date
 from app.models.trip import Trip
+from app.models.participant import Participant
 from app.extensions import db
-from app.api.main.utils import get_trip_image_url
+from app.api.main.utils import (
+    get_trip_image_url, expand_category, duration_in_range,
+    DURATION_RANGES, DURATION_BUCKETS
+)
+from app.utils.pagination import keyset_paginate, InvalidCursor
 from app.api import api_bp as trips_api
 
 
@@ -19,152 +24,319 @@ def get_trips():
     - max_price: maximum price filter
     - grade_level: filter by grade level
     - status: filter by status (default: active)
-    - sort_by: sorting option (popular, price-low, price-high, duration, rating)
+    - sort_by: sorting option (popular, price-low, price-high, duration, date, rating, newest)
     - page: page number (default: 1)
-    - per_page: items per page (default: 12)
+    - per_page: items per page (default: 12, 1-100)
+    - cursor: switch to keyset pagination; empty for the first page, then
+      the previous response's next_cursor
+    - include_total: with cursor, also return the total count (default: false)
+    - include_facets: also return sidebar facet counts (default: false)
     """
     try:
         # Get query parameters
-        search = request.args.get('search', '').strip()
-        category = request.args.get('category', '').strip()
-        duration = request.args.get('duration', '').strip()
-        min_price = request.args.get('min_price', type=float)
-        max_price = request.args.get('max_price', type=float)
-        grade_level = request.args.get('grade_level', '').strip()
-        status = request.args.get('status', 'active')
+        filters = parse_trip_filters(request.args)
         sort_by = request.args.get('sort_by', 'popular')
         page = request.args.get('page', 1, type=int)
-        per_page = request.args.get('per_page', 12, type=int)
+        per_page = max(1, min(request.args.get('per_page', 12, type=int), 100))
+        include_facets = request.args.get('include_facets', 'false').lower() == 'true'
         
         # Start with base query
-        query = Trip.query
+        query = apply_trip_filters(Trip.query, filters)
         
-        # Apply status filter (default to active trips)
-        if status:
-            query = query.filter(Trip.status == status)
+        sort_keys = trip_sort_keys(sort_by)
         
-        # Apply search filter
-        if search:
-            search_pattern = f'%{search}%'
-            query = query.filter(
-                or_(
-                    Trip.title.ilike(search_pattern),
-                    Trip.description.ilike(search_pattern),
-                    Trip.destination.ilike(search_pattern),
-                    Trip.category.ilike(search_pattern)
-                )
+        if 'cursor' in request.args:
+            # Keyset pagination: constant cost per page, total on request
+            pagination = keyset_paginate(
+                query,
+                sort_by,
+                sort_keys,
+                cursor=request.args.get('cursor') or None,
+                per_page=per_page,
+                with_total=request.args.get('include_total', 'false').lower() == 'true'
             )
-        
-        # Apply category filter
-        if category and category != 'all':
-            # Map frontend categories to database categories
-            category_map = {
-                'science': ['science', 'nature', 'wildlife', 'marine'],
-                'history': ['history', 'cultural', 'heritage'],
-                'art': ['art', 'museums', 'cultural'],
-                'adventure': ['adventure', 'sports', 'outdoor'],
-                'technology': ['technology', 'innovation', 'stem']
-            }
+            pagination_data = pagination.serialize()
+        else:
+            # Apply sorting
+            query = query.order_by(*[
+                key.desc() if direction == 'desc' else key.asc()
+                for key, direction in sort_keys
+            ])
             
-            if category in category_map:
-                categories = category_map[category]
-                query = query.filter(Trip.category.in_(categories))
-            else:
-                query = query.filter(Trip.category == category)
-        
-        # Apply duration filter
-        if duration and duration != 'all':
-            today = date.today()
-            if duration == 'half':
-                # Half day trips (duration_days == 0 or 1)
-                query = query.filter(
-                    func.datediff(Trip.end_date, Trip.start_date) <= 0
-                )
-            elif duration == 'full':
-                # Full day trips (duration_days == 1)
-                query = query.filter(
-                    func.datediff(Trip.end_date, Trip.start_date) == 0
-                )
-            elif duration == 'multi':
-                # Multi-day trips (2-6 days)
-                query = query.filter(
-                    and_(
-                        func.datediff(Trip.end_date, Trip.start_date) >= 1,
-                        func.datediff(Trip.end_date, Trip.start_date) <= 5
-                    )
-                )
-            elif duration == 'week':
-                # Week long trips (7+ days)
-                query = query.filter(
-                    func.datediff(Trip.end_date, Trip.start_date) >= 6
-                )
-        
-        # Apply price filters
-        if min_price is not None:
-            query = query.filter(Trip.price_per_student >= min_price)
-        if max_price is not None:
-            query = query.filter(Trip.price_per_student <= max_price)
-        
-        # Apply grade level filter
-        if grade_level and grade_level != 'all':
-            query = query.filter(Trip.grade_level == grade_level)
-        
-        # Apply sorting
-        if sort_by == 'popular':
-            # Sort by featured first, then by number of participants
-            query = query.outerjoin(Trip.participants).group_by(Trip.id)\
-                .order_by(Trip.featured.desc(), func.count(Trip.participants).desc())
-        elif sort_by == 'price-low':
-            query = query.order_by(Trip.price_per_student.asc())
-        elif sort_by == 'price-high':
-            query = query.order_by(Trip.price_per_student.desc())
-        elif sort_by == 'duration':
-            query = query.order_by(
-                func.datediff(Trip.end_date, Trip.start_date).asc()
+            # Paginate results
+            pagination = query.paginate(
+                page=page, 
+                per_page=per_page, 
+                error_out=False
             )
-        elif sort_by == 'rating':
-            # If you have ratings, implement here. For now, sort by featured
-            query = query.order_by(Trip.featured.desc())
-        else:
-            # Default sorting
-            query = query.order_by(Trip.created_at.desc())
-        
-        # Paginate results
-        pagination = query.paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
+            pagination_data = {
+                'total': pagination.total,
+                'pages': pagination.pages,
+                'current_page': pagination.page,
+                'per_page': pagination.per_page,
+                'has_next': pagination.has_next,
+                'has_prev': pagination.has_prev
+            }
         
-        # Serialize trips
+        # Serialize trips (organizers and participant counts batch-loaded)
         trips = []
-        for trip in pagination.items:
+        for trip in Trip.preload_for_serialization(pagination.items):
             trip_data = trip.serialize()
             # Add additional computed fields
             trip_data['rating'] = 4.8  # Replace with actual rating calculation
             trip_data['image_url'] = get_trip_image_url(trip)
             trips.append(trip_data)
         
-        return jsonify({
+        response = {
             'success': True,
             'trips': trips,
-            'pagination': {
-                'total': pagination.total,
-                'pages': pagination.pages,
-                'current_page': pagination.page,
-                'per_page': pagination.per_page,
-                'has_next': pagination.has_next,
-                'has_prev': pagination.has_prev
-            },
+            'pagination': pagination_data,
             'filters': {
-                'search': search,
-                'category': category,
-                'duration': duration,
-                'min_price': min_price,
-                'max_price': max_price,
-                'grade_level': grade_level,
+                'search': filters['search'],
+                'category': filters['category'],
+                'duration': filters['duration'],
+                'min_price': filters['min_price'],
+                'max_price': filters['max_price'],
+                'grade_level': filters['grade_level'],
                 'sort_by': sort_by
             }
+        }
+        
+        # Sidebar counts in the same round trip as the results
+        if include_facets:
+            response['facets'] = compute_trip_facets(filters)
+        
+        return jsonify(response), 200
+        
+    except InvalidCursor as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 500
+
+
+def trip_sort_keys(sort_by):
+    """
+    Get the (expression, direction) sort keys for a catalog sort option
+    Every order ends on Trip.id so keys are unique for keyset pagination.
+    """
+    if sort_by == 'popular':
+        # Featured first, then by number of participants
+        participant_count = db.select(func.count(Participant.id)).where(
+            Participant.trip_id == Trip.id
+        ).correlate(Trip).scalar_subquery()
+        return [(Trip.featured, 'desc'), (participant_count, 'desc'), (Trip.id, 'desc')]
+    elif sort_by == 'price-low':
+        return [(Trip.price_per_student, 'asc'), (Trip.id, 'asc')]
+    elif sort_by == 'price-high':
+        return [(Trip.price_per_student, 'desc'), (Trip.id, 'desc')]
+    elif sort_by == 'duration':
+        return [(func.datediff(Trip.end_date, Trip.start_date), 'asc'), (Trip.id, 'asc')]
+    elif sort_by == 'date':
+        return [(Trip.start_date, 'asc'), (Trip.id, 'asc')]
+    elif sort_by == 'rating':
+        # If you have ratings, implement here. For now, sort by featured
+        return [(Trip.featured, 'desc'), (Trip.id, 'desc')]
+    # Default sorting
+    return [(Trip.created_at, 'desc'), (Trip.id, 'desc')]
+
+
+def parse_trip_filters(args):
+    """Read the catalog filter query params shared by /trips and /trips/facets"""
+    return {
+        'search': args.get('search', '').strip(),
+        'category': args.get('category', '').strip(),
+        'duration': args.get('duration', '').strip(),
+        'min_price': args.get('min_price', type=float),
+        'max_price': args.get('max_price', type=float),
+        'grade_level': args.get('grade_level', '').strip(),
+        'status': args.get('status', 'active')
+    }
+
+
+def apply_trip_filters(query, filters, exclude=()):
+    """
+    Apply catalog filters to a trip query
+    Facet filters named in `exclude` (category, duration, price, grade_level)
+    are skipped; status and search always apply.
+    """
+    # Apply status filter (default to active trips)
+    if filters['status']:
+        query = query.filter(Trip.status == filters['status'])
+    
+    # Apply search filter
+    if filters['search']:
+        search_pattern = f"%{filters['search']}%"
+        query = query.filter(
+            or_(
+                Trip.title.ilike(search_pattern),
+                Trip.description.ilike(search_pattern),
+                Trip.destination.ilike(search_pattern),
+                Trip.category.ilike(search_pattern)
+            )
+        )
+    
+    # Apply category filter
+    category = filters['category']
+    if 'category' not in exclude and category and category != 'all':
+        query = query.filter(Trip.category.in_(expand_category(category)))
+    
+    # Apply duration filter
+    duration = filters['duration']
+    if 'duration' not in exclude and duration in DURATION_RANGES:
+        low, high = DURATION_RANGES[duration]
+        span = func.datediff(Trip.end_date, Trip.start_date)
+        if low is not None:
+            query = query.filter(span >= low)
+        if high is not None:
+            query = query.filter(span <= high)
+    
+    # Apply price filters
+    if 'price' not in exclude:
+        if filters['min_price'] is not None:
+            query = query.filter(Trip.price_per_student >= filters['min_price'])
+        if filters['max_price'] is not None:
+            query = query.filter(Trip.price_per_student <= filters['max_price'])
+    
+    # Apply grade level filter
+    grade_level = filters['grade_level']
+    if 'grade_level' not in exclude and grade_level and grade_level != 'all':
+        query = query.filter(Trip.grade_level == grade_level)
+    
+    return query
+
+
+def compute_trip_facets(filters, price_buckets=5):
+    """
+    Compute category, grade level, price and duration facets in one query
+    Rows are fetched once with only the status/search filters applied, then
+    each facet is counted in a single pass against every other active facet
+    filter, so picking a category still shows the alternative categories.
+    """
+    facet_names = ('category', 'grade_level', 'price', 'duration')
+    rows = apply_trip_filters(
+        db.session.query(
+            Trip.category,
+            Trip.grade_level,
+            Trip.price_per_student,
+            Trip.start_date,
+            Trip.end_date
+        ),
+        filters,
+        exclude=facet_names
+    ).all()
+    
+    category = filters['category']
+    categories = set(expand_category(category)) if category and category != 'all' else None
+    grade_level = filters['grade_level'] if filters['grade_level'] not in ('', 'all') else None
+    duration = filters['duration'] if filters['duration'] in DURATION_RANGES else None
+    min_price, max_price = filters['min_price'], filters['max_price']
+    
+    category_counts = {}
+    grade_counts = {}
+    duration_counts = {name: 0 for name in DURATION_BUCKETS}
+    prices = []
+    total = 0
+    
+    for row in rows:
+        span = (row.end_date - row.start_date).days
+        price = float(row.price_per_student)
+        matches = {
+            'category': categories is None or row.category in categories,
+            'grade_level': grade_level is None or row.grade_level == grade_level,
+            'price': ((min_price is None or price >= min_price) and
+                      (max_price is None or price <= max_price)),
+            'duration': duration is None or duration_in_range(span, duration)
+        }
+        failed = [name for name in facet_names if not matches[name]]
+        
+        # A row counts towards a facet if it passes every other facet filter
+        if len(failed) > 1:
+            continue
+        if not failed:
+            total += 1
+        
+        if not failed or failed == ['category']:
+            if row.category:
+                category_counts[row.category] = category_counts.get(row.category, 0) + 1
+        if not failed or failed == ['grade_level']:
+            if row.grade_level:
+                grade_counts[row.grade_level] = grade_counts.get(row.grade_level, 0) + 1
+        if not failed or failed == ['duration']:
+            for name in DURATION_BUCKETS:
+                if duration_in_range(span, name):
+                    duration_counts[name] += 1
+        if not failed or failed == ['price']:
+            prices.append(price)
+    
+    return {
+        'total': total,
+        'categories': [
+            {'name': name, 'count': count}
+            for name, count in sorted(category_counts.items())
+        ],
+        'grade_levels': [
+            {'name': name, 'count': count}
+            for name, count in sorted(grade_counts.items())
+        ],
+        'durations': [
+            {'name': name, 'count': duration_counts[name]}
+            for name in DURATION_BUCKETS
+        ],
+        'price_histogram': build_price_histogram(prices, price_buckets)
+    }
+
+
+def build_price_histogram(prices, bucket_count):
+    """Split prices into equal-width buckets between the min and max price"""
+    if not prices:
+        return []
+    
+    low, high = min(prices), max(prices)
+    if low == high:
+        return [{'min': low, 'max': high, 'count': len(prices)}]
+    
+    width = (high - low) / bucket_count
+    counts = [0] * bucket_count
+    for price in prices:
+        # The top price belongs to the last bucket
+        index = min(int((price - low) / width), bucket_count - 1)
+        counts[index] += 1
+    
+    return [
+        {
+            'min': round(low + width * i, 2),
+            'max': round(low + width * (i + 1), 2) if i < bucket_count - 1 else high,
+            'count': counts[i]
+        } for i in range(bucket_count)
+    ]
+
+
+@trips_api.route('/trips/facets', methods=['GET'])
+def get_trip_facets():
+    """
+    Get catalog sidebar facets for the current filter set
+    Query params: the same filters as /trips, plus
+    - price_buckets: number of price histogram buckets (default: 5)
+    """
+    try:
+        filters = parse_trip_filters(request.args)
+        price_buckets = request.args.get('price_buckets', 5, type=int)
+        
+        if price_buckets < 1 or price_buckets > 20:
+            return jsonify({
+                'success': False,
+                'error': 'price_buckets must be between 1 and 20'
+            }), 400
+        
+        return jsonify({
+            'success': True,
+            'facets': compute_trip_facets(filters, price_buckets)
         }), 200
         
     except Exception as e:
@@ -184,7 +356,7 @@ def get_trips_details(trip_id):
         trip_data['rating'] = 4.8  # Replace with actual rating
         trip_data['image_url'] = get_trip_image_url(trip)
         trip_data['itinerary'] = trip.itinerary or []
-        trip_data['locations'] = [loc.serialize() for loc in trip.locations]
+        trip_data['locations'] = [loc.serialize(native=True) for loc in trip.locations]
         
         return jsonify({
             'success': True,
@@ -1,3 +1,24 @@
+# Catalog category groups mapped to the database categories they cover
+CATEGORY_GROUPS = {
+    'science': ['science', 'nature', 'wildlife', 'marine'],
+    'history': ['history', 'cultural', 'heritage'],
+    'art': ['art', 'museums', 'cultural'],
+    'adventure': ['adventure', 'sports', 'outdoor'],
+    'technology': ['technology', 'innovation', 'stem']
+}
+
+# Duration filters as (min, max) days between start and end date, None = open
+DURATION_RANGES = {
+    'half': (None, 0),
+    'full': (0, 0),
+    'multi': (1, 5),
+    'week': (6, None)
+}
+
+# Buckets reported by the facets endpoint ('half' and 'full' overlap)
+DURATION_BUCKETS = ('full', 'multi', 'week')
+
+
 def get_trip_image_url(trip):
     """Get image URL for trip based on category or destination"""
     # Default images by category
@@ -19,4 +40,19 @@ def calculate_trip_rating(trip):
     """Calculate trip rating (placeholder - implement based on reviews)"""
     # TODO: Implement actual rating calculation based on reviews
     # For now, return a default rating
-    return 4.8
\ No newline at end of file
+    return 4.8
+
+
+def expand_category(category):
+    """Get the database categories matched by a catalog category filter"""
+    return CATEGORY_GROUPS.get(category, [category])
+
+
+def duration_in_range(span_days, duration):
+    """Check if a trip span (end - start in days) falls in a duration filter"""
+    low, high = DURATION_RANGES[duration]
+    if low is not None and span_days < low:
+        return False
+    if high is not None and span_days > high:
+        return False
+    return True
@@ -1,4 +1,5 @@
 import os
+import tempfile
 from datetime import timedelta
 
 # Set default development environment variables if not set
@@ -41,6 +42,70 @@ class BaseConfig:
     WTF_CSRF_ENABLED = True
     WTF_CSRF_TIME_LIMIT = None
     
+    # Teacher dashboard stats are recomputed when older than this (seconds)
+    TEACHER_STATS_MAX_AGE = int(os.environ.get('TEACHER_STATS_MAX_AGE', 300))
+    
+    # Vendor directory
+    VENDORS_PER_PAGE = 24
+    VENDOR_FACETS_TTL = int(os.environ.get('VENDOR_FACETS_TTL', 300))
+    VENDOR_BOOKINGS_PER_PAGE = 20
+    
+    # Seconds a worker may serve a cached report of a completed trip
+    TRIP_REPORT_CACHE_TTL = int(os.environ.get('TRIP_REPORT_CACHE_TTL', 3600))
+    
+    # Analytics warehouse: each ETL run re-reads rows updated up to
+    # WAREHOUSE_ETL_OVERLAP seconds before its last watermark, to pick up
+    # transactions that committed late
+    WAREHOUSE_ETL_OVERLAP = int(os.environ.get('WAREHOUSE_ETL_OVERLAP', 300))
+    WAREHOUSE_DASHBOARD_ROWS = 20
+    
+    # Seconds a worker may serve its cached vendor availability index
+    VENDOR_AVAILABILITY_TTL = int(os.environ.get('VENDOR_AVAILABILITY_TTL', 60))
+    
+    # Ad impressions and clicks are buffered per worker and flushed every
+    # AD_EVENTS_FLUSH_INTERVAL seconds or once AD_EVENTS_MAX_PENDING accumulate
+    AD_EVENTS_FLUSH_INTERVAL = int(os.environ.get('AD_EVENTS_FLUSH_INTERVAL', 10))
+    AD_EVENTS_MAX_PENDING = int(os.environ.get('AD_EVENTS_MAX_PENDING', 1000))
+    
+    # Seconds a worker may serve its cached ad targeting index
+    AD_INDEX_TTL = int(os.environ.get('AD_INDEX_TTL', 30))
+    
+    # Background jobs: stored uploads, export files and error reports
+    # (kept outside static/ since they hold participant data)
+    JOBS_FOLDER = os.environ.get('JOBS_FOLDER') or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'instance', 'jobs'
+    )
+    JOB_PROGRESS_INTERVAL = 1.0
+    # Participant CSV uploads larger than this (bytes) run as background jobs
+    PARTICIPANT_IMPORT_INLINE_LIMIT = int(os.environ.get('PARTICIPANT_IMPORT_INLINE_LIMIT', 256 * 1024))
+    
+    # Rows fetched per round trip when streaming CSV/XLSX exports
+    EXPORT_CHUNK_SIZE = int(os.environ.get('EXPORT_CHUNK_SIZE', 1000))
+    
+    # Gzipped GPS tracks of completed trips, and the largest simplification tolerance (metres)
+    TRACK_CACHE_FOLDER = os.environ.get('TRACK_CACHE_FOLDER') or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'instance', 'tracks'
+    )
+    TRACK_MAX_TOLERANCE = float(os.environ.get('TRACK_MAX_TOLERANCE', 1000))
+    
+    # PDF documents: WeasyPrint worker processes, seconds to wait per render, and rendered PDF cache
+    DOCUMENT_WORKERS = int(os.environ.get('DOCUMENT_WORKERS', 2))
+    DOCUMENT_RENDER_TIMEOUT = int(os.environ.get('DOCUMENT_RENDER_TIMEOUT', 60))
+    DOCUMENT_CACHE_FOLDER = os.environ.get('DOCUMENT_CACHE_FOLDER') or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'instance', 'documents'
+    )
+    
+    # Uploaded images: resize worker processes, stored originals (private),
+    # public renditions and how long browsers may cache them
+    IMAGE_WORKERS = int(os.environ.get('IMAGE_WORKERS', 2))
+    UPLOAD_ORIGINALS_FOLDER = os.environ.get('UPLOAD_ORIGINALS_FOLDER') or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'instance', 'uploads'
+    )
+    MEDIA_FOLDER = os.environ.get('MEDIA_FOLDER') or os.path.join(
+        os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'instance', 'media'
+    )
+    MEDIA_MAX_AGE = 365 * 24 * 3600
+    
     # SocketIO settings
     SOCKETIO_ASYNC_MODE = os.environ.get('eventlet')
     
@@ -80,6 +145,15 @@ class TestingConfig(BaseConfig):
     SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
     WTF_CSRF_ENABLED = False
     MAIL_SUPPRESS_SEND = True
+    AD_EVENTS_FLUSH_INTERVAL = 0  # Tests flush ad events explicitly
+    JOBS_RUN_INLINE = True
+    JOBS_FOLDER = os.path.join(tempfile.gettempdir(), 'edusafaris_test_jobs')
+    TRACK_CACHE_FOLDER = os.path.join(tempfile.gettempdir(), 'edusafaris_test_tracks')
+    DOCUMENT_WORKERS = 0  # Render PDFs in-process
+    DOCUMENT_CACHE_FOLDER = os.path.join(tempfile.gettempdir(), 'edusafaris_test_documents')
+    IMAGE_WORKERS = 0  # Resize uploads in-process
+    UPLOAD_ORIGINALS_FOLDER = os.path.join(tempfile.gettempdir(), 'edusafaris_test_uploads')
+    MEDIA_FOLDER = os.path.join(tempfile.gettempdir(), 'edusafaris_test_media')
 
 config = {
     'development': DevelopmentConfig,
@@ -2,6 +2,14 @@ import os
 import click
 from flask.cli import with_appcontext
 from app.config_dir.cli.trips_cmd import seed_trips_command
+from app.config_dir.cli.bench_cmd import bench_json_command, bench_paperwork_command
+from app.config_dir.cli.stats_cmd import reconcile_teacher_stats_command
+from app.config_dir.cli.consents_cmd import sync_consent_flags_command
+from app.config_dir.cli.vendors_cmd import (
+    reconcile_vendor_ratings_command, reindex_vendor_search_command, rebuild_vendor_revenue_command
+)
+from app.config_dir.cli.warehouse_cmd import etl_warehouse_command
+from app.config_dir.cli.users_cmd import reindex_user_search_command
 
 def register_cli_commands(app):
     """Register CLI commands"""
@@ -56,3 +64,65 @@ def register_cli_commands(app):
     @with_appcontext
     def extra_trips(clear):
         seed_trips_command(clear)
+
+    @app.cli.command('bench-json')
+    @click.option('--iterations', default=200, show_default=True, help='Encodes per payload')
+    @with_appcontext
+    def bench_json(iterations):
+        """Benchmark JSON encoding of participant pages and location tracks"""
+        bench_json_command(iterations)
+
+    @app.cli.command('bench-paperwork')
+    @click.option('--students', default=300, show_default=True, help='Participants in the benchmark trip')
+    @click.option('--workers', default=4, show_default=True, help='Document worker processes')
+    @with_appcontext
+    def bench_paperwork(students, workers):
+        """Benchmark rendering a whole-trip consent and medical paperwork pack"""
+        bench_paperwork_command(students, workers)
+
+    @app.cli.command('reconcile-teacher-stats')
+    @click.option('--batch-size', default=500, show_default=True, help='Organizers per transaction')
+    @with_appcontext
+    def reconcile_teacher_stats(batch_size):
+        """Rebuild materialized teacher dashboard stats (run periodically)"""
+        reconcile_teacher_stats_command(batch_size)
+
+    @app.cli.command('sync-consent-flags')
+    @with_appcontext
+    def sync_consent_flags():
+        """Backfill participant consent_complete flags from signed consents"""
+        sync_consent_flags_command()
+
+    @app.cli.command('reconcile-vendor-ratings')
+    @with_appcontext
+    def reconcile_vendor_ratings():
+        """Rebuild vendor rating totals from bookings (run nightly)"""
+        reconcile_vendor_ratings_command()
+
+    @app.cli.command('reindex-vendor-search')
+    @click.option('--batch-size', default=500, show_default=True, help='Vendors per transaction')
+    @with_appcontext
+    def reindex_vendor_search(batch_size):
+        """Rebuild the vendor directory search text (run after bulk vendor imports)"""
+        reindex_vendor_search_command(batch_size)
+
+    @app.cli.command('rebuild-vendor-revenue')
+    @with_appcontext
+    def rebuild_vendor_revenue():
+        """Rebuild monthly vendor revenue rollups from bookings (after imports or fixes)"""
+        rebuild_vendor_revenue_command()
+
+    @app.cli.command('etl-warehouse')
+    @click.option('--full', is_flag=True, help='Empty the warehouse and reload everything')
+    @click.option('--batch-size', default=1000, show_default=True, help='Source rows per transaction')
+    @with_appcontext
+    def etl_warehouse(full, batch_size):
+        """Load the admin analytics warehouse tables (run nightly)"""
+        etl_warehouse_command(full, batch_size)
+
+    @app.cli.command('reindex-user-search')
+    @click.option('--batch-size', default=500, show_default=True, help='Users per transaction')
+    @with_appcontext
+    def reindex_user_search(batch_size):
+        """Rebuild the admin user search text (run once after upgrading, and after bulk user imports)"""
+        reindex_user_search_command(batch_size)
@@ -0,0 +1,179 @@
+import os
+import shutil
+import tempfile
+import time
+import timeit
+import click
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+from flask import current_app
+from flask.json.provider import DefaultJSONProvider
+from app.models.trip import Trip
+from app.models.participant import Participant
+from app.models.location import Location
+from app.models.consent import Consent
+from app.utils import documents
+from app.utils.json_provider import FastJSONProvider, orjson
+from app.trips.paperwork import participant_documents, write_pack
+
+
+def build_participant_page(size=50):
+    """Build an unsaved page of participants, like the teacher participants list"""
+    trip = Trip(
+        title='Benchmark Trip',
+        price_per_student=Decimal('4500.00'),
+        consent_required=False
+    )
+    now = datetime.now()
+    return [
+        Participant(
+            id=i,
+            first_name='Student',
+            last_name=str(i),
+            date_of_birth=date(2012, 1, 1) + timedelta(days=i),
+            grade_level='6',
+            email=f'student{i}@example.com',
+            status='confirmed',
+            payment_status='partial',
+            amount_paid=Decimal('1500.50'),
+            registration_date=now - timedelta(hours=i),
+            trip=trip
+        )
+        for i in range(size)
+    ]
+
+
+def build_track(size=500):
+    """Build an unsaved GPS track, like a trip location export"""
+    start = datetime.now()
+    return [
+        Location(
+            id=i,
+            name=None,
+            latitude=-1.2921 + i * 0.0001,
+            longitude=36.8219 + i * 0.0001,
+            altitude=1795.0,
+            accuracy=5.0,
+            timestamp=start + timedelta(seconds=5 * i),
+            location_type='waypoint',
+            is_safe_zone=True,
+            trip_id=1
+        )
+        for i in range(size)
+    ]
+
+
+def bench_json_command(iterations):
+    """Compare the default JSON path with the fast provider and native serializers"""
+    default_provider = DefaultJSONProvider(current_app._get_current_object())
+    fast_provider = FastJSONProvider(current_app._get_current_object())
+
+    payloads = {
+        'participants (50)': build_participant_page(),
+        'track (500 points)': build_track()
+    }
+
+    click.echo(f"Encoder: {'orjson ' + orjson.__version__ if orjson else 'stdlib json (orjson not installed)'}")
+    click.echo(f"Iterations: {iterations}")
+
+    for name, items in payloads.items():
+        def default_path():
+            return default_provider.dumps({'items': [item.serialize() for item in items]})
+
+        def fast_path():
+            return fast_provider.dumps({'items': [item.serialize(native=True) for item in items]})
+
+        # Both paths must produce the same document
+        if current_app.json.loads(default_path()) != current_app.json.loads(fast_path()):
+            raise click.ClickException(f'{name}: fast path output differs from default path')
+
+        default_ms = timeit.timeit(default_path, number=iterations) * 1000 / iterations
+        fast_ms = timeit.timeit(fast_path, number=iterations) * 1000 / iterations
+
+        click.echo(
+            f"{name}: default {default_ms:.3f} ms, fast {fast_ms:.3f} ms "
+            f"({default_ms / fast_ms:.1f}x)"
+        )
+
+
+def build_paperwork_trip(students=300):
+    """Build an unsaved trip with signed consents, like a full paperwork pack"""
+    now = datetime.now()
+    trip = Trip(
+        id=1,
+        title='Benchmark Trip',
+        destination='Nairobi',
+        start_date=date.today() + timedelta(days=30),
+        end_date=date.today() + timedelta(days=33),
+        price_per_student=Decimal('4500.00'),
+        updated_at=now
+    )
+    participants, consents = [], {}
+    for i in range(1, students + 1):
+        participant = Participant(
+            id=i,
+            first_name='Student',
+            last_name=str(i),
+            date_of_birth=date(2012, 1, 1) + timedelta(days=i),
+            grade_level='6',
+            medical_conditions='Asthma' if i % 10 == 0 else None,
+            allergies='Peanuts' if i % 7 == 0 else None,
+            emergency_contact_1_name=f'Parent {i}',
+            emergency_contact_1_phone='+254700000000',
+            emergency_contact_1_relationship='Mother',
+            updated_at=now,
+            trip=trip
+        )
+        participants.append(participant)
+        consents[i] = Consent(
+            id=i,
+            consent_type='trip_participation',
+            title='Trip Participation',
+            content='Consent',
+            is_signed=True,
+            signed_date=now,
+            signer_name=f'Parent {i}',
+            signer_relationship='parent',
+            signer_email=f'parent{i}@example.com',
+            signature_data=f'typed:Parent {i}',
+            version='1.0',
+            updated_at=now
+        )
+    return trip, participants, consents
+
+
+def bench_paperwork_command(students, workers):
+    """Time a trip paperwork pack rendered in-process, on the worker pool, and from the cache"""
+    trip, participants, consents = build_paperwork_trip(students)
+    pack = participant_documents(trip, participants, consents)
+    config = current_app.config
+    saved = config['DOCUMENT_CACHE_FOLDER'], config['DOCUMENT_WORKERS']
+    scratch = tempfile.mkdtemp(prefix='bench_paperwork_')
+    target = os.path.join(scratch, 'pack.zip')
+
+    click.echo(f'Students: {students}, documents: {len(pack)}, pool workers: {workers}')
+
+    def timed(label, cache_folder, pool_workers):
+        config['DOCUMENT_CACHE_FOLDER'] = os.path.join(scratch, cache_folder)
+        config['DOCUMENT_WORKERS'] = pool_workers
+        start = time.perf_counter()
+        write_pack(pack, target)
+        elapsed = time.perf_counter() - start
+        click.echo(f'{label}: {elapsed:.2f} s ({elapsed * 1000 / len(pack):.1f} ms per document)')
+        return elapsed
+
+    try:
+        sequential = timed('In-process, cold cache', 'sequential', 0)
+
+        config['DOCUMENT_WORKERS'] = workers
+        start = time.perf_counter()
+        documents.pool.warm()
+        click.echo(f'Worker pool start-up: {time.perf_counter() - start:.2f} s')
+
+        pooled = timed('Worker pool, cold cache', 'pooled', workers)
+        timed('Worker pool, warm cache', 'pooled', workers)
+        click.echo(f'Pool speed-up: {sequential / pooled:.1f}x, pack size: {os.path.getsize(target) / 1024:.0f} KiB')
+    finally:
+        documents.pool.shutdown()
+        config['DOCUMENT_CACHE_FOLDER'], config['DOCUMENT_WORKERS'] = saved
+        shutil.rmtree(scratch, ignore_errors=True)
@@ -0,0 +1,22 @@
+import click
+from sqlalchemy import exists, update
+from app.extensions import db
+from app.models.participant import Participant
+from app.models.consent import Consent
+
+
+def sync_consent_flags_command():
+    """Recompute Participant.consent_complete from the consent forms in one UPDATE"""
+    has_signed_consent = exists().where(
+        Consent.participant_id == Participant.id,
+        Consent.is_signed == True
+    )
+    result = db.session.execute(
+        update(Participant)
+        .where(Participant.consent_complete != has_signed_consent)
+        .values(consent_complete=has_signed_consent)
+        .execution_options(synchronize_session=False)
+    )
+    db.session.commit()
+
+    click.echo(f"Updated consent status for {result.rowcount} participants")
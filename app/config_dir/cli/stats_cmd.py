@@ -0,0 +1,20 @@
+import click
+from flask import current_app
+from app.extensions import db
+from app.models.user import User
+from app.models.organizer_stats import OrganizerStats
+
+
+def reconcile_teacher_stats_command(batch_size):
+    """Recompute every teacher's dashboard statistics from the source tables"""
+    organizer_ids = sorted(
+        {user_id for (user_id,) in db.session.query(User.id).filter(User.role == 'teacher')}
+        | {organizer_id for (organizer_id,) in db.session.query(OrganizerStats.organizer_id)}
+    )
+
+    current_app.logger.info(f"Reconciling dashboard stats for {len(organizer_ids)} organizers")
+
+    for start in range(0, len(organizer_ids), batch_size):
+        OrganizerStats.refresh(organizer_ids[start:start + batch_size])
+
+    click.echo(f"Reconciled dashboard stats for {len(organizer_ids)} organizers")
@@ -0,0 +1,31 @@
+import click
+from flask import current_app
+from sqlalchemy import bindparam, update
+from app.extensions import db
+from app.models.user import User
+
+
+def reindex_user_search_command(batch_size):
+    """Rebuild User.search_text for every user"""
+    current_app.logger.info("Rebuilding admin user search text...")
+    stmt = update(User).where(User.id == bindparam('user_id')).values(
+        search_text=bindparam('text')
+    ).execution_options(synchronize_session=False)
+
+    last_id = 0
+    total = 0
+    while True:
+        users = User.query.filter(User.id > last_id).order_by(User.id).limit(batch_size).all()
+        if not users:
+            break
+
+        db.session.connection().execute(stmt, [
+            {'user_id': user.id, 'text': user.build_search_text()}
+            for user in users
+        ])
+        db.session.commit()
+
+        last_id = users[-1].id
+        total += len(users)
+
+    click.echo(f"Reindexed search text for {total} users")
@@ -0,0 +1,46 @@
+import click
+from flask import current_app
+from sqlalchemy import bindparam, update
+from app.extensions import db
+from app.models.vendor import Vendor
+from app.models.vendor_revenue import VendorRevenueRollup
+
+
+def reconcile_vendor_ratings_command():
+    """Recompute every vendor's rating totals from completed, rated bookings"""
+    current_app.logger.info("Reconciling vendor rating totals...")
+    fixed = Vendor.reconcile_ratings()
+    click.echo(f"Reconciled vendor ratings; corrected {fixed} vendors")
+
+
+def reindex_vendor_search_command(batch_size):
+    """Rebuild Vendor.search_text for every vendor"""
+    current_app.logger.info("Rebuilding vendor directory search text...")
+    stmt = update(Vendor).where(Vendor.id == bindparam('vendor_id')).values(
+        search_text=bindparam('text')
+    ).execution_options(synchronize_session=False)
+
+    last_id = 0
+    total = 0
+    while True:
+        vendors = Vendor.query.filter(Vendor.id > last_id).order_by(Vendor.id).limit(batch_size).all()
+        if not vendors:
+            break
+
+        db.session.connection().execute(stmt, [
+            {'vendor_id': vendor.id, 'text': vendor.build_search_text()}
+            for vendor in vendors
+        ])
+        db.session.commit()
+
+        last_id = vendors[-1].id
+        total += len(vendors)
+
+    click.echo(f"Reindexed search text for {total} vendors")
+
+
+def rebuild_vendor_revenue_command():
+    """Rebuild monthly vendor revenue rollups from completed bookings"""
+    current_app.logger.info("Rebuilding vendor revenue rollups...")
+    rows = VendorRevenueRollup.rebuild()
+    click.echo(f"Rebuilt {rows} vendor revenue rollup rows")
@@ -0,0 +1,10 @@
+import click
+from flask import current_app
+from app.admin.warehouse import run_etl
+
+
+def etl_warehouse_command(full, batch_size):
+    """Load rows changed since the last run into the analytics warehouse"""
+    current_app.logger.info(f"Loading analytics warehouse ({'full' if full else 'incremental'})...")
+    loaded = run_etl(full=full, batch_size=batch_size)
+    click.echo('Warehouse loaded: ' + ', '.join(f'{name} {count}' for name, count in loaded.items()))
@@ -30,10 +30,13 @@ def register_jinja_extensions(app):
         return ''
     
     @app.template_global()
-    def get_active_ads(placement=None):
-        """Get active advertisements for current user"""
+    def get_active_ads(placement=None, grade_level=None, location=None):
+        """Get active advertisements for current user, counting an impression for each"""
         from app.models import Advertisement
-        return Advertisement.get_active_ads_for_user(current_user, placement)
+        ads = Advertisement.get_active_ads_for_user(current_user, placement, grade_level, location)
+        for ad in ads:
+            ad.record_impression()
+        return ads
     
     @app.template_global()
     def get_unread_notifications():
@@ -44,4 +47,18 @@ def register_jinja_extensions(app):
                 recipient_id=current_user.id,
                 is_read=False
             ).order_by(Notification.created_at.desc()).limit(5).all()
-        return []
\ No newline at end of file
+        return []
+    
+    @app.template_global()
+    def get_parent_home():
+        """Get the parent home view model for current user (None for non-parents)"""
+        if current_user.is_authenticated and current_user.is_parent():
+            from app.parent_comm.loaders import get_parent_home as load_home
+            return load_home(current_user.id)
+        return None
+    
+    @app.template_global()
+    def image_url(value, rendition='card', extension='webp'):
+        """URL of a stored image's rendition (profile pictures, ad images)"""
+        from app.utils.images import image_url as stored_image_url
+        return stored_image_url(value, rendition, extension)
@@ -0,0 +1,135 @@
+"""
+Background jobs
+
+Long imports and exports run outside the request: the request stores its
+input on disk, creates a Job row and returns; a Socket.IO background task
+runs the job's handler, which reports progress through a JobReporter. Each
+progress update is saved on the Job row and pushed to the owner over the
+/jobs Socket.IO namespace. Results (export files, import error reports)
+are written next to the input and downloaded through the jobs API.
+"""
+import os
+import time
+from datetime import datetime
+from flask import current_app
+from sqlalchemy import update
+
+from app.extensions import db, socketio
+from app.models.job import Job
+
+# job_type -> handler(job, reporter)
+JOB_HANDLERS = {}
+
+
+def job_handler(job_type):
+    """Register the function that runs jobs of job_type"""
+    def decorator(func):
+        JOB_HANDLERS[job_type] = func
+        return func
+    return decorator
+
+
+def jobs_folder():
+    """Directory holding job inputs and results, created on first use"""
+    folder = current_app.config['JOBS_FOLDER']
+    os.makedirs(folder, exist_ok=True)
+    return folder
+
+
+def job_file_path(job, suffix):
+    """Path of one of a job's files, e.g. job_file_path(job, 'errors.csv')"""
+    return os.path.join(jobs_folder(), f'job_{job.id}_{suffix}')
+
+
+def emit_job_update(job):
+    """Push a job's state to its owner"""
+    socketio.emit('job_progress', job.serialize(), room=f'user_{job.user_id}', namespace='/jobs')
+
+
+class JobReporter:
+    """Saves and pushes progress, at most once every JOB_PROGRESS_INTERVAL seconds"""
+
+    def __init__(self, job):
+        self.job = job
+        self.job_id = job.id
+        self.interval = current_app.config.get('JOB_PROGRESS_INTERVAL', 1.0)
+        self._last_report = 0.0
+
+    def update(self, rows_done, rows_failed=0, total_rows=None, force=False):
+        self.job.rows_done = rows_done
+        self.job.rows_failed = rows_failed
+        if total_rows is not None:
+            self.job.total_rows = total_rows
+
+        now = time.monotonic()
+        if force or now - self._last_report >= self.interval:
+            self._last_report = now
+            # Own transaction, so handlers streaming from the session's cursor are not interrupted
+            with db.engine.begin() as connection:
+                connection.execute(update(Job).where(Job.id == self.job_id).values(
+                    rows_done=self.job.rows_done,
+                    rows_failed=self.job.rows_failed,
+                    total_rows=self.job.total_rows
+                ))
+            emit_job_update(self.job)
+
+
+def run_job(app, job_id):
+    """Run a queued job to completion inside its own app context"""
+    with app.app_context():
+        job = db.session.get(Job, job_id)
+        if job is None or job.status != 'queued':
+            return
+
+        job.status = 'running'
+        job.started_at = datetime.now()
+        db.session.commit()
+        emit_job_update(job)
+
+        try:
+            JOB_HANDLERS[job.job_type](job, JobReporter(job))
+            job.status = 'completed'
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.exception(f'Job {job_id} failed')
+            job = db.session.get(Job, job_id)
+            job.status = 'failed'
+            job.message = f'Job failed: {str(e)}'
+        finally:
+            if job.input_path and os.path.exists(job.input_path):
+                os.remove(job.input_path)
+            job.finished_at = datetime.now()
+            db.session.commit()
+            emit_job_update(job)
+            db.session.remove()
+
+
+def enqueue_job(job_type, user_id, trip_id=None, params=None, input_path=None, total_rows=None):
+    """
+    Create a job and start it in a background task
+    With JOBS_RUN_INLINE set (tests), the job runs before this returns.
+    """
+    if job_type not in JOB_HANDLERS:
+        raise ValueError(f'Unknown job type: {job_type}')
+
+    job = Job(
+        job_type=job_type,
+        user_id=user_id,
+        trip_id=trip_id,
+        params=params,
+        input_path=input_path,
+        total_rows=total_rows
+    )
+    db.session.add(job)
+    db.session.commit()
+
+    app = current_app._get_current_object()
+    if app.config.get('JOBS_RUN_INLINE'):
+        run_job(app, job.id)
+        db.session.refresh(job)
+    else:
+        socketio.start_background_task(run_job, app, job.id)
+    return job
+
+
+from app.jobs import handlers, socket_handlers
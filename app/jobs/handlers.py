@@ -0,0 +1,91 @@
+"""
+Job handlers for participant imports and exports
+"""
+import csv
+
+from app.extensions import db
+from app.models.trip import Trip
+from app.jobs import job_handler, job_file_path
+from app.trips.importer import ParticipantImporter
+from app.trips.exports import PARTICIPANT_COLUMNS, participants_query
+from app.trips.paperwork import trip_documents, write_pack
+from app.utils.exports import iter_rows
+
+def count_csv_rows(path):
+    """Estimate the data rows in a CSV file from its line count"""
+    lines = 0
+    last = b'\n'
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            lines += chunk.count(b'\n')
+            last = chunk[-1:]
+    if last != b'\n':
+        lines += 1  # Last line without a trailing newline
+    return max(0, lines - 1)
+
+
+@job_handler('participant_import')
+def import_participants(job, reporter):
+    """Import a stored participant CSV; failed rows go to a downloadable error report"""
+    trip = db.session.get(Trip, job.trip_id)
+    reporter.update(0, 0, total_rows=count_csv_rows(job.input_path), force=True)
+
+    importer = ParticipantImporter(
+        trip,
+        registered_by_id=job.user_id,
+        progress=lambda result: reporter.update(result.added, result.failed)
+    )
+    with open(job.input_path, encoding='utf-8-sig', newline='') as f:
+        result = importer.run(f)
+
+    if result.errors:
+        job.result_path = job_file_path(job, 'errors.csv')
+        job.result_filename = f'import_errors_trip_{job.trip_id}.csv'
+        with open(job.result_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['Row', 'Error'])
+            writer.writerows((error.row, error.message) for error in result.errors)
+
+    job.message = f'Added {result.added} participants, {result.failed} rows failed'
+    reporter.update(result.added, result.failed, force=True)
+
+
+@job_handler('participant_export')
+def export_participants(job, reporter):
+    """Write a trip's participant list to a CSV file"""
+    trip_id = job.trip_id
+    query = participants_query(trip_id)
+
+    total = query.order_by(None).count()
+    reporter.update(0, total_rows=total, force=True)
+
+    job.result_path = job_file_path(job, 'participants.csv')
+    job.result_filename = f'trip_{trip_id}_participants.csv'
+    rows_done = 0
+    with open(job.result_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow([header for header, _ in PARTICIPANT_COLUMNS])
+        for row in iter_rows(query):
+            writer.writerow(['' if value is None else value for value in row])
+            rows_done += 1
+            if rows_done % 1000 == 0:
+                reporter.update(rows_done)
+
+    job.message = f'Exported {rows_done} participants'
+    reporter.update(rows_done, force=True)
+
+
+@job_handler('trip_paperwork')
+def build_trip_paperwork(job, reporter):
+    """Bundle every participant's consent form and medical summary into one ZIP or PDF"""
+    pack_format = (job.params or {}).get('format', 'zip')
+    trip = db.session.get(Trip, job.trip_id)
+    documents = trip_documents(trip)
+    reporter.update(0, total_rows=len(documents), force=True)
+
+    job.result_path = job_file_path(job, f'paperwork.{pack_format}')
+    job.result_filename = f'trip_{trip.id}_paperwork.{pack_format}'
+    write_pack(documents, job.result_path, pack_format, progress=reporter.update)
+
+    job.message = f'Bundled {len(documents)} documents'
+    reporter.update(len(documents), force=True)
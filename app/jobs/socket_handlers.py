@@ -0,0 +1,13 @@
+from flask_socketio import join_room, disconnect
+from flask_login import current_user
+from app.extensions import socketio
+
+
+@socketio.on('connect', namespace='/jobs')
+def jobs_connect(auth):
+    """Subscribe the user to progress updates for their jobs"""
+    if not current_user.is_authenticated:
+        disconnect()
+        return False
+
+    join_room(f'user_{current_user.id}')
@@ -1,4 +1,4 @@
-from flask import render_template, redirect, url_for
+from flask import render_template, redirect, url_for, current_app, send_from_directory
 from flask_login import login_required, current_user
 from app.main import main_bp
 
@@ -22,6 +22,15 @@ def index():
 #     else:
 #         return render_template('main/index.html')
 
+@main_bp.route('/media/<path:filename>')
+def media(filename):
+    """Image renditions; names are content-addressed, so they never change"""
+    response = send_from_directory(current_app.config['MEDIA_FOLDER'], filename,
+                                   max_age=current_app.config['MEDIA_MAX_AGE'])
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
+
 @main_bp.route('/about')
 def about():
     """About page"""
@@ -13,6 +13,12 @@ from app.models.payment import Payment
 from app.models.notification import Notification
 from app.models.emergency import Emergency
 from app.models.advertisement import Advertisement
+from app.models.organizer_stats import OrganizerStats
+from app.models.vendor_revenue import VendorRevenueRollup
+from app.models.job import Job
+from app.models.warehouse import (
+    EtlWatermark, TripDimension, VendorDimension, ParticipantFact, PaymentFact, BookingFact, TripDailyFact
+)
 
 __all__ = [
     'BaseModel',
@@ -26,5 +32,15 @@ __all__ = [
     'Payment', 
     'Notification', 
     'Emergency', 
-    'Advertisement'
+    'Advertisement',
+    'OrganizerStats',
+    'VendorRevenueRollup',
+    'Job',
+    'EtlWatermark',
+    'TripDimension',
+    'VendorDimension',
+    'ParticipantFact',
+    'PaymentFact',
+    'BookingFact',
+    'TripDailyFact'
 ]
\ No newline at end of file
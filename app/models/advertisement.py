@@ -81,18 +81,26 @@ class Advertisement(BaseModel):
         return float(self.total_spent / self.conversions)
     
     def record_impression(self):
-        """Record an ad impression"""
-        self.impressions += 1
-        db.session.commit()
+        """Record an ad impression (buffered and written in batches)"""
+        from app.vendor.ad_events import ad_events
+        ad_events.record_impression(self)
     
     def record_click(self, cost=None):
-        """Record an ad click"""
-        self.clicks += 1
-        if cost:
-            self.total_spent = (self.total_spent or 0) + cost
-        elif self.cost_per_click:
-            self.total_spent = (self.total_spent or 0) + self.cost_per_click
-        db.session.commit()
+        """
+        Record an ad click (buffered and written in batches)
+        Charges cost, or the ad's cost_per_click, up to the remaining budget
+        and returns the amount charged.
+        """
+        from app.vendor.ad_events import ad_events
+        return ad_events.record_click(self, cost)
+    
+    @property
+    def is_budget_exhausted(self):
+        """Check if the campaign has spent its whole budget"""
+        from app.vendor.ad_events import ad_events
+        if ad_events.is_exhausted(self.id):
+            return True
+        return self.budget is not None and (self.total_spent or 0) >= self.budget
     
     def record_conversion(self):
         """Record a conversion (e.g., booking made)"""
@@ -110,29 +118,14 @@ class Advertisement(BaseModel):
         db.session.commit()
     
     @classmethod
-    def get_active_ads_for_user(cls, user, placement=None):
-        """Get active ads relevant to a specific user"""
-        today = date.today()
-        query = cls.query.filter(
-            cls.is_active == True,
-            cls.start_date <= today,
-            cls.end_date >= today
-        )
-        
-        # Filter by placement if specified
-        if placement:
-            query = query.filter(cls.placement == placement)
-        
-        # Filter by target audience
-        if user:
-            query = query.filter(
-                db.or_(
-                    cls.target_audience == 'all',
-                    cls.target_audience == user.role
-                )
-            )
-        
-        return query.all()
+    def get_active_ads_for_user(cls, user, placement=None, grade_level=None, location=None):
+        """
+        Get active ads relevant to a specific user
+        Served from the in-memory ad index as read-only ServedAd snapshots,
+        with grade level and location targeting applied.
+        """
+        from app.vendor.ad_index import get_ads_for_user
+        return get_ads_for_user(user, placement, grade_level, location)
     
     def serialize(self):
         return {
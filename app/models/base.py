@@ -1,6 +1,18 @@
-from datetime import datetime
+from datetime import date, datetime
+from decimal import Decimal
 from app.extensions import db
 
+
+def json_ready(data):
+    """Convert the date, datetime and Decimal values of a serialized dict to JSON types"""
+    for key, value in data.items():
+        if isinstance(value, date):
+            data[key] = value.isoformat()
+        elif isinstance(value, Decimal):
+            data[key] = float(value)
+    return data
+
+
 class BaseModel(db.Model):
     """Base model class that other models inherit from"""
     __abstract__ = True
@@ -43,6 +43,8 @@ class Booking(BaseModel):
         db.Index('idx_booking_type', 'booking_type'),
         db.Index('idx_booking_trip', 'trip_id'),
         db.Index('idx_booking_vendor', 'vendor_id'),
+        db.Index('idx_booking_vendor_status_booked', 'vendor_id', 'status', 'booking_date'),
+        db.Index('idx_booking_updated', 'updated_at', 'id'),
     )
     
     @property
@@ -64,19 +66,49 @@ class Booking(BaseModel):
     
     def complete_booking(self):
         """Mark booking as completed"""
+        from app.models.vendor import Vendor
+        from app.models.vendor_revenue import VendorRevenueRollup
+        if self.status == 'completed':
+            return
+        old_rating = self.counted_rating
+        
         self.status = 'completed'
         self.completed_date = datetime.now()
+        
+        # A rating left before completion starts counting now
+        Vendor.apply_rating_change(self.vendor_id, old_rating, self.counted_rating)
+        VendorRevenueRollup.record(self.vendor_id, self.completed_date, self.total_amount)
         db.session.commit()
     
+    @property
+    def counted_rating(self):
+        """Rating as it counts towards the vendor's average (completed bookings only)"""
+        return self.rating if self.status == 'completed' else None
+    
     def add_review(self, rating, review_text):
-        """Add rating and review"""
+        """Add or edit rating and review"""
+        from app.models.vendor import Vendor
+        old_rating = self.counted_rating
+        
         self.rating = rating
         self.review = review_text
         self.review_date = datetime.now()
+        
+        # Update vendor's running rating totals in the same transaction
+        Vendor.apply_rating_change(self.vendor_id, old_rating, self.counted_rating)
         db.session.commit()
+    
+    def remove_review(self):
+        """Remove rating and review"""
+        from app.models.vendor import Vendor
+        old_rating = self.counted_rating
         
-        # Update vendor's average rating
-        self.vendor.update_rating()
+        self.rating = None
+        self.review = None
+        self.review_date = None
+        
+        Vendor.apply_rating_change(self.vendor_id, old_rating, None)
+        db.session.commit()
     
     def serialize(self):
         return {
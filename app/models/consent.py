@@ -1,4 +1,5 @@
 from datetime import datetime
+from sqlalchemy import func, case
 from app.extensions import db
 from app.models.base import BaseModel
 
@@ -10,7 +11,8 @@ class Consent(BaseModel):
     title = db.Column(db.String(200), nullable=False)
     content = db.Column(db.Text, nullable=False)
     
-    # Signature Information
+    # Signature Information. Sign and revoke through sign_consent/revoke_consent
+    # so Participant.consent_complete follows; see the note on that column.
     is_signed = db.Column(db.Boolean, default=False, nullable=False)
     signed_date = db.Column(db.DateTime)
     signature_data = db.Column(db.Text)  # Digital signature data
@@ -58,6 +60,8 @@ class Consent(BaseModel):
         self.signer_email = signer_email
         self.signature_data = signature_data
         self.ip_address = ip_address
+        if self.participant:
+            self.participant.consent_complete = True
         db.session.commit()
     
     def revoke_consent(self):
@@ -65,8 +69,45 @@ class Consent(BaseModel):
         self.is_signed = False
         self.signed_date = None
         self.signature_data = None
+        if self.participant:
+            self.participant.refresh_consent_status()
         db.session.commit()
     
+    @classmethod
+    def _status_counts(cls, group_column, ids, *joins):
+        """Signed and pending consent counts per group_column value"""
+        ids = list(ids)
+        counts = {id_: {'signed': 0, 'pending': 0} for id_ in ids}
+        if not ids:
+            return counts
+        
+        query = db.session.query(
+            group_column,
+            func.sum(case((cls.is_signed == True, 1), else_=0)),
+            func.sum(case((cls.is_signed == False, 1), else_=0))
+        ).select_from(cls)
+        for join in joins:
+            query = query.join(*join)
+        
+        rows = query.filter(group_column.in_(ids)).group_by(group_column).all()
+        for id_, signed, pending in rows:
+            counts[id_] = {'signed': int(signed or 0), 'pending': int(pending or 0)}
+        return counts
+    
+    @classmethod
+    def status_counts_for_participants(cls, participant_ids):
+        """Signed and pending consent counts per participant, in one grouped query"""
+        return cls._status_counts(cls.participant_id, participant_ids)
+    
+    @classmethod
+    def status_counts_for_trips(cls, trip_ids):
+        """Signed and pending consent counts per trip, in one grouped query"""
+        from app.models.participant import Participant
+        return cls._status_counts(
+            Participant.trip_id, trip_ids,
+            (Participant, Participant.id == cls.participant_id)
+        )
+    
     def serialize(self):
         return {
             'id': self.id,
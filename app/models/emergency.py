@@ -1,6 +1,6 @@
 from datetime import datetime
 from app.extensions import db
-from app.models.base import BaseModel
+from app.models.base import BaseModel, json_ready
 
 class Emergency(BaseModel):
     __tablename__ = 'emergencies'
@@ -132,8 +132,12 @@ class Emergency(BaseModel):
         emergency.add_response_action('Medical emergency reported')
         return emergency
     
-    def serialize(self):
-        return {
+    def serialize(self, native=False):
+        """
+        Convert emergency to dictionary
+        With native=True, timestamps are left for the JSON provider to encode
+        """
+        data = {
             'id': self.id,
             'title': self.title,
             'description': self.description,
@@ -148,14 +152,15 @@ class Emergency(BaseModel):
             'emergency_services_contacted': self.emergency_services_contacted,
             'response_actions': self.response_actions,
             'resolution_details': self.resolution_details,
-            'resolved_date': self.resolved_date.isoformat() if self.resolved_date else None,
+            'resolved_date': self.resolved_date,
             'duration_minutes': self.duration_minutes,
             'reported_by': self.reported_by,
             'reporter_phone': self.reporter_phone,
             'follow_up_required': self.follow_up_required,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'created_at': self.created_at,
             'trip_id': self.trip_id
         }
+        return data if native else json_ready(data)
     
     def __repr__(self):
         return f'<Emergency {self.title} - {self.severity}>'
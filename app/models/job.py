@@ -0,0 +1,87 @@
+from datetime import datetime
+from app.extensions import db
+from app.models.base import BaseModel
+
+
+class Job(BaseModel):
+    """
+    A background import or export run by a worker
+    Progress columns are updated as the job runs so the owner can follow it
+    and download the result (an export file or an import error report).
+    """
+    __tablename__ = 'jobs'
+
+    job_type = db.Column(db.String(50), nullable=False)  # 'participant_import', 'participant_export'
+    status = db.Column(db.Enum('queued', 'running', 'completed', 'failed',
+                               name='job_status'), default='queued', nullable=False)
+    params = db.Column(db.JSON)
+
+    # Files
+    input_path = db.Column(db.String(300))
+    result_path = db.Column(db.String(300))
+    result_filename = db.Column(db.String(200))  # Download name of the result file
+
+    # Progress
+    total_rows = db.Column(db.Integer)  # Estimate, when known up front
+    rows_done = db.Column(db.Integer, default=0, nullable=False)
+    rows_failed = db.Column(db.Integer, default=0, nullable=False)
+    message = db.Column(db.Text)
+
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+
+    # Foreign Keys
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    trip_id = db.Column(db.Integer, db.ForeignKey('trips.id'))
+
+    # Relationships
+    user = db.relationship('User', backref=db.backref('jobs', lazy='dynamic'))
+
+    # Indexes
+    __table_args__ = (
+        db.Index('idx_job_user_created', 'user_id', 'created_at'),
+        db.Index('idx_job_status', 'status'),
+    )
+
+    @property
+    def is_finished(self):
+        return self.status in ('completed', 'failed')
+
+    @property
+    def progress(self):
+        """Percentage of rows processed, when the total is known"""
+        if self.status == 'completed':
+            return 100
+        if not self.total_rows:
+            return 0
+        return min(99, round((self.rows_done + self.rows_failed) / self.total_rows * 100))
+
+    @property
+    def eta_seconds(self):
+        """Estimated seconds left, from the processing rate so far"""
+        processed = self.rows_done + self.rows_failed
+        if self.status != 'running' or not self.started_at or not self.total_rows or not processed:
+            return None
+        elapsed = (datetime.now() - self.started_at).total_seconds()
+        return max(0, round(elapsed / processed * (self.total_rows - processed)))
+
+    def serialize(self):
+        return {
+            'id': self.id,
+            'job_type': self.job_type,
+            'status': self.status,
+            'trip_id': self.trip_id,
+            'total_rows': self.total_rows,
+            'rows_done': self.rows_done,
+            'rows_failed': self.rows_failed,
+            'progress': self.progress,
+            'eta_seconds': self.eta_seconds,
+            'message': self.message,
+            'has_result': bool(self.result_path),
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+
+    def __repr__(self):
+        return f'<Job {self.id} {self.job_type} {self.status}>'
@@ -1,6 +1,9 @@
 from datetime import datetime
 from app.extensions import db
-from app.models.base import BaseModel
+from app.models.base import BaseModel, json_ready
+
+# Location types that mark named points rather than raw GPS fixes
+WAYPOINT_TYPES = ('checkin', 'activity')
 
 class Location(BaseModel):
     __tablename__ = 'locations'
@@ -51,6 +54,7 @@ class Location(BaseModel):
         db.Index('idx_location_coordinates', 'latitude', 'longitude'),
         db.Index('idx_location_timestamp', 'timestamp'),
         db.Index('idx_trip_location_trip_device', 'trip_id', 'device_id'),
+        db.Index('idx_location_trip_device_time', 'trip_id', 'device_id', 'timestamp'),
         db.Index('idx_location_type', 'location_type'),
     )
     
@@ -116,8 +120,24 @@ class Location(BaseModel):
         return cls.query.filter_by(trip_id=trip_id, device_id=device_id, is_valid=True)\
                        .order_by(cls.timestamp.desc()).first()
     
-    def serialize(self):
-        return {
+    @classmethod
+    def get_waypoints_for_trip(cls, trip_id):
+        """Get named waypoints for a trip as lightweight rows, skipping GPS fixes"""
+        return db.session.query(
+            cls.id, cls.name, cls.address, cls.location_type,
+            cls.latitude, cls.longitude, cls.timestamp
+        ).filter(
+            cls.trip_id == trip_id,
+            cls.location_type.in_(WAYPOINT_TYPES),
+            cls.is_valid == True
+        ).order_by(cls.timestamp).all()
+    
+    def serialize(self, native=False):
+        """
+        Convert location to dictionary
+        With native=True, timestamps are left for the JSON provider to encode
+        """
+        data = {
             'id': self.id,
             'name': self.name,
             'description': self.description,
@@ -129,12 +149,13 @@ class Location(BaseModel):
             'city': self.city,
             'state': self.state,
             'country': self.country,
-            'timestamp': self.timestamp.isoformat() if self.timestamp else None,
+            'timestamp': self.timestamp,
             'location_type': self.location_type,
             'is_safe_zone': self.is_safe_zone,
             'notes': self.notes,
             'trip_id': self.trip_id
         }
+        return data if native else json_ready(data)
     
     def __repr__(self):
         return f'<Location {self.name} ({self.latitude}, {self.longitude})>'
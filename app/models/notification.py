@@ -45,6 +45,7 @@ class Notification(BaseModel):
     # Indexes
     __table_args__ = (
         db.Index('idx_notification_recipient', 'recipient_id'),
+        db.Index('idx_notification_recipient_unread', 'recipient_id', 'is_read'),
         db.Index('idx_notification_type', 'notification_type'),
         db.Index('idx_notification_read', 'is_read'),
         db.Index('idx_notification_priority', 'priority'),
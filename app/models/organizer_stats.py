@@ -0,0 +1,238 @@
+from datetime import datetime, date, timedelta
+from sqlalchemy import event, func, case, inspect, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from app.extensions import db
+
+# Participant statuses that count towards consent completion
+ACTIVE_PARTICIPANT_STATUSES = ('registered', 'confirmed')
+
+STAT_COLUMNS = (
+    'total_trips', 'upcoming_trips', 'confirmed_students',
+    'active_participants', 'consented_participants'
+)
+
+
+class OrganizerStats(db.Model):
+    """
+    Materialized teacher dashboard statistics, one row per organizer
+    Rows are marked stale whenever the organizer's trips, participants or
+    consents change and are recomputed on the next read.
+    """
+    __tablename__ = 'organizer_stats'
+
+    organizer_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+
+    # Statistics
+    total_trips = db.Column(db.Integer, default=0, nullable=False)
+    upcoming_trips = db.Column(db.Integer, default=0, nullable=False)
+    confirmed_students = db.Column(db.Integer, default=0, nullable=False)
+    active_participants = db.Column(db.Integer, default=0, nullable=False)
+    consented_participants = db.Column(db.Integer, default=0, nullable=False)
+
+    # Freshness
+    is_stale = db.Column(db.Boolean, default=False, nullable=False)
+    refreshed_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
+
+    @property
+    def consent_completion(self):
+        """Percentage of active participants with a signed consent"""
+        if not self.active_participants:
+            return 0
+        return round(self.consented_participants / self.active_participants * 100, 1)
+
+    def needs_refresh(self, max_age):
+        """Check if the row is stale or older than max_age seconds"""
+        return self.is_stale or self.refreshed_at < datetime.now() - timedelta(seconds=max_age)
+
+    @classmethod
+    def compute(cls, organizer_ids=None):
+        """
+        Aggregate statistics per organizer with three grouped queries
+        Returns a dict of organizer_id -> column values; organizers without
+        trips are missing from the result.
+        """
+        from app.models.trip import Trip
+        from app.models.participant import Participant
+        from app.models.consent import Consent
+
+        def scoped(query):
+            if organizer_ids is not None:
+                query = query.filter(Trip.organizer_id.in_(organizer_ids))
+            return query.group_by(Trip.organizer_id)
+
+        stats = {}
+
+        trip_rows = scoped(db.session.query(
+            Trip.organizer_id,
+            func.count(Trip.id),
+            func.sum(case(
+                ((Trip.start_date > date.today()) & Trip.status.in_(['active', 'draft']), 1),
+                else_=0
+            ))
+        ))
+        for organizer_id, total, upcoming in trip_rows:
+            stats[organizer_id] = dict.fromkeys(STAT_COLUMNS, 0)
+            stats[organizer_id]['total_trips'] = total
+            stats[organizer_id]['upcoming_trips'] = int(upcoming or 0)
+
+        participant_rows = scoped(db.session.query(
+            Trip.organizer_id,
+            func.sum(case((Participant.status == 'confirmed', 1), else_=0)),
+            func.sum(case((Participant.status.in_(ACTIVE_PARTICIPANT_STATUSES), 1), else_=0))
+        ).join(Participant, Participant.trip_id == Trip.id))
+        for organizer_id, confirmed, active in participant_rows:
+            stats[organizer_id]['confirmed_students'] = int(confirmed or 0)
+            stats[organizer_id]['active_participants'] = int(active or 0)
+
+        consent_rows = scoped(db.session.query(
+            Trip.organizer_id,
+            func.count(Participant.id.distinct())
+        ).join(Participant, Participant.trip_id == Trip.id).join(
+            Consent, Participant.id == Consent.participant_id
+        ).filter(
+            Consent.is_signed == True,
+            Participant.status.in_(ACTIVE_PARTICIPANT_STATUSES)
+        ))
+        for organizer_id, consented in consent_rows:
+            stats[organizer_id]['consented_participants'] = consented
+
+        return stats
+
+    @classmethod
+    def refresh(cls, organizer_ids, commit=True):
+        """Recompute and store the rows for the given organizers"""
+        organizer_ids = list(organizer_ids)
+        computed = cls.compute(organizer_ids)
+        existing = {
+            row.organizer_id: row
+            for row in cls.query.filter(cls.organizer_id.in_(organizer_ids)).all()
+        }
+
+        now = datetime.now()
+        rows = []
+        for organizer_id in organizer_ids:
+            row = existing.get(organizer_id) or cls._create(organizer_id)
+            values = computed.get(organizer_id) or dict.fromkeys(STAT_COLUMNS, 0)
+            for key, value in values.items():
+                setattr(row, key, value)
+            row.is_stale = False
+            row.refreshed_at = now
+            rows.append(row)
+
+        if commit:
+            db.session.commit()
+        return rows
+
+    @classmethod
+    def _create(cls, organizer_id):
+        """Insert an organizer's row, or lock the one a concurrent request inserted first"""
+        try:
+            with db.session.begin_nested():
+                row = cls(organizer_id=organizer_id)
+                db.session.add(row)
+            return row
+        except IntegrityError:
+            # A locking read sees the other transaction's committed row
+            return db.session.get(cls, organizer_id, with_for_update=True)
+
+    @classmethod
+    def get_for(cls, organizer_id, max_age):
+        """
+        Read an organizer's statistics by primary key
+        The row is recomputed first if it is missing, stale, or older than
+        max_age seconds.
+        """
+        row = db.session.get(cls, organizer_id)
+        if row is None or row.needs_refresh(max_age):
+            row = cls.refresh([organizer_id])[0]
+        return row
+
+    @classmethod
+    def mark_stale(cls, organizer_ids):
+        """Flag organizers' rows for recomputation on the next read"""
+        organizer_ids = list(organizer_ids)
+        if organizer_ids:
+            db.session.execute(
+                update(cls).where(cls.organizer_id.in_(organizer_ids)).values(is_stale=True)
+            )
+
+    def serialize(self):
+        return {
+            'upcoming_trips': self.upcoming_trips,
+            'confirmed_students': self.confirmed_students,
+            'consent_completion': self.consent_completion,
+            'total_trips': self.total_trips,
+            'refreshed_at': self.refreshed_at.isoformat() if self.refreshed_at else None
+        }
+
+    def __repr__(self):
+        return f'<OrganizerStats {self.organizer_id}>'
+
+
+def _mark_stale_by_ids(session, organizer_ids=(), trip_ids=(), participant_ids=()):
+    """Mark stats stale for organizers reached through the given ids"""
+    from app.models.trip import Trip
+    from app.models.participant import Participant
+
+    organizer_ids = set(organizer_ids) - {None}
+    trip_ids = set(trip_ids) - {None}
+    participant_ids = set(participant_ids) - {None}
+
+    conditions = []
+    if organizer_ids:
+        conditions.append(OrganizerStats.organizer_id.in_(organizer_ids))
+    if trip_ids:
+        conditions.append(OrganizerStats.organizer_id.in_(
+            select(Trip.organizer_id).where(Trip.id.in_(trip_ids))
+        ))
+    if participant_ids:
+        conditions.append(OrganizerStats.organizer_id.in_(
+            select(Trip.organizer_id).join(Participant, Participant.trip_id == Trip.id)
+            .where(Participant.id.in_(participant_ids))
+        ))
+
+    if conditions:
+        session.connection().execute(
+            update(OrganizerStats).where(db.or_(*conditions)).values(is_stale=True)
+        )
+
+
+@event.listens_for(Session, 'before_flush')
+def _mark_previous_owners_stale(session, flush_context, instances):
+    """Mark stats stale for organizers a trip or participant is moved away from"""
+    from app.models.trip import Trip
+    from app.models.participant import Participant
+
+    # The database still holds the old foreign keys at this point
+    moved_trip_ids = set()
+    moved_participant_ids = set()
+    for obj in session.dirty:
+        if isinstance(obj, Trip) and inspect(obj).attrs.organizer_id.history.has_changes():
+            moved_trip_ids.add(obj.id)
+        elif isinstance(obj, Participant) and inspect(obj).attrs.trip_id.history.has_changes():
+            moved_participant_ids.add(obj.id)
+
+    _mark_stale_by_ids(session, trip_ids=moved_trip_ids, participant_ids=moved_participant_ids)
+
+
+@event.listens_for(Session, 'after_flush')
+def _mark_organizer_stats_stale(session, flush_context):
+    """Mark stats stale for organizers whose trips, participants or consents changed"""
+    from app.models.trip import Trip
+    from app.models.participant import Participant
+    from app.models.consent import Consent
+
+    organizer_ids = set()
+    trip_ids = set()
+    participant_ids = set()
+
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Trip):
+            organizer_ids.add(obj.organizer_id)
+        elif isinstance(obj, Participant):
+            trip_ids.add(obj.trip_id)
+        elif isinstance(obj, Consent):
+            participant_ids.add(obj.participant_id)
+
+    _mark_stale_by_ids(session, organizer_ids, trip_ids, participant_ids)
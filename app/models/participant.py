@@ -1,7 +1,7 @@
 from datetime import datetime
-from sqlalchemy import Numeric
+from sqlalchemy import Numeric, func
 from app.extensions import db
-from app.models.base import BaseModel
+from app.models.base import BaseModel, json_ready
 
 class Participant(BaseModel):
     __tablename__ = 'participants'
@@ -44,6 +44,11 @@ class Participant(BaseModel):
                                       name='payment_status'), default='pending', nullable=False)
     amount_paid = db.Column(Numeric(10, 2), default=0)
     
+    # Consent Status (kept in sync by Consent.sign_consent / revoke_consent).
+    # A Consent inserted with is_signed=True bypasses those methods: set this
+    # flag alongside it, or run `flask sync-consent-flags` afterwards.
+    consent_complete = db.Column(db.Boolean, default=False, nullable=False)
+    
     # Special Notes
     special_requirements = db.Column(db.Text)
     internal_notes = db.Column(db.Text)  # For staff use only
@@ -60,8 +65,20 @@ class Participant(BaseModel):
         db.Index('idx_participant_trip', 'trip_id'),
         db.Index('idx_participant_status', 'status'),
         db.Index('idx_participant_payment_status', 'payment_status'),
+        db.Index('idx_participant_updated', 'updated_at', 'id'),
     )
     
+    @classmethod
+    def status_breakdown(cls, trip_id):
+        """Count a trip's participants per status with one grouped query"""
+        counts = dict(
+            db.session.query(cls.status, func.count(cls.id))
+            .filter(cls.trip_id == trip_id)
+            .group_by(cls.status)
+            .all()
+        )
+        return {status: counts.get(status, 0) for status in cls.__table__.c.status.type.enums}
+    
     @property
     def full_name(self):
         return f"{self.first_name} {self.last_name}"
@@ -106,17 +123,23 @@ class Participant(BaseModel):
         
         db.session.commit()
     
+    def refresh_consent_status(self):
+        """Recompute consent_complete from this participant's consent forms"""
+        self.consent_complete = self.consents.filter_by(is_signed=True).count() > 0
+    
     def has_all_consents(self):
         """Check if all required consents are signed"""
         if not self.trip or not self.trip.consent_required:
             return True
         
-        # Check for signed consent forms
-        signed_consents = self.consents.filter_by(is_signed=True).count()
-        return signed_consents > 0
-    
-    def serialize(self):
-        return {
+        return self.consent_complete
+    
+    def serialize(self, native=False):
+        """
+        Convert participant to dictionary
+        With native=True, dates and Decimals are left for the JSON provider to encode
+        """
+        data = {
             'id': self.id,
             'full_name': self.full_name,
             'first_name': self.first_name,
@@ -127,13 +150,14 @@ class Participant(BaseModel):
             'phone': self.phone,
             'status': self.status,
             'payment_status': self.payment_status,
-            'amount_paid': float(self.amount_paid) if self.amount_paid else 0,
+            'amount_paid': self.amount_paid or 0,
             'outstanding_balance': self.outstanding_balance,
-            'registration_date': self.registration_date.isoformat() if self.registration_date else None,
+            'registration_date': self.registration_date,
             'has_medical_info': bool(self.medical_conditions or self.medications or self.allergies),
             'has_all_consents': self.has_all_consents(),
             'trip_id': self.trip_id
         }
+        return data if native else json_ready(data)
     
     def __repr__(self):
         return f'<Participant {self.full_name}>'
@@ -44,6 +44,7 @@ class Payment(BaseModel):
         db.Index('idx_payment_method', 'payment_method'),
         db.Index('idx_payment_transaction', 'transaction_id'),
         db.Index('idx_payment_date', 'payment_date'),
+        db.Index('idx_payment_updated', 'updated_at', 'id'),
     )
     
     def mark_completed(self, transaction_id=None, processor_response=None):
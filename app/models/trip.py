@@ -1,5 +1,6 @@
 from datetime import datetime, date
-from sqlalchemy import Numeric
+from sqlalchemy import Numeric, event, func
+from sqlalchemy.orm.attributes import set_committed_value
 from app.extensions import db
 from app.models.base import BaseModel
 
@@ -51,6 +52,7 @@ class Trip(BaseModel):
         db.Index('idx_trip_destination', 'destination'),
         db.Index('idx_trip_category', 'category'),
         db.Index('idx_trip_price', 'price_per_student'),
+        db.Index('idx_trip_updated', 'updated_at', 'id'),
     )
     
     @property
@@ -60,9 +62,14 @@ class Trip(BaseModel):
             return (self.end_date - self.start_date).days + 1
         return 0
     
+    # Confirmed count set by preload_for_serialization, dropped on expire
+    _confirmed_count = None
+    
     @property
     def current_participants(self):
         """Get current number of participants"""
+        if self._confirmed_count is not None:
+            return self._confirmed_count
         return len([p for p in self.participants if p.status == 'confirmed'])
     
     @property
@@ -104,13 +111,53 @@ class Trip(BaseModel):
     
     def get_total_revenue(self):
         """Calculate total revenue from confirmed bookings"""
-        confirmed_participants = len([p for p in self.participants if p.status == 'confirmed'])
-        return float(float(confirmed_participants) * float(self.price_per_student))
+        return float(float(self.current_participants) * float(self.price_per_student))
     
     def get_confirmed_vendor_bookings(self):
         """Get all confirmed vendor bookings for this trip"""
         return self.bookings.filter_by(status='confirmed').all()
     
+    @classmethod
+    def preload_for_serialization(cls, trips):
+        """
+        Batch-load what serialize() needs for a list of trips
+        Organizers come from one IN query and confirmed participant counts
+        from one grouped query, instead of two lazy loads per trip.
+        """
+        from app.models.user import User
+        from app.models.participant import Participant
+        
+        trips = list(trips)
+        if not trips:
+            return trips
+        
+        organizer_ids = {trip.organizer_id for trip in trips}
+        organizers = {
+            user.id: user
+            for user in User.query.filter(User.id.in_(organizer_ids)).all()
+        }
+        
+        counts = dict(
+            db.session.query(Participant.trip_id, func.count(Participant.id))
+            .filter(
+                Participant.trip_id.in_([trip.id for trip in trips]),
+                Participant.status == 'confirmed'
+            )
+            .group_by(Participant.trip_id)
+            .all()
+        )
+        
+        for trip in trips:
+            set_committed_value(trip, 'organizer', organizers.get(trip.organizer_id))
+            trip._confirmed_count = counts.get(trip.id, 0)
+        
+        return trips
+    
+    @classmethod
+    def serialize_many(cls, trips):
+        """Serialize a list of trips with a fixed number of queries"""
+        return [trip.serialize() for trip in cls.preload_for_serialization(trips)]
+    
     def serialize(self):
         return {
             'id': self.id,
@@ -134,4 +181,10 @@ class Trip(BaseModel):
         }
     
     def __repr__(self):
-        return f'<Trip {self.title}>'
\ No newline at end of file
+        return f'<Trip {self.title}>'
+
+
+@event.listens_for(Trip, 'expire')
+def _clear_preloaded_counts(target, attrs):
+    """Drop the preloaded confirmed count whenever the trip is expired"""
+    target.__dict__.pop('_confirmed_count', None)
@@ -1,8 +1,35 @@
 from datetime import datetime
 from flask_login import UserMixin
 from werkzeug.security import generate_password_hash, check_password_hash
+from sqlalchemy import event, func
 from app.extensions import db
 from app.models.base import BaseModel
+from app.utils.memo import request_memoize
+
+
+@request_memoize
+def _count_organizer_students(user_id):
+    """Count participants across all trips organized by a user"""
+    from app.models.trip import Trip
+    from app.models.participant import Participant
+    return db.session.query(func.count(Participant.id)).join(
+        Trip, Participant.trip_id == Trip.id
+    ).filter(Trip.organizer_id == user_id).scalar() or 0
+
+
+@request_memoize
+def _average_vendor_rating(user_id):
+    """Average booking rating of the vendor profile owned by a user"""
+    from app.models.vendor import Vendor
+    from app.models.booking import Booking
+    average = db.session.query(func.avg(Booking.rating)).join(
+        Vendor, Booking.vendor_id == Vendor.id
+    ).filter(
+        Vendor.user_id == user_id,
+        Booking.rating.isnot(None)
+    ).scalar()
+    return float(average) if average is not None else 0.0
+
 
 class User(UserMixin, BaseModel):
     __tablename__ = 'users'
@@ -36,6 +63,9 @@ class User(UserMixin, BaseModel):
     password_reset_expires = db.Column(db.DateTime)
     email_verification_token = db.Column(db.String(100))
     
+    # Lowercased names and email for admin user search
+    search_text = db.Column(db.String(300))
+    
     # Relationships
     organized_trips = db.relationship('Trip', backref='organizer', lazy='dynamic', 
                                     foreign_keys='Trip.organizer_id')
@@ -53,6 +83,12 @@ class User(UserMixin, BaseModel):
         db.Index('idx_user_email', 'email'),
         db.Index('idx_user_role', 'role'),
         db.Index('idx_user_active', 'is_active'),
+        # Admin user list: newest first, optionally by role; prefix search on names
+        db.Index('idx_user_created', 'created_at', 'id'),
+        db.Index('idx_user_role_created', 'role', 'created_at', 'id'),
+        db.Index('idx_user_first_name', 'first_name'),
+        db.Index('idx_user_last_name', 'last_name'),
+        db.Index('idx_user_search_text', 'search_text', mysql_prefix='FULLTEXT'),
     )
     
     @property
@@ -100,40 +136,32 @@ class User(UserMixin, BaseModel):
         """Get total number of students for teacher"""
         if not self.is_teacher():
             return 0
-        return sum(trip.participants.count() for trip in self.organized_trips)
+        return _count_organizer_students(self.id)
     
     def get_average_rating(self):
         """Get average rating for vendor"""
-        if not self.vendor_profile:
-            return 0.0
-        
-        ratings = [booking.rating for booking in self.vendor_profile.bookings 
-                  if booking.rating is not None]
-        return sum(ratings) / len(ratings) if ratings else 0.0
+        return _average_vendor_rating(self.id)
     
     def get_upcoming_trips_count(self):
         """Get count of upcoming trips for parent"""
         if not self.is_parent():
             return 0
         
-        upcoming_count = 0
-        for consent in self.consents:
-            if consent.participant and consent.participant.trip:
-                trip = consent.participant.trip
-                if trip.start_date and trip.start_date > datetime.now().date():
-                    upcoming_count += 1
-        return upcoming_count
+        from app.parent_comm.loaders import get_parent_home
+        return get_parent_home(self.id).upcoming_trips_count
+    
     def get_children_count(self):
         """Get total number of unique children (participants) for parent"""
         if not self.is_parent():
             return 0
         
-        unique_participant_ids = set()
-        for consent in self.consents:
-            if consent.participant_id:
-                unique_participant_ids.add(consent.participant_id)
-        
-        return len(unique_participant_ids)
+        from app.parent_comm.loaders import get_parent_home
+        return get_parent_home(self.id).children_count
+
+    def build_search_text(self):
+        """Text matched by admin user search"""
+        parts = [self.first_name, self.last_name, self.email]
+        return ' '.join(part for part in parts if part).lower()
 
     def serialize(self):
         return {
@@ -153,4 +181,11 @@ class User(UserMixin, BaseModel):
         }
     
     def __repr__(self):
-        return f'<User {self.email}>'
\ No newline at end of file
+        return f'<User {self.email}>'
+
+
+@event.listens_for(User, 'before_insert')
+@event.listens_for(User, 'before_update')
+def _refresh_search_text(mapper, connection, target):
+    """Keep search_text in step with the fields it is built from"""
+    target.search_text = target.build_search_text()
@@ -1,4 +1,4 @@
-from sqlalchemy import Numeric
+from sqlalchemy import Numeric, Float, bindparam, case, cast, event, func, update
 from app.extensions import db
 from app.models.base import BaseModel
 
@@ -37,11 +37,15 @@ class Vendor(BaseModel):
     # Status and Verification
     is_verified = db.Column(db.Boolean, default=False)
     is_active = db.Column(db.Boolean, default=True)
-    verification_documents = db.Column(db.JSON)  # Store document file paths
+    verification_documents = db.Column(db.JSON)  # [{'key', 'filename', 'type'}] of stored uploads
     
     # Ratings and Reviews
     average_rating = db.Column(db.Float, default=0.0)
     total_reviews = db.Column(db.Integer, default=0)
+    rating_sum = db.Column(db.Integer, default=0, nullable=False)  # Running sum behind average_rating
+    
+    # Lowercased name, description, specializations and location for directory search
+    search_text = db.Column(db.Text)
     
     # Foreign Keys
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
@@ -55,6 +59,9 @@ class Vendor(BaseModel):
         db.Index('idx_vendor_active', 'is_active'),
         db.Index('idx_vendor_verified', 'is_verified'),
         db.Index('idx_vendor_city', 'city'),
+        db.Index('idx_vendor_directory', 'is_active', 'is_verified', 'average_rating'),
+        db.Index('idx_vendor_updated', 'updated_at', 'id'),
+        db.Index('idx_vendor_search_text', 'search_text', mysql_prefix='FULLTEXT'),
     )
     
     @property
@@ -70,21 +77,114 @@ class Vendor(BaseModel):
         ]
         return ', '.join([part for part in parts if part])
     
-    def update_rating(self):
-        """Recalculate average rating based on bookings"""
+    @classmethod
+    def apply_rating_change(cls, vendor_id, old_rating=None, new_rating=None):
+        """
+        Atomically adjust a vendor's running rating totals in SQL
+        old_rating is the rating being replaced or removed (None if the booking
+        had no counted review), new_rating the one replacing it (None on removal).
+        """
+        sum_delta = (new_rating or 0) - (old_rating or 0)
+        count_delta = (new_rating is not None) - (old_rating is not None)
+        if not sum_delta and not count_delta:
+            return
+        
+        new_sum = cls.rating_sum + sum_delta
+        new_count = func.coalesce(cls.total_reviews, 0) + count_delta
+        
+        # average_rating is assigned first so MySQL, which evaluates SET
+        # left to right, still sees the old sum and count
+        db.session.execute(
+            update(cls)
+            .where(cls.id == vendor_id)
+            .ordered_values(
+                (cls.average_rating, case(
+                    (new_count > 0, cast(new_sum, Float) / new_count),
+                    else_=0.0
+                )),
+                (cls.rating_sum, new_sum),
+                (cls.total_reviews, new_count)
+            )
+            .execution_options(synchronize_session=False)
+        )
+    
+    @classmethod
+    def _rating_totals(cls, vendor_ids=None):
+        """Sum and count of counted reviews per vendor, in one grouped query"""
         from app.models import Booking
-        completed_bookings = self.bookings.filter(
-            db.and_(Booking.status == 'completed', Booking.rating.isnot(None))
-        ).all()
+        query = db.session.query(
+            Booking.vendor_id,
+            func.coalesce(func.sum(Booking.rating), 0),
+            func.count(Booking.id)
+        ).filter(
+            Booking.status == 'completed',
+            Booking.rating.isnot(None)
+        )
+        if vendor_ids is not None:
+            query = query.filter(Booking.vendor_id.in_(vendor_ids))
+        return {
+            vendor_id: (int(rating_sum), count)
+            for vendor_id, rating_sum, count in query.group_by(Booking.vendor_id)
+        }
+    
+    @classmethod
+    def reconcile_ratings(cls):
+        """
+        Recompute rating totals for every vendor from their bookings
+        Returns the number of vendors whose stored totals were wrong.
+        """
+        totals = cls._rating_totals()
         
-        if completed_bookings:
-            total_rating = sum(booking.rating for booking in completed_bookings)
-            self.average_rating = total_rating / len(completed_bookings)
-            self.total_reviews = len(completed_bookings)
-        else:
-            self.average_rating = 0.0
-            self.total_reviews = 0
+        updates = []
+        for vendor_id, rating_sum, total_reviews, average_rating in db.session.query(
+            cls.id, cls.rating_sum, cls.total_reviews, cls.average_rating
+        ):
+            expected_sum, expected_count = totals.get(vendor_id, (0, 0))
+            expected_average = expected_sum / expected_count if expected_count else 0.0
+            if (rating_sum, total_reviews) != (expected_sum, expected_count) or \
+                    abs((average_rating or 0.0) - expected_average) > 1e-9:
+                updates.append({
+                    'vendor_id': vendor_id,
+                    'rating_sum': expected_sum,
+                    'total_reviews': expected_count,
+                    'average_rating': expected_average
+                })
         
+        if updates:
+            db.session.execute(
+                update(cls.__table__)
+                .where(cls.__table__.c.id == bindparam('vendor_id'))
+                .values(
+                    rating_sum=bindparam('rating_sum'),
+                    total_reviews=bindparam('total_reviews'),
+                    average_rating=bindparam('average_rating')
+                ),
+                updates
+            )
+        db.session.commit()
+        return len(updates)
+    
+    def build_search_text(self):
+        """Text matched by directory search"""
+        specializations = self.specializations or []
+        if isinstance(specializations, str):
+            specializations = [specializations]
+        parts = [
+            self.business_name,
+            self.business_type,
+            self.description,
+            ' '.join(str(item) for item in specializations),
+            self.city,
+            self.state
+        ]
+        return ' '.join(part for part in parts if part).lower()
+    
+    def update_rating(self):
+        """Recalculate average rating based on bookings"""
+        rating_sum, total_reviews = self._rating_totals([self.id]).get(self.id, (0, 0))
+        self.rating_sum = rating_sum
+        self.total_reviews = total_reviews
+        self.average_rating = rating_sum / total_reviews if total_reviews else 0.0
         db.session.commit()
     
     def is_available(self, start_date, end_date):
@@ -108,15 +208,16 @@ class Vendor(BaseModel):
     def get_revenue_for_period(self, start_date, end_date):
         """Calculate revenue for a given period"""
         from app.models import Booking, Trip
-        bookings = self.bookings.join(Trip).filter(
-            db.and_(
-                Booking.status == 'completed',
-                Trip.start_date >= start_date,
-                Trip.end_date <= end_date
-            )
-        ).all()
+        total = db.session.query(
+            func.sum(func.coalesce(Booking.final_amount, Booking.quoted_amount))
+        ).join(Trip, Booking.trip_id == Trip.id).filter(
+            Booking.vendor_id == self.id,
+            Booking.status == 'completed',
+            Trip.start_date >= start_date,
+            Trip.end_date <= end_date
+        ).scalar()
         
-        return sum(booking.total_amount for booking in bookings if booking.total_amount)
+        return total or 0
     
     def serialize(self):
         return {
@@ -142,4 +243,11 @@ class Vendor(BaseModel):
         }
     
     def __repr__(self):
-        return f'<Vendor {self.business_name}>'
\ No newline at end of file
+        return f'<Vendor {self.business_name}>'
+
+
+@event.listens_for(Vendor, 'before_insert')
+@event.listens_for(Vendor, 'before_update')
+def _refresh_search_text(mapper, connection, target):
+    """Keep search_text in step with the fields it is built from"""
+    target.search_text = target.build_search_text()
@@ -0,0 +1,116 @@
+from datetime import date
+from decimal import Decimal
+from sqlalchemy import Numeric, extract, func, update
+from sqlalchemy.exc import IntegrityError
+from app.extensions import db
+
+
+class VendorRevenueRollup(db.Model):
+    """
+    Completed booking revenue per vendor per calendar month
+    Rows are incremented when a booking is completed, so revenue reports
+    read a handful of rows instead of scanning the vendor's booking history.
+    """
+    __tablename__ = 'vendor_revenue_rollups'
+
+    vendor_id = db.Column(db.Integer, db.ForeignKey('vendors.id'), primary_key=True)
+    period = db.Column(db.Date, primary_key=True)  # First day of the month
+
+    completed_bookings = db.Column(db.Integer, default=0, nullable=False)
+    revenue = db.Column(Numeric(12, 2), default=0, nullable=False)
+
+    @staticmethod
+    def period_for(value):
+        """First day of the month containing value"""
+        return date(value.year, value.month, 1)
+
+    @classmethod
+    def record(cls, vendor_id, completed_on, amount):
+        """
+        Add one completed booking to its vendor's monthly rollup
+        Uses an atomic UPDATE so concurrent completions cannot lose
+        increments; the row is inserted on the month's first completion.
+        Runs in the caller's transaction.
+        """
+        period = cls.period_for(completed_on)
+        amount = Decimal(str(amount or 0))
+
+        stmt = update(cls).where(
+            cls.vendor_id == vendor_id,
+            cls.period == period
+        ).values(
+            completed_bookings=cls.completed_bookings + 1,
+            revenue=cls.revenue + amount
+        ).execution_options(synchronize_session=False)
+
+        if db.session.execute(stmt).rowcount:
+            return
+
+        try:
+            with db.session.begin_nested():
+                db.session.add(cls(
+                    vendor_id=vendor_id,
+                    period=period,
+                    completed_bookings=1,
+                    revenue=amount
+                ))
+        except IntegrityError:
+            # Another transaction created the row first
+            db.session.execute(stmt)
+
+    @classmethod
+    def compute(cls, vendor_ids=None):
+        """
+        Aggregate completed bookings by vendor and month in one grouped query
+        Returns a dict of (vendor_id, period) -> (completed_bookings, revenue).
+        """
+        from app.models.booking import Booking
+
+        year = extract('year', Booking.completed_date)
+        month = extract('month', Booking.completed_date)
+        query = db.session.query(
+            Booking.vendor_id,
+            year,
+            month,
+            func.count(Booking.id),
+            func.sum(func.coalesce(Booking.final_amount, Booking.quoted_amount, 0))
+        ).filter(
+            Booking.status == 'completed',
+            Booking.completed_date.isnot(None)
+        )
+        if vendor_ids is not None:
+            query = query.filter(Booking.vendor_id.in_(vendor_ids))
+
+        return {
+            (vendor_id, date(int(row_year), int(row_month), 1)): (count, Decimal(str(revenue or 0)))
+            for vendor_id, row_year, row_month, count, revenue in query.group_by(Booking.vendor_id, year, month)
+        }
+
+    @classmethod
+    def rebuild(cls, vendor_ids=None, commit=True):
+        """Replace the rollup rows for the given vendors (all when None) from bookings"""
+        totals = cls.compute(vendor_ids)
+
+        delete = cls.query
+        if vendor_ids is not None:
+            delete = delete.filter(cls.vendor_id.in_(vendor_ids))
+        delete.delete(synchronize_session=False)
+
+        db.session.add_all([
+            cls(vendor_id=vendor_id, period=period, completed_bookings=count, revenue=revenue)
+            for (vendor_id, period), (count, revenue) in totals.items()
+        ])
+
+        if commit:
+            db.session.commit()
+        return len(totals)
+
+    def serialize(self):
+        return {
+            'period': self.period.strftime('%Y-%m'),
+            'completed_bookings': self.completed_bookings,
+            'revenue': float(self.revenue or 0)
+        }
+
+    def __repr__(self):
+        return f'<VendorRevenueRollup {self.vendor_id} {self.period}>'
@@ -0,0 +1,139 @@
+from datetime import datetime
+from sqlalchemy import Numeric
+from app.extensions import db
+
+# Analytics warehouse: a small star schema loaded by the `etl-warehouse`
+# command from the live tables (see app/admin/warehouse.py). Rows carry the
+# source ids but no foreign keys, so the warehouse keeps history and never
+# takes locks on the tables trips are writing to.
+
+
+class EtlWatermark(db.Model):
+    """Highest source updated_at loaded into the warehouse, per source table"""
+    __tablename__ = 'etl_watermarks'
+
+    source = db.Column(db.String(50), primary_key=True)
+    high_water = db.Column(db.DateTime)
+    rows_loaded = db.Column(db.Integer, default=0, nullable=False)
+    run_at = db.Column(db.DateTime, default=datetime.now, nullable=False)
+
+    def __repr__(self):
+        return f'<EtlWatermark {self.source} {self.high_water}>'
+
+
+class TripDimension(db.Model):
+    """One row per trip"""
+    __tablename__ = 'dim_trips'
+
+    trip_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    title = db.Column(db.String(200), nullable=False)
+    destination = db.Column(db.String(200), nullable=False)
+    category = db.Column(db.String(50))
+    organizer_id = db.Column(db.Integer, nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    start_date = db.Column(db.Date, nullable=False)
+    end_date = db.Column(db.Date, nullable=False)
+    price_per_student = db.Column(Numeric(10, 2), nullable=False)
+    max_participants = db.Column(db.Integer, nullable=False)
+    source_updated_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index('idx_dim_trip_status_start', 'status', 'start_date'),
+    )
+
+
+class VendorDimension(db.Model):
+    """One row per vendor"""
+    __tablename__ = 'dim_vendors'
+
+    vendor_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    business_name = db.Column(db.String(200), nullable=False)
+    business_type = db.Column(db.String(100))
+    city = db.Column(db.String(100))
+    contact_phone = db.Column(db.String(20))
+    is_verified = db.Column(db.Boolean, default=False, nullable=False)
+    is_active = db.Column(db.Boolean, default=True, nullable=False)
+    average_rating = db.Column(db.Float, default=0.0, nullable=False)
+    source_updated_at = db.Column(db.DateTime, nullable=False)
+
+
+class ParticipantFact(db.Model):
+    """One row per participant, with their payment position"""
+    __tablename__ = 'fact_participants'
+
+    participant_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    trip_id = db.Column(db.Integer, nullable=False)
+    registration_date = db.Column(db.Date)
+    status = db.Column(db.String(20), nullable=False)
+    payment_status = db.Column(db.String(20), nullable=False)
+    amount_paid = db.Column(Numeric(10, 2), default=0, nullable=False)
+    source_updated_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index('idx_fact_participant_trip', 'trip_id', 'status'),
+        db.Index('idx_fact_participant_updated', 'source_updated_at'),
+    )
+
+
+class PaymentFact(db.Model):
+    """One row per payment"""
+    __tablename__ = 'fact_payments'
+
+    payment_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    trip_id = db.Column(db.Integer)
+    participant_id = db.Column(db.Integer)
+    booking_id = db.Column(db.Integer)
+    payment_date = db.Column(db.Date)
+    amount = db.Column(Numeric(10, 2), nullable=False)
+    currency = db.Column(db.String(3), nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    payment_method = db.Column(db.String(50), nullable=False)
+    payer_name = db.Column(db.String(100))
+    source_updated_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index('idx_fact_payment_date', 'payment_date'),
+        db.Index('idx_fact_payment_trip', 'trip_id'),
+        db.Index('idx_fact_payment_updated', 'source_updated_at'),
+    )
+
+
+class BookingFact(db.Model):
+    """One row per vendor booking"""
+    __tablename__ = 'fact_vendor_bookings'
+
+    booking_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    vendor_id = db.Column(db.Integer, nullable=False)
+    trip_id = db.Column(db.Integer, nullable=False)
+    booking_type = db.Column(db.String(50), nullable=False)
+    status = db.Column(db.String(20), nullable=False)
+    booking_date = db.Column(db.Date)
+    completed_date = db.Column(db.Date)
+    amount = db.Column(Numeric(10, 2), default=0, nullable=False)  # Final amount, else quoted
+    rating = db.Column(db.Integer)
+    source_updated_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index('idx_fact_booking_vendor_status', 'vendor_id', 'status'),
+        db.Index('idx_fact_booking_completed', 'completed_date'),
+    )
+
+
+class TripDailyFact(db.Model):
+    """
+    Registrations and payments per trip per day
+    Derived from the participant and payment facts for the trips each ETL
+    run touched, never from the live tables.
+    """
+    __tablename__ = 'fact_trip_daily'
+
+    trip_id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    day = db.Column(db.Date, primary_key=True)
+
+    registrations = db.Column(db.Integer, default=0, nullable=False)
+    payments = db.Column(db.Integer, default=0, nullable=False)  # Completed payments
+    revenue = db.Column(Numeric(12, 2), default=0, nullable=False)
+
+    __table_args__ = (
+        db.Index('idx_fact_trip_daily_day', 'day'),
+    )
@@ -0,0 +1,123 @@
+"""
+Parent portal view models
+
+load_parent_home fetches everything the parent pages show about a parent's
+children with three set-based queries: participants joined with their trips,
+the trip participation consents for those participants, and the parent's
+unread notification counts grouped by trip in SQL.
+"""
+from dataclasses import dataclass, field
+from datetime import date
+from functools import cached_property
+from typing import List, Optional
+from sqlalchemy import distinct, func
+from sqlalchemy.orm import contains_eager
+
+from app.extensions import db
+from app.models.trip import Trip
+from app.models.participant import Participant
+from app.models.consent import Consent
+from app.models.notification import Notification
+from app.utils.memo import request_memoize
+
+
+@dataclass
+class ChildTrip:
+    """One child registered on one trip"""
+    trip: Trip
+    participant: Participant
+    consent: Optional[Consent]
+    unread_notifications: int = 0
+
+    @property
+    def consent_status(self):
+        return 'signed' if self.consent and self.consent.is_signed else 'pending'
+
+    @property
+    def payment_status(self):
+        return self.participant.payment_status
+
+    @property
+    def outstanding_balance(self):
+        return self.participant.outstanding_balance
+
+    @property
+    def is_upcoming(self):
+        return bool(self.trip.start_date and self.trip.start_date > date.today())
+
+
+@dataclass
+class ParentHome:
+    """Everything the parent dashboard, trips page and navbar need"""
+    parent_id: int
+    children: List[ChildTrip] = field(default_factory=list)
+    unread_total: int = 0
+
+    @cached_property
+    def children_count(self):
+        """Participants the parent has consent forms for; queried on first use"""
+        return db.session.query(func.count(distinct(Consent.participant_id))).filter(
+            Consent.parent_id == self.parent_id
+        ).scalar() or 0
+
+    @property
+    def upcoming_trips_count(self):
+        return len({child.trip.id for child in self.children if child.is_upcoming})
+
+    @property
+    def pending_consents_count(self):
+        return sum(
+            1 for child in self.children
+            if child.trip.consent_required and child.consent_status == 'pending'
+        )
+
+    @property
+    def outstanding_balance(self):
+        return sum(child.outstanding_balance for child in self.children)
+
+
+def load_parent_home(parent_id):
+    """Load a parent's children, trips, consent state and unread counts"""
+    participants = db.session.query(Participant).join(
+        Trip, Participant.trip_id == Trip.id
+    ).options(
+        contains_eager(Participant.trip)
+    ).filter(
+        Participant.user_id == parent_id
+    ).order_by(Trip.start_date, Participant.id).all()
+
+    consents = {}
+    if participants:
+        rows = Consent.query.filter(
+            Consent.participant_id.in_([p.id for p in participants]),
+            Consent.consent_type == 'trip_participation'
+        ).order_by(Consent.id).all()
+        for consent in rows:
+            consents.setdefault(consent.participant_id, consent)
+
+    # Unread notifications counted per trip in the database; the total is the
+    # sum over every group, including notifications without a trip
+    trip_id = Notification.related_data['trip_id'].as_integer()
+    unread_rows = db.session.query(trip_id, func.count(Notification.id)).filter(
+        Notification.recipient_id == parent_id,
+        Notification.is_read == False
+    ).group_by(trip_id).all()
+    unread_by_trip = {row_trip_id: count for row_trip_id, count in unread_rows if row_trip_id is not None}
+
+    children = [
+        ChildTrip(
+            trip=participant.trip,
+            participant=participant,
+            consent=consents.get(participant.id),
+            unread_notifications=unread_by_trip.get(participant.trip_id, 0)
+        )
+        for participant in participants
+    ]
+    return ParentHome(parent_id=parent_id, children=children,
+                      unread_total=sum(count for _, count in unread_rows))
+
+
+@request_memoize
+def get_parent_home(parent_id):
+    """load_parent_home, memoized for the current request"""
+    return load_parent_home(parent_id)
@@ -17,13 +17,16 @@ from app.models.notification import Notification
 from app.utils import send_email, send_sms  # External helpers
 from .forms import ConsentForm, NotificationForm
 from app.parent_comm import parent_comm_bp
+from app.parent_comm.loaders import get_parent_home
 from app.utils.utils import roles_required
+from app.utils.documents import pdf_response
+from app.trips.paperwork import CONSENT_TEMPLATE, consent_version
 
 @parent_comm_bp.route('/dashboard')
 @login_required
 @roles_required('parent')
 def dashboard():
-    return render_template('parent_comm/dashboard.html')
+    return render_template('parent_comm/dashboard.html', home=get_parent_home(current_user.id))
 
 
 @parent_comm_bp.route('/trips')
@@ -34,37 +37,8 @@ def parent_trips():
         flash('Access denied. Parent access required.', 'error')
         return redirect(url_for('main.index'))
     
-    # Get all participants registered by this parent
-    participants = Participant.query.filter_by(user_id=current_user.id).all()
-    
-    # Organize data by trip
-    trips_data = []
-    for participant in participants:
-        trip = participant.trip
-        if trip:
-            # Check consent status
-            consent = Consent.query.filter_by(
-                participant_id=participant.id,
-                consent_type='trip_participation'
-            ).first()
-            
-            # Count unread notifications for this trip
-            unread_notifications = Notification.query.filter_by(
-                recipient_id=current_user.id,
-                is_read=False
-            ).filter(
-                Notification.related_data.contains({'trip_id': trip.id})
-            ).count()
-            
-            trips_data.append({
-                'trip': trip,
-                'participant': participant,
-                'consent': consent,
-                'consent_status': 'signed' if consent and consent.is_signed else 'pending',
-                'payment_status': participant.payment_status,
-                'outstanding_balance': participant.outstanding_balance,
-                'unread_notifications': unread_notifications
-            })
+    # Children, trips, consents and unread counts in three queries
+    trips_data = get_parent_home(current_user.id).children
     
     return render_template(
         'parent_comm/parent_trips.html',
@@ -343,7 +317,7 @@ def send_notification():
 @parent_comm_bp.route('/consent-pdf/<int:participant_id>')
 @login_required
 def consent_pdf(participant_id):
-    """Generate printable consent form"""
+    """Download the signed consent form as PDF"""
     if current_user.role != 'parent':
         flash('Access denied. Parent access required.', 'error')
         return redirect(url_for('main.index'))
@@ -366,11 +340,14 @@ def consent_pdf(participant_id):
         flash('No signed consent found for this participant.', 'error')
         return redirect(url_for('parent_comm.parent_trips'))
     
-    return render_template(
-        'parent_comm/snippets/consent_pdf.html',
+    trip = participant.trip
+    return pdf_response(
+        CONSENT_TEMPLATE,
+        consent_version(consent, participant, trip),
+        f'consent_{participant.id}_{trip.id}.pdf',
         participant=participant,
         consent=consent,
-        trip=participant.trip
+        trip=trip
     )
 
 
@@ -1,14 +1,14 @@
 import os
 from flask import render_template, redirect, url_for, flash, request, current_app, abort
 from flask_login import login_required, current_user
-from werkzeug.utils import secure_filename
-from PIL import Image
 from app.profiles import profiles_bp
 from app.profiles.forms import ProfileForm, ChangePasswordForm
 from app.models import User
 from app.extensions import db
 from app.utils import roles_required
-import uuid
+from app.utils.images import save_upload, InvalidUpload, CONTENT_KEY
+from app.utils.pagination import InvalidCursor
+from app.profiles.search import search_users, USER_ROLES
 
 # Allowed file extensions for profile pictures
 ALLOWED_EXTENSIONS = {'png', 'jpg', 'jpeg', 'gif'}
@@ -17,15 +17,6 @@ def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
-def resize_image(image_path, max_size=(300, 300)):
-    """Resize uploaded image to maximum dimensions"""
-    try:
-        with Image.open(image_path) as img:
-            img.thumbnail(max_size, Image.Resampling.LANCZOS)
-            img.save(image_path, optimize=True, quality=85)
-    except Exception as e:
-        current_app.logger.error(f"Error resizing image: {e}")
-
 @profiles_bp.route('/profile')
 @login_required
 def profile_view():
@@ -48,38 +39,29 @@ def profile_edit():
         current_user.emergency_contact = form.emergency_contact.data
         current_user.emergency_phone = form.emergency_phone.data
         
-        # Handle profile picture upload
+        # Handle profile picture upload; renditions are generated by the image workers
         if form.profile_picture.data:
             file = form.profile_picture.data
-            if file and allowed_file(file.filename):
-                # Generate unique filename
-                filename = secure_filename(file.filename)
-                unique_filename = f"{uuid.uuid4().hex}_{filename}"
-                
-                # Create uploads directory if it doesn't exist
-                upload_folder = os.path.join(current_app.static_folder, 'uploads', 'profiles')
-                os.makedirs(upload_folder, exist_ok=True)
-                
-                # Save file
-                file_path = os.path.join(upload_folder, unique_filename)
-                file.save(file_path)
-                
-                # Resize image
-                resize_image(file_path)
-                
-                # Remove old profile picture if it exists
-                if current_user.profile_picture and current_user.profile_picture != 'default.png':
-                    old_path = os.path.join(upload_folder, current_user.profile_picture)
-                    if os.path.exists(old_path):
-                        try:
-                            os.remove(old_path)
-                        except OSError:
-                            pass
-                
-                current_user.profile_picture = unique_filename
-            else:
+            try:
+                if not (file and allowed_file(file.filename)):
+                    raise InvalidUpload('Unsupported file type')
+                upload = save_upload(file, 'profile')
+            except InvalidUpload:
                 flash('Invalid file type. Please upload PNG, JPG, JPEG, or GIF files only.', 'error')
                 return render_template('profiles/profile_edit.html', form=form)
+            
+            # Remove an old picture stored before the image pipeline; content-addressed
+            # files may be shared with other uploads and are kept
+            old_picture = current_user.profile_picture
+            if old_picture and old_picture != 'default.png' and not CONTENT_KEY.match(old_picture):
+                old_path = os.path.join(current_app.static_folder, 'uploads', 'profiles', old_picture)
+                if os.path.exists(old_path):
+                    try:
+                        os.remove(old_path)
+                    except OSError:
+                        pass
+            
+            current_user.profile_picture = upload.key
         
         try:
             db.session.commit()
@@ -131,25 +113,15 @@ def admin_user_view(user_id):
 @roles_required('admin')
 def admin_users_list():
     """Admin-only list of all users"""
-    page = request.args.get('page', 1, type=int)
     search = request.args.get('search', '', type=str)
     role_filter = request.args.get('role', '', type=str)
+    if role_filter not in USER_ROLES:
+        role_filter = ''
     
-    query = User.query
-    
-    if search:
-        query = query.filter(
-            (User.first_name.contains(search)) |
-            (User.last_name.contains(search)) |
-            (User.email.contains(search))
-        )
-    
-    if role_filter:
-        query = query.filter(User.role == role_filter)
-    
-    users = query.order_by(User.created_at.desc()).paginate(
-        page=page, per_page=20, error_out=False
-    )
+    try:
+        users = search_users(search, role_filter, cursor=request.args.get('cursor') or None, per_page=20)
+    except InvalidCursor:
+        return redirect(url_for('profiles.admin_users_list', search=search, role=role_filter))
     
     return render_template('profiles/admin_users_list.html', 
                          users=users, search=search, role_filter=role_filter)
@@ -0,0 +1,67 @@
+"""
+Admin user search
+
+Every match is anchored at the start of a word so it can use an index:
+searches containing '@' are email prefixes (idx_user_email); otherwise
+each word must start a first name, last name or email. On MySQL the words
+go to a FULLTEXT prefix match on User.search_text; elsewhere each is a
+LIKE 'word%' on the name and email columns.
+
+Results are newest first and keyset paginated on (created_at, id), using
+idx_user_created or, with a role filter, idx_user_role_created.
+"""
+import re
+
+from app.extensions import db
+from app.models.user import User
+from app.utils.pagination import keyset_paginate
+
+USER_ROLES = tuple(User.__table__.c.role.type.enums)
+
+USER_SORT_KEYS = [(User.created_at, 'desc'), (User.id, 'desc')]
+
+
+def _search_terms(search):
+    """Split a search into word terms, dropping LIKE wildcards and FULLTEXT operators"""
+    return re.findall(r'[^\W_]+', search.lower())
+
+
+def _prefix(column, text):
+    """LIKE 'text%' with wildcards in text escaped; a literal prefix can use the column's index"""
+    escaped = text.replace('/', '//').replace('%', '/%').replace('_', '/_')
+    return column.like(f'{escaped}%', escape='/')
+
+
+def apply_user_search(query, search):
+    """Filter a User query to users matching a name or email search"""
+    search = search.strip().lower()
+    if '@' in search:
+        return query.filter(_prefix(User.email, search))
+
+    terms = _search_terms(search)
+    if not terms:
+        return query
+
+    if db.engine.dialect.name == 'mysql':
+        # Boolean mode: every term required, prefix matching on each
+        return query.filter(User.search_text.match(' '.join(f'+{term}*' for term in terms)))
+
+    for term in terms:
+        query = query.filter(db.or_(
+            _prefix(User.first_name, term),
+            _prefix(User.last_name, term),
+            _prefix(User.email, term)
+        ))
+    return query
+
+
+def search_users(search='', role=None, cursor=None, per_page=20):
+    """
+    One keyset page of users matching a search, newest first
+    Raises InvalidCursor for a malformed cursor.
+    """
+    query = User.query
+    if role:
+        query = query.filter(User.role == role)
+    query = apply_user_search(query, search)
+    return keyset_paginate(query, 'created_at', USER_SORT_KEYS, cursor=cursor, per_page=per_page)
@@ -4,7 +4,8 @@ from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from flask_login import login_required, current_user
 from sqlalchemy import and_
 from app.extensions import db, socketio
-from app.models import Location, Emergency, Notification, Participant, User
+from app.models import Location, Emergency, Notification, Participant, User, Trip
+from app.safety.tracks import TRACK_FORMATS, track_response
 from . import safety_bp
 
 # Rate limiting cache (in production, use Redis)
@@ -161,13 +162,38 @@ def get_latest_locations(trip_id):
         locations = Location.get_latest_for_trip(trip_id, limit)
         
         return jsonify({
-            'locations': [location.serialize() for location in locations]
+            'locations': [location.serialize(native=True) for location in locations]
         })
         
     except Exception as e:
         current_app.logger.error(f"Get locations error: {str(e)}")
         return jsonify({'error': 'Internal server error'}), 500
 
+@safety_bp.route('/trips/<int:trip_id>/track', methods=['GET'])
+@login_required
+def export_track(trip_id):
+    """
+    Full GPS track for a trip as GPX, GeoJSON or encoded polylines
+    Query args: format (gpx|geojson|polyline), device_id, tolerance (metres)
+    """
+    if not can_user_access_trip(current_user.id, trip_id):
+        return jsonify({'error': 'Access denied'}), 403
+    
+    trip = Trip.query.get_or_404(trip_id)
+    
+    track_format = request.args.get('format', 'geojson')
+    if track_format not in TRACK_FORMATS:
+        return jsonify({'error': f"Format must be one of: {', '.join(TRACK_FORMATS)}"}), 400
+    
+    try:
+        tolerance = float(request.args.get('tolerance', 0))
+    except ValueError:
+        return jsonify({'error': 'Tolerance must be a number of metres'}), 400
+    if not 0 <= tolerance <= current_app.config['TRACK_MAX_TOLERANCE']:
+        return jsonify({'error': 'Tolerance out of range'}), 400
+    
+    return track_response(track_format, trip, request.args.get('device_id') or None, tolerance)
+
 @safety_bp.route('/trips/<int:trip_id>/alert', methods=['POST'])
 @login_required
 def create_alert(trip_id):
@@ -274,7 +300,7 @@ def get_alerts(trip_id):
                                   .paginate(page=page, per_page=per_page)
         
         return jsonify({
-            'alerts': [alert.serialize() for alert in alerts.items],
+            'alerts': [alert.serialize(native=True) for alert in alerts.items],
             'total': alerts.total,
             'pages': alerts.pages,
             'current_page': page
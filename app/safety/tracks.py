@@ -0,0 +1,282 @@
+"""
+GPS track export
+
+A trip's track is read straight from the locations table as projected rows
+(latitude, longitude, altitude, timestamp) ordered by device and time, and
+encoded as GPX, GeoJSON or Google encoded polylines while it streams. Each
+device becomes one track/feature. With a tolerance (in metres) each device's
+points are simplified with Douglas-Peucker before encoding.
+
+Completed trips no longer change, so their encoded tracks are cached as
+gzip files keyed by the trip's location count and highest location id.
+"""
+import glob
+import gzip
+import hashlib
+import json
+import math
+import os
+import uuid
+from itertools import groupby
+from xml.sax.saxutils import escape
+from flask import Response, current_app, request, send_file, stream_with_context
+from sqlalchemy import func
+
+from app.extensions import db
+from app.models.location import Location
+from app.utils.exports import iter_rows
+
+# format -> (mimetype, file extension)
+TRACK_FORMATS = {
+    'gpx': ('application/gpx+xml', 'gpx'),
+    'geojson': ('application/geo+json', 'geojson'),
+    'polyline': ('application/json', 'json'),
+}
+
+# Metres per degree of latitude, and of longitude at the equator
+METRES_PER_DEGREE_LAT = 110540.0
+METRES_PER_DEGREE_LON = 111320.0
+
+
+def track_query(trip_id, device_id=None):
+    """Valid fixes for a trip as (device_id, lat, lon, alt, timestamp) rows"""
+    query = db.session.query(
+        Location.device_id, Location.latitude, Location.longitude,
+        Location.altitude, Location.timestamp
+    ).filter(Location.trip_id == trip_id, Location.is_valid == True)
+    if device_id:
+        query = query.filter(Location.device_id == device_id)
+    return query.order_by(Location.device_id, Location.timestamp, Location.id)
+
+
+def track_version(trip_id, device_id=None):
+    """(count, highest id) of a trip's valid fixes; changes whenever the track does"""
+    query = db.session.query(func.count(Location.id), func.max(Location.id)).filter(
+        Location.trip_id == trip_id, Location.is_valid == True
+    )
+    if device_id:
+        query = query.filter(Location.device_id == device_id)
+    count, max_id = query.one()
+    return count, max_id or 0
+
+
+def simplify(points, tolerance):
+    """
+    Douglas-Peucker simplification of (lat, lon, ...) points
+    tolerance is in metres; coordinates are projected onto a local
+    equirectangular plane, which is accurate enough at trip scale.
+    """
+    if tolerance <= 0 or len(points) < 3:
+        return points
+
+    scale_x = METRES_PER_DEGREE_LON * math.cos(math.radians(points[0][0]))
+    xy = [(p[1] * scale_x, p[0] * METRES_PER_DEGREE_LAT) for p in points]
+
+    keep = [False] * len(points)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        (x1, y1), (x2, y2) = xy[first], xy[last]
+        dx, dy = x2 - x1, y2 - y1
+        length = math.hypot(dx, dy)
+
+        furthest, max_distance = None, tolerance
+        for i in range(first + 1, last):
+            x, y = xy[i]
+            if length:
+                distance = abs(dy * x - dx * y + x2 * y1 - y2 * x1) / length
+            else:
+                distance = math.hypot(x - x1, y - y1)
+            if distance > max_distance:
+                furthest, max_distance = i, distance
+
+        if furthest is not None:
+            keep[furthest] = True
+            stack.append((first, furthest))
+            stack.append((furthest, last))
+
+    return [point for point, kept in zip(points, keep) if kept]
+
+
+def device_tracks(trip_id, device_id=None, tolerance=None):
+    """Yield (device_id, points) per device; points is an iterator unless simplified"""
+    rows = iter_rows(track_query(trip_id, device_id))
+    for device, device_rows in groupby(rows, key=lambda row: row[0]):
+        points = (row[1:] for row in device_rows)
+        if tolerance:
+            points = simplify(list(points), tolerance)
+        yield device, points
+
+
+def _encode_number(value):
+    value = ~(value << 1) if value < 0 else value << 1
+    chars = []
+    while value >= 0x20:
+        chars.append(chr((0x20 | (value & 0x1f)) + 63))
+        value >>= 5
+    chars.append(chr(value + 63))
+    return ''.join(chars)
+
+
+def _encode_point(lat, lon, last_lat, last_lon):
+    """Encoded text for one point, given the previous point in 1e-5 degree units"""
+    return _encode_number(lat - last_lat) + _encode_number(lon - last_lon)
+
+
+def encode_polyline(points):
+    """Google encoded polyline for (lat, lon, ...) points"""
+    parts = []
+    last_lat = last_lon = 0
+    for point in points:
+        lat, lon = int(round(point[0] * 1e5)), int(round(point[1] * 1e5))
+        parts.append(_encode_point(lat, lon, last_lat, last_lon))
+        last_lat, last_lon = lat, lon
+    return ''.join(parts)
+
+
+def _isoformat(timestamp):
+    return timestamp.isoformat() if timestamp else None
+
+
+def gpx_chunks(tracks, name):
+    """GPX 1.1 document with one track per device"""
+    yield (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<gpx version="1.1" creator="EduSafaris" xmlns="http://www.topografix.com/GPX/1/1">\n'
+        f'<metadata><name>{escape(name)}</name></metadata>\n'
+    )
+    for device, points in tracks:
+        parts = [f'<trk><name>{escape(device)}</name><trkseg>\n']
+        for lat, lon, altitude, timestamp in points:
+            parts.append(f'<trkpt lat="{lat}" lon="{lon}">')
+            if altitude is not None:
+                parts.append(f'<ele>{altitude}</ele>')
+            if timestamp:
+                parts.append(f'<time>{timestamp.isoformat()}</time>')
+            parts.append('</trkpt>\n')
+            if len(parts) >= 1000:
+                yield ''.join(parts)
+                parts = []
+        parts.append('</trkseg></trk>\n')
+        yield ''.join(parts)
+    yield '</gpx>\n'
+
+
+def geojson_chunks(tracks, name):
+    """
+    FeatureCollection with one LineString per device
+    Point times go in the feature's coordTimes property, as togeojson does.
+    """
+    yield '{"type":"FeatureCollection","properties":{"name":%s},"features":[' % json.dumps(name)
+    for index, (device, points) in enumerate(tracks):
+        times = []
+        parts = ['%s{"type":"Feature","geometry":{"type":"LineString","coordinates":[' % (',' if index else '')]
+        for i, (lat, lon, altitude, timestamp) in enumerate(points):
+            position = [lon, lat] if altitude is None else [lon, lat, altitude]
+            parts.append((',' if i else '') + json.dumps(position, separators=(',', ':')))
+            times.append(_isoformat(timestamp))
+            if len(parts) >= 1000:
+                yield ''.join(parts)
+                parts = []
+        properties = {'device_id': device, 'points': len(times), 'coordTimes': times}
+        parts.append(']},"properties":%s}' % json.dumps(properties, separators=(',', ':')))
+        yield ''.join(parts)
+    yield ']}\n'
+
+
+def polyline_chunks(tracks, name):
+    """{"name": ..., "tracks": [{"device_id", "polyline", "points", "start", "end"}]}"""
+    yield '{"name":%s,"tracks":[' % json.dumps(name)
+    for index, (device, points) in enumerate(tracks):
+        parts = ['%s{"device_id":%s,"polyline":"' % (',' if index else '', json.dumps(device))]
+        count, start, end = 0, None, None
+        last_lat = last_lon = 0
+        for point in points:
+            lat, lon = int(round(point[0] * 1e5)), int(round(point[1] * 1e5))
+            # Encoded characters are 63-126; only the backslash needs escaping in JSON
+            parts.append(_encode_point(lat, lon, last_lat, last_lon).replace('\\', '\\\\'))
+            last_lat, last_lon = lat, lon
+            count += 1
+            start = start or point[3]
+            end = point[3]
+            if len(parts) >= 1000:
+                yield ''.join(parts)
+                parts = []
+        parts.append('","points":%d,"start":%s,"end":%s}' % (
+            count, json.dumps(_isoformat(start)), json.dumps(_isoformat(end))
+        ))
+        yield ''.join(parts)
+    yield ']}\n'
+
+
+TRACK_ENCODERS = {
+    'gpx': gpx_chunks,
+    'geojson': geojson_chunks,
+    'polyline': polyline_chunks,
+}
+
+
+def track_chunks(track_format, trip, device_id=None, tolerance=None):
+    """Encoded track text for a trip, produced as rows stream from the database"""
+    tracks = device_tracks(trip.id, device_id, tolerance)
+    return TRACK_ENCODERS[track_format](tracks, trip.title)
+
+
+def cached_track_path(track_format, trip, device_id=None, tolerance=None):
+    """
+    Path of the gzipped track for a completed trip, encoding it on first use
+    Older versions of the same track are removed when a new one is written.
+    """
+    folder = current_app.config['TRACK_CACHE_FOLDER']
+    os.makedirs(folder, exist_ok=True)
+
+    key = hashlib.sha1(f'{device_id or ""}|{tolerance or 0}|{track_format}'.encode('utf-8')).hexdigest()[:16]
+    prefix = os.path.join(folder, f'trip_{trip.id}_{key}_')
+    count, max_id = track_version(trip.id, device_id)
+    path = f'{prefix}{count}_{max_id}.{TRACK_FORMATS[track_format][1]}.gz'
+    if os.path.exists(path):
+        return path
+
+    temp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+    with gzip.open(temp_path, 'wt', encoding='utf-8') as f:
+        for chunk in track_chunks(track_format, trip, device_id, tolerance):
+            f.write(chunk)
+    os.replace(temp_path, path)
+
+    for stale in glob.glob(f'{prefix}*.gz'):
+        if stale != path:
+            os.remove(stale)
+    return path
+
+
+def track_response(track_format, trip, device_id=None, tolerance=None):
+    """
+    Response with a trip's track in track_format
+    Completed trips are served from the gzip cache (decompressed on the fly
+    for clients that do not accept gzip); other trips stream from the database.
+    """
+    mimetype, extension = TRACK_FORMATS[track_format]
+    download_name = f'trip_{trip.id}_track.{extension}'
+
+    if trip.status != 'completed':
+        response = Response(
+            stream_with_context(track_chunks(track_format, trip, device_id, tolerance)),
+            mimetype=mimetype
+        )
+        response.headers['Content-Disposition'] = f'attachment; filename="{download_name}"'
+        return response
+
+    path = cached_track_path(track_format, trip, device_id, tolerance)
+    if 'gzip' in request.accept_encodings:
+        response = send_file(path, mimetype=mimetype, as_attachment=True, download_name=download_name)
+        response.headers['Content-Encoding'] = 'gzip'
+    else:
+        def decompressed():
+            with gzip.open(path, 'rb') as f:
+                yield from iter(lambda: f.read(64 * 1024), b'')
+
+        response = Response(decompressed(), mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename="{download_name}"'
+    response.headers['Vary'] = 'Accept-Encoding'
+    return response
@@ -316,6 +316,7 @@ def seed_database():
                         parent_id=parent.id
                     )
                     db.session.add(consent1)
+                    participant1.consent_complete = True
                     app.logger.info("Created sample consent form")
             
             # Create sample payment
@@ -1,12 +1,13 @@
-from flask import jsonify, request
+from flask import jsonify, request, current_app
 from flask_login import login_required, current_user
-from datetime import date
 from sqlalchemy import func, or_
+from sqlalchemy.orm import contains_eager
 from app.extensions import db
 from app.models import (
      Trip, Participant, Consent, Notification, 
-    Payment
+    Payment, OrganizerStats
 )
+from app.utils.pagination import keyset_paginate, InvalidCursor
 from app.teacher import teacher_bp
 
 
@@ -18,45 +19,15 @@ def get_dashboard_stats():
         if not current_user.is_teacher():
             return jsonify({'error': 'Unauthorized'}), 403
         
-        # Get all trips for current teacher
-        teacher_trips = current_user.organized_trips
-        
-        # Upcoming trips count
-        upcoming_trips = teacher_trips.filter(
-            Trip.start_date > date.today(),
-            Trip.status.in_(['active', 'draft'])
-        ).count()
-        
-        # Total confirmed students across all trips
-        confirmed_students = db.session.query(func.count(Participant.id)).join(Trip).filter(
-            Trip.organizer_id == current_user.id,
-            Participant.status == 'confirmed'
-        ).scalar() or 0
-        
-        # Consent completion rate
-        total_participants = db.session.query(func.count(Participant.id)).join(Trip).filter(
-            Trip.organizer_id == current_user.id,
-            Participant.status.in_(['registered', 'confirmed'])
-        ).scalar() or 0
-        
-        participants_with_consent = db.session.query(func.count(Participant.id.distinct())).join(
-            Consent, Participant.id == Consent.participant_id
-        ).join(Trip, Participant.trip_id == Trip.id).filter(
-            Trip.organizer_id == current_user.id,
-            Consent.is_signed == True,
-            Participant.status.in_(['registered', 'confirmed'])
-        ).scalar() or 0
-        
-        consent_completion = (participants_with_consent / total_participants * 100) if total_participants > 0 else 0
+        # Single primary-key read; recomputed only when stale or too old
+        stats = OrganizerStats.get_for(
+            current_user.id,
+            current_app.config['TEACHER_STATS_MAX_AGE']
+        )
         
         return jsonify({
             'success': True,
-            'stats': {
-                'upcoming_trips': upcoming_trips,
-                'confirmed_students': confirmed_students,
-                'consent_completion': round(consent_completion, 1),
-                'total_trips': teacher_trips.count()
-            }
+            'stats': stats.serialize()
         })
     except Exception as e:
         return jsonify({'error': str(e)}), 500
@@ -91,32 +62,52 @@ def get_trips():
                 )
             )
         
-        # Order by start date
-        query = query.order_by(Trip.start_date.desc())
+        sort_keys = [(Trip.start_date, 'desc'), (Trip.id, 'desc')]
+        
+        if 'cursor' in request.args:
+            # Keyset pagination on (start_date, id); total only on request
+            pagination = keyset_paginate(
+                query,
+                'start_date',
+                sort_keys,
+                cursor=request.args.get('cursor') or None,
+                per_page=per_page,
+                with_total=request.args.get('include_total', 'false').lower() == 'true'
+            )
+            pagination_data = pagination.serialize()
+        else:
+            # Order by start date
+            query = query.order_by(Trip.start_date.desc(), Trip.id.desc())
+            
+            # Paginate
+            pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+            pagination_data = {
+                'page': pagination.page,
+                'per_page': pagination.per_page,
+                'total': pagination.total,
+                'pages': pagination.pages
+            }
         
-        # Paginate
-        pagination = query.paginate(page=page, per_page=per_page, error_out=False)
+        trips = Trip.preload_for_serialization(pagination.items)
+        consent_counts = Consent.status_counts_for_trips(
+            [trip.id for trip in trips if trip.consent_required]
+        )
         
         trips_data = []
-        for trip in pagination.items:
+        for trip in trips:
             trips_data.append({
                 **trip.serialize(),
                 'current_participants_count': trip.current_participants,
-                'pending_consents': trip.participants.join(Consent).filter(
-                    Consent.is_signed == False
-                ).count() if trip.consent_required else 0
+                'pending_consents': consent_counts[trip.id]['pending'] if trip.consent_required else 0
             })
         
         return jsonify({
             'success': True,
             'trips': trips_data,
-            'pagination': {
-                'page': pagination.page,
-                'per_page': pagination.per_page,
-                'total': pagination.total,
-                'pages': pagination.pages
-            }
+            'pagination': pagination_data
         })
+    except InvalidCursor as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
@@ -132,12 +123,16 @@ def get_trip_details(trip_id):
         if trip.organizer_id != current_user.id:
             return jsonify({'error': 'Unauthorized'}), 403
         
-        # Get participants with details
+        # Get participants with details; consent counts come from one grouped query
+        consent_counts = Consent.status_counts_for_participants(p.id for p in trip.participants)
+        
         participants = []
-        for participant in trip.participants.all():
+        for participant in trip.participants:
             participants.append({
-                **participant.serialize(),
-                'consent_status': 'signed' if participant.has_all_consents() else 'pending'
+                **participant.serialize(native=True),
+                'consent_status': 'signed' if participant.has_all_consents() else 'pending',
+                'consents_signed': consent_counts[participant.id]['signed'],
+                'consents_pending': consent_counts[participant.id]['pending']
             })
         
         # Get bookings
@@ -182,8 +177,10 @@ def get_participants():
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 20, type=int)
         
-        # Base query
-        query = db.session.query(Participant).join(Trip).filter(
+        # Base query; the joined trip also populates participant.trip
+        query = db.session.query(Participant).join(Trip).options(
+            contains_eager(Participant.trip)
+        ).filter(
             Trip.organizer_id == current_user.id
         )
         
@@ -212,7 +209,7 @@ def get_participants():
         participants_data = []
         for participant in pagination.items:
             participants_data.append({
-                **participant.serialize(),
+                **participant.serialize(native=True),
                 'trip_title': participant.trip.title if participant.trip else None,
                 'consent_status': 'signed' if participant.has_all_consents() else 'pending',
                 'payment_percentage': (float(participant.amount_paid) / float(participant.trip.price_per_student) * 100) 
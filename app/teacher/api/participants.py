@@ -65,7 +65,7 @@ def add_participant():
         return jsonify({
             'success': True,
             'message': 'Participant added successfully',
-            'participant': participant.serialize()
+            'participant': participant.serialize(native=True)
         }), 201
     except Exception as e:
         db.session.rollback()
@@ -108,7 +108,7 @@ def update_participant(participant_id):
         return jsonify({
             'success': True,
             'message': 'Participant updated successfully',
-            'participant': participant.serialize()
+            'participant': participant.serialize(native=True)
         })
     except Exception as e:
         db.session.rollback()
@@ -144,7 +144,7 @@ def confirm_participant(participant_id):
         return jsonify({
             'success': True,
             'message': 'Participant confirmed successfully',
-            'participant': participant.serialize()
+            'participant': participant.serialize(native=True)
         })
     except Exception as e:
         db.session.rollback()
@@ -0,0 +1,119 @@
+"""
+Trip data exports
+
+Each dataset is a list of (header, expression) columns plus a function
+building the projected query for one trip. Related values (a participant's
+outstanding balance, a payment's participant, a booking's vendor) come from
+joins in the same query rather than per-row lazy loads.
+"""
+from sqlalchemy import func
+
+from app.extensions import db
+from app.models.trip import Trip
+from app.models.participant import Participant
+from app.models.payment import Payment
+from app.models.booking import Booking
+from app.models.vendor import Vendor
+from app.models.location import Location
+from app.utils.exports import projected_query
+
+PARTICIPANT_COLUMNS = [
+    ('First Name', Participant.first_name),
+    ('Last Name', Participant.last_name),
+    ('Grade Level', Participant.grade_level),
+    ('Student ID', Participant.student_id),
+    ('Email', Participant.email),
+    ('Phone', Participant.phone),
+    ('Status', Participant.status),
+    ('Payment Status', Participant.payment_status),
+    ('Amount Paid', func.coalesce(Participant.amount_paid, 0)),
+    ('Outstanding Balance', Trip.price_per_student - func.coalesce(Participant.amount_paid, 0)),
+    ('Medical Conditions', Participant.medical_conditions),
+    ('Medications', Participant.medications),
+    ('Allergies', Participant.allergies),
+    ('Dietary Restrictions', Participant.dietary_restrictions),
+    ('Emergency Contact 1', Participant.emergency_contact_1_name),
+    ('Emergency Phone 1', Participant.emergency_contact_1_phone),
+    ('Emergency Relationship 1', Participant.emergency_contact_1_relationship),
+]
+
+PAYMENT_COLUMNS = [
+    ('Payment ID', Payment.id),
+    ('Payment Date', Payment.payment_date),
+    ('Amount', Payment.amount),
+    ('Currency', Payment.currency),
+    ('Method', Payment.payment_method),
+    ('Status', Payment.status),
+    ('Transaction ID', Payment.transaction_id),
+    ('Reference', Payment.reference_number),
+    ('Payer Name', Payment.payer_name),
+    ('Payer Email', Payment.payer_email),
+    ('Participant First Name', Participant.first_name),
+    ('Participant Last Name', Participant.last_name),
+    ('Processed Date', Payment.processed_date),
+    ('Refund Date', Payment.refund_date),
+]
+
+BOOKING_COLUMNS = [
+    ('Booking ID', Booking.id),
+    ('Vendor', Vendor.business_name),
+    ('Type', Booking.booking_type),
+    ('Status', Booking.status),
+    ('Quoted Amount', Booking.quoted_amount),
+    ('Final Amount', Booking.final_amount),
+    ('Booking Date', Booking.booking_date),
+    ('Confirmed Date', Booking.confirmed_date),
+    ('Completed Date', Booking.completed_date),
+    ('Rating', Booking.rating),
+]
+
+LOCATION_COLUMNS = [
+    ('Timestamp', Location.timestamp),
+    ('Latitude', Location.latitude),
+    ('Longitude', Location.longitude),
+    ('Altitude', Location.altitude),
+    ('Accuracy (m)', Location.accuracy),
+    ('Speed', Location.speed),
+    ('Heading', Location.heading),
+    ('Device ID', Location.device_id),
+    ('Type', Location.location_type),
+    ('Name', Location.name),
+    ('Battery Level', Location.battery_level),
+    ('Safe Zone', Location.is_safe_zone),
+]
+
+
+def participants_query(trip_id):
+    return projected_query(db.session, PARTICIPANT_COLUMNS).join(
+        Trip, Participant.trip_id == Trip.id
+    ).filter(Participant.trip_id == trip_id).order_by(
+        Participant.last_name, Participant.first_name, Participant.id
+    )
+
+
+def payments_query(trip_id):
+    return projected_query(db.session, PAYMENT_COLUMNS).select_from(Payment).outerjoin(
+        Participant, Payment.participant_id == Participant.id
+    ).filter(Payment.trip_id == trip_id).order_by(Payment.payment_date, Payment.id)
+
+
+def bookings_query(trip_id):
+    return projected_query(db.session, BOOKING_COLUMNS).select_from(Booking).join(
+        Vendor, Booking.vendor_id == Vendor.id
+    ).filter(Booking.trip_id == trip_id).order_by(Booking.booking_date, Booking.id)
+
+
+def locations_query(trip_id):
+    """Full GPS track, oldest fix first"""
+    return projected_query(db.session, LOCATION_COLUMNS).filter(
+        Location.trip_id == trip_id
+    ).order_by(Location.timestamp, Location.id)
+
+
+# dataset -> (columns, query builder)
+TRIP_EXPORTS = {
+    'participants': (PARTICIPANT_COLUMNS, participants_query),
+    'payments': (PAYMENT_COLUMNS, payments_query),
+    'bookings': (BOOKING_COLUMNS, bookings_query),
+    'locations': (LOCATION_COLUMNS, locations_query),
+}
@@ -0,0 +1,213 @@
+"""
+Streaming participant CSV import
+
+Rows are parsed incrementally from the uploaded stream and handled in chunks:
+each chunk is validated in memory, checked for duplicate student ids against
+a set loaded once per import, and written with one multi-row INSERT. Trip
+capacity is checked against a running counter rather than by reloading the
+trip's participants. A bad row is reported and skipped; it never aborts the
+rest of the file. A file that cannot be decoded or parsed stops the import at
+that point: rows read before it are kept and the read error is reported.
+"""
+import csv
+import io
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import List, Optional
+from sqlalchemy import insert
+from sqlalchemy.exc import SQLAlchemyError
+
+from app.extensions import db
+from app.models.participant import Participant
+from app.models.organizer_stats import OrganizerStats
+
+# CSV columns copied onto Participant, all optional text
+OPTIONAL_FIELDS = (
+    'grade_level', 'student_id', 'email', 'phone',
+    'medical_conditions', 'medications', 'allergies', 'dietary_restrictions',
+    'emergency_contact_1_name', 'emergency_contact_1_phone', 'emergency_contact_1_relationship',
+)
+
+DATE_FORMATS = ('%Y-%m-%d', '%m/%d/%Y')
+
+
+@dataclass
+class RowError:
+    row: int
+    message: str
+
+    def __str__(self):
+        return f'Row {self.row}: {self.message}'
+
+
+@dataclass
+class ImportResult:
+    rows_processed: int = 0
+    added: int = 0
+    errors: List[RowError] = field(default_factory=list)
+    capacity_reached: bool = False
+    read_error: Optional[str] = None  # Why the rest of the file could not be read
+
+    @property
+    def failed(self):
+        return len(self.errors)
+
+    @property
+    def messages(self):
+        return [str(error) for error in self.errors]
+
+
+def open_text_stream(file_storage):
+    """Wrap an uploaded file's binary stream for incremental CSV reading"""
+    return io.TextIOWrapper(file_storage.stream, encoding='utf-8-sig', newline='')
+
+
+def _parse_date(value):
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    raise ValueError('Invalid date format for date_of_birth')
+
+
+class ParticipantImporter:
+    """
+    Import participants for one trip from a CSV stream
+
+    Args:
+        trip: Trip to add participants to
+        registered_by_id: User id stored as the participants' registering user
+        chunk_size: Rows validated and inserted per batch
+        progress: Optional callable(result) invoked after every chunk
+    """
+
+    def __init__(self, trip, registered_by_id=None, chunk_size=500, progress=None):
+        # Plain values: the trip instance expires with every chunk's commit
+        self.trip_id = trip.id
+        self.organizer_id = trip.organizer_id
+        self.max_participants = trip.max_participants
+        self.registered_by_id = registered_by_id
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.result = ImportResult()
+
+        # Column length limits, so over-long values fail their row instead of the INSERT
+        self._max_lengths = {
+            column.name: column.type.length
+            for column in Participant.__table__.columns
+            if getattr(column.type, 'length', None)
+        }
+
+    def _load_state(self):
+        """Existing student ids and the capacity counter, read once per import"""
+        self._seen_student_ids = {
+            student_id for (student_id,) in db.session.query(Participant.student_id).filter(
+                Participant.trip_id == self.trip_id,
+                Participant.student_id.isnot(None),
+                Participant.student_id != ''
+            )
+        }
+        self._remaining = self.max_participants - db.session.query(Participant.id).filter(
+            Participant.trip_id == self.trip_id,
+            Participant.status == 'confirmed'
+        ).count()
+
+    def _validate(self, row_num, row):
+        """Turn a CSV row into insert values, or raise ValueError"""
+        first_name = (row.get('first_name') or '').strip()
+        last_name = (row.get('last_name') or '').strip()
+        if not first_name or not last_name:
+            raise ValueError('Missing required fields (first_name, last_name)')
+
+        values = {
+            'first_name': first_name,
+            'last_name': last_name,
+            'date_of_birth': None,
+            'trip_id': self.trip_id,
+            'user_id': self.registered_by_id,
+            'status': 'registered'
+        }
+        for name in OPTIONAL_FIELDS:
+            values[name] = (row.get(name) or '').strip() or None
+
+        if (row.get('date_of_birth') or '').strip():
+            values['date_of_birth'] = _parse_date(row['date_of_birth'].strip())
+
+        for name, value in values.items():
+            limit = self._max_lengths.get(name)
+            if isinstance(value, str) and limit and len(value) > limit:
+                raise ValueError(f'{name} is longer than {limit} characters')
+
+        student_id = values['student_id']
+        if student_id:
+            if student_id in self._seen_student_ids:
+                raise ValueError(f'Duplicate student_id {student_id}')
+            self._seen_student_ids.add(student_id)
+
+        return values
+
+    def _insert(self, chunk):
+        """Insert a chunk of (row_num, values) with one multi-row INSERT"""
+        try:
+            db.session.execute(insert(Participant), [values for _, values in chunk])
+            db.session.commit()
+            return len(chunk)
+        except SQLAlchemyError:
+            db.session.rollback()
+
+        # Fall back to one row at a time to find the rows the database rejects
+        added = 0
+        for row_num, values in chunk:
+            try:
+                db.session.execute(insert(Participant), [values])
+                db.session.commit()
+                added += 1
+            except SQLAlchemyError as e:
+                db.session.rollback()
+                self.result.errors.append(RowError(row_num, f'Could not be saved ({e.__class__.__name__})'))
+        return added
+
+    def _flush(self, chunk):
+        if chunk:
+            self.result.added += self._insert(chunk)
+        if self.progress:
+            self.progress(self.result)
+
+    def run(self, text_stream):
+        """Import every row of the CSV text stream; returns an ImportResult"""
+        self._load_state()
+
+        chunk = []
+        reader = csv.DictReader(text_stream)
+        row_num = 1  # Row 1 is the header
+        try:
+            for row_num, row in enumerate(reader, start=2):
+                if self._remaining <= 0:
+                    self.result.capacity_reached = True
+                    self.result.errors.append(RowError(row_num, 'Trip has reached maximum capacity'))
+                    break
+
+                self.result.rows_processed += 1
+                try:
+                    chunk.append((row_num, self._validate(row_num, row)))
+                    self._remaining -= 1
+                except ValueError as e:
+                    self.result.errors.append(RowError(row_num, str(e)))
+
+                if self.result.rows_processed % self.chunk_size == 0:
+                    self._flush(chunk)
+                    chunk = []
+        except (UnicodeDecodeError, csv.Error) as e:
+            # Earlier chunks are already committed, so stop here and report it
+            self.result.read_error = f'Could not read CSV file: {e}'
+            self.result.errors.append(RowError(row_num + 1, self.result.read_error))
+
+        self._flush(chunk)
+
+        if self.result.added:
+            # Core inserts skip the ORM flush hooks that keep dashboard stats fresh
+            OrganizerStats.mark_stale([self.organizer_id])
+            db.session.commit()
+
+        return self.result
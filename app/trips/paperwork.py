@@ -0,0 +1,114 @@
+"""
+Trip paperwork packs
+
+A pack holds every participant's signed consent form and medical summary
+for a trip, as one ZIP of PDFs or (with pypdf installed) one merged PDF.
+Documents use the same templates and cache keys as the single-document
+downloads, so anything a parent or organizer already opened is reused.
+"""
+import zipfile
+from collections import namedtuple
+
+from app.extensions import db
+from app.models.participant import Participant
+from app.models.consent import Consent
+from app.utils.documents import document_key, cached_documents
+
+try:
+    from pypdf import PdfWriter
+except ImportError:  # Merged PDF packs are optional
+    PdfWriter = None
+
+CONSENT_TEMPLATE = 'parent_comm/snippets/consent_pdf.html'
+MEDICAL_TEMPLATE = 'trips/documents/medical_summary.html'
+
+PACK_FORMATS = ('zip', 'pdf')
+
+# One PDF in a pack: file name inside the ZIP, and how to render it
+PaperworkDocument = namedtuple('PaperworkDocument', 'filename template key context')
+
+
+class PackUnavailable(Exception):
+    """Raised when a pack format is unknown or its dependency is missing"""
+
+
+def consent_version(consent, participant, trip):
+    """Values that change whenever anything shown on a consent PDF does"""
+    return ('consent', consent.id, consent.version, consent.updated_at, participant.updated_at, trip.updated_at)
+
+
+def medical_version(participant, trip):
+    """Values that change whenever anything shown on a medical summary does"""
+    return ('medical', participant.id, participant.updated_at, trip.updated_at)
+
+
+def check_pack_format(pack_format):
+    if pack_format not in PACK_FORMATS:
+        raise PackUnavailable(f'Unknown pack format: {pack_format}')
+    if pack_format == 'pdf' and PdfWriter is None:
+        raise PackUnavailable('Merged PDF packs require pypdf')
+
+
+def participant_documents(trip, participants, consents):
+    """
+    Pack documents for participants, in order
+    consents maps participant id to the signed trip consent, if any.
+    """
+    documents = []
+    for number, participant in enumerate(participants, start=1):
+        name = f'{number:03d}_{participant.last_name}_{participant.first_name}'.replace('/', '_').replace(' ', '_')
+        consent = consents.get(participant.id)
+        if consent is not None:
+            documents.append(PaperworkDocument(
+                f'{name}_consent.pdf',
+                CONSENT_TEMPLATE,
+                document_key(CONSENT_TEMPLATE, *consent_version(consent, participant, trip)),
+                {'participant': participant, 'consent': consent, 'trip': trip}
+            ))
+        documents.append(PaperworkDocument(
+            f'{name}_medical.pdf',
+            MEDICAL_TEMPLATE,
+            document_key(MEDICAL_TEMPLATE, *medical_version(participant, trip)),
+            {'participant': participant, 'trip': trip}
+        ))
+    return documents
+
+
+def trip_documents(trip):
+    """Pack documents for a trip's active participants, with two queries"""
+    participants = Participant.query.filter(
+        Participant.trip_id == trip.id,
+        Participant.status != 'cancelled'
+    ).order_by(Participant.last_name, Participant.first_name, Participant.id).all()
+
+    consents = {}
+    if participants:
+        signed = Consent.query.filter(
+            Consent.participant_id.in_([participant.id for participant in participants]),
+            Consent.consent_type == 'trip_participation',
+            Consent.is_signed == True
+        ).order_by(Consent.signed_date).all()
+        # Latest signature wins
+        consents = {consent.participant_id: consent for consent in signed}
+
+    return participant_documents(trip, participants, consents)
+
+
+def write_pack(documents, target, pack_format='zip', progress=None):
+    """Render (or reuse) every document and write the pack to target"""
+    check_pack_format(pack_format)
+    paths = cached_documents(
+        [(document.template, document.key, document.context) for document in documents],
+        progress=progress
+    )
+
+    if pack_format == 'zip':
+        # PDFs are already compressed
+        with zipfile.ZipFile(target, 'w', zipfile.ZIP_STORED) as archive:
+            for document, path in zip(documents, paths):
+                archive.write(path, arcname=document.filename)
+    else:
+        writer = PdfWriter()
+        for path in paths:
+            writer.append(path)
+        writer.write(target)
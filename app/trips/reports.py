@@ -0,0 +1,97 @@
+"""
+Trip reports
+
+A report's participant, payment and booking breakdowns come from two
+conditional-aggregation queries (one over participants, one over bookings)
+instead of a COUNT per figure. Reports of completed trips no longer change,
+so they are cached per process, keyed by the trip's last update.
+"""
+from flask import current_app
+from sqlalchemy import func, case
+
+from app.extensions import db
+from app.models.participant import Participant
+from app.models.booking import Booking
+from app.utils.cache import TTLCache
+
+PARTICIPANT_STATUSES = tuple(Participant.__table__.c.status.type.enums)
+PAYMENT_STATUSES = tuple(Participant.__table__.c.payment_status.type.enums)
+BOOKING_STATUSES = tuple(Booking.__table__.c.status.type.enums)
+
+# Bookings whose cost the trip is committed to
+COMMITTED_BOOKING_STATUSES = ('confirmed', 'in_progress', 'completed')
+
+_report_cache = TTLCache(ttl=3600)
+
+
+def _count_where(condition):
+    return func.sum(case((condition, 1), else_=0))
+
+
+def _sum_where(condition, value):
+    return func.sum(case((condition, value), else_=0))
+
+
+def compute_trip_report(trip):
+    """Aggregate a trip's report figures with two queries"""
+    active = Participant.status != 'cancelled'
+    amount_paid = func.coalesce(Participant.amount_paid, 0)
+
+    participant_row = db.session.query(
+        func.count(Participant.id),
+        *[_count_where(Participant.status == status) for status in PARTICIPANT_STATUSES],
+        *[_count_where(Participant.payment_status == status) for status in PAYMENT_STATUSES],
+        _count_where(active),
+        func.sum(amount_paid),
+        _sum_where(active, amount_paid)
+    ).filter(Participant.trip_id == trip.id).one()
+
+    booking_row = db.session.query(
+        func.count(Booking.id),
+        *[_count_where(Booking.status == status) for status in BOOKING_STATUSES],
+        _sum_where(
+            Booking.status.in_(COMMITTED_BOOKING_STATUSES),
+            func.coalesce(Booking.final_amount, Booking.quoted_amount, 0)
+        )
+    ).filter(Booking.trip_id == trip.id).one()
+
+    values = iter(participant_row)
+    total_participants = int(next(values) or 0)
+    participant_statuses = {status: int(next(values) or 0) for status in PARTICIPANT_STATUSES}
+    payment_statuses = {status: int(next(values) or 0) for status in PAYMENT_STATUSES}
+    active_participants = int(next(values) or 0)
+    amount_collected = float(next(values) or 0)
+    active_paid = float(next(values) or 0)
+
+    values = iter(booking_row)
+    total_bookings = int(next(values) or 0)
+    booking_statuses = {status: int(next(values) or 0) for status in BOOKING_STATUSES}
+    booking_costs = float(next(values) or 0)
+
+    price = float(trip.price_per_student or 0)
+    return {
+        'total_participants': total_participants,
+        'confirmed_participants': participant_statuses['confirmed'],
+        # Same figure as Trip.get_total_revenue, without loading the participants
+        'total_revenue': participant_statuses['confirmed'] * price,
+        'paid_participants': payment_statuses['paid'],
+        'partial_participants': payment_statuses['partial'],
+        'pending_participants': payment_statuses['pending'],
+        'total_bookings': total_bookings,
+        'confirmed_bookings': booking_statuses['confirmed'],
+        'participant_statuses': participant_statuses,
+        'payment_statuses': payment_statuses,
+        'booking_statuses': booking_statuses,
+        'amount_collected': amount_collected,
+        'amount_outstanding': max(0.0, active_participants * price - active_paid),
+        'booking_costs': booking_costs,
+    }
+
+
+def get_trip_report(trip):
+    """Report figures for a trip, cached once the trip is completed"""
+    if trip.status != 'completed':
+        return compute_trip_report(trip)
+
+    _report_cache.ttl = current_app.config.get('TRIP_REPORT_CACHE_TTL', 3600)
+    return _report_cache.get((trip.id, trip.updated_at), lambda: compute_trip_report(trip))
@@ -1,8 +1,8 @@
-import csv
-import io
 import json
+import os
+import uuid
 from datetime import datetime, date
-from flask import render_template, request, redirect, url_for, flash, jsonify, make_response, current_app
+from flask import render_template, request, redirect, url_for, flash, jsonify, current_app, abort
 from flask_login import login_required, current_user
 from sqlalchemy import or_, and_, func
 from werkzeug.utils import secure_filename
@@ -16,6 +16,13 @@ from app.models.vendor import Vendor
 from app.models.user import User
 from app.trips.forms import TripForm, VendorSelectForm, ParticipantForm
 from app.utils import send_notification
+from app.utils.pagination import keyset_paginate, InvalidCursor
+from app.trips.importer import ParticipantImporter, open_text_stream
+from app.trips.exports import TRIP_EXPORTS
+from app.trips.reports import get_trip_report
+from app.utils.exports import export_response, ExportUnavailable, EXPORT_FORMATS
+from app.jobs import enqueue_job, jobs_folder
+from app.vendor.availability import find_available_vendors
 
 
 @bp.route('/')
@@ -53,11 +60,24 @@ def list_trips():
             Trip.destination.ilike(f'%{search_query}%')
         ))
     
-    # Order by start date
-    query = query.order_by(Trip.start_date.desc())
-    
-    # Paginate
-    trips = query.paginate(page=page, per_page=per_page, error_out=False)
+    if 'cursor' in request.args:
+        # Keyset pagination on (start_date, id) for infinite scroll
+        try:
+            trips = keyset_paginate(
+                query,
+                'start_date',
+                [(Trip.start_date, 'desc'), (Trip.id, 'desc')],
+                cursor=request.args.get('cursor') or None,
+                per_page=per_page
+            )
+        except InvalidCursor:
+            return redirect(url_for('trips.list_trips', filter=filter_type, q=search_query))
+    else:
+        # Order by start date
+        query = query.order_by(Trip.start_date.desc(), Trip.id.desc())
+        
+        # Paginate
+        trips = query.paginate(page=page, per_page=per_page, error_out=False)
     
     return render_template('trips/list.html', trips=trips, filter_type=filter_type, search_query=search_query)
 
@@ -200,14 +220,14 @@ def select_vendor(id):
     
     form = VendorSelectForm()
     
-    # Get available vendors
-    vendors = Vendor.query.filter_by(is_active=True, is_verified=True).all()
-    
-    # Filter vendors by availability
-    available_vendors = []
-    for vendor in vendors:
-        if vendor.is_available(trip.start_date, trip.end_date):
-            available_vendors.append(vendor)
+    # Get vendors free for the trip dates from the availability index
+    vendor_type = request.args.get('type') or None
+    min_capacity = request.args.get('min_capacity', type=int)
+    available_vendors = find_available_vendors(
+        trip.start_date, trip.end_date,
+        business_type=vendor_type,
+        min_capacity=min_capacity
+    )
     
     if form.validate_on_submit():
         try:
@@ -253,7 +273,14 @@ def select_vendor(id):
             flash('Error creating booking. Please try again.', 'error')
             current_app.logger.error(f'Error creating booking: {str(e)}')
     
-    return render_template('trips/select_vendor.html', form=form, trip=trip, vendors=available_vendors)
+    return render_template(
+        'trips/select_vendor.html',
+        form=form,
+        trip=trip,
+        vendors=available_vendors,
+        vendor_type=vendor_type,
+        min_capacity=min_capacity
+    )
 
 
 @bp.route('/<int:id>/participants/add', methods=['POST'])
@@ -299,7 +326,7 @@ def add_participant(id):
             
             return jsonify({
                 'success': True,
-                'participant': participant.serialize(),
+                'participant': participant.serialize(native=True),
                 'message': 'Participant added successfully'
             })
             
@@ -328,78 +355,46 @@ def upload_participants_csv(id):
     if file.filename == '' or not file.filename.endswith('.csv'):
         return jsonify({'error': 'Please upload a valid CSV file'}), 400
     
-    try:
-        # Read CSV data
-        csv_data = file.read().decode('utf-8')
-        csv_reader = csv.DictReader(io.StringIO(csv_data))
-        
-        participants_added = 0
-        errors = []
-        
-        for row_num, row in enumerate(csv_reader, start=2):  # Start at 2 to account for header
-            try:
-                # Check if trip has available spots
-                if trip.current_participants + participants_added >= trip.max_participants:
-                    errors.append(f'Row {row_num}: Trip has reached maximum capacity')
-                    break
-                
-                # Validate required fields
-                if not row.get('first_name') or not row.get('last_name'):
-                    errors.append(f'Row {row_num}: Missing required fields (first_name, last_name)')
-                    continue
-                
-                # Parse date of birth if provided
-                date_of_birth = None
-                if row.get('date_of_birth'):
-                    try:
-                        date_of_birth = datetime.strptime(row['date_of_birth'], '%Y-%m-%d').date()
-                    except ValueError:
-                        try:
-                            date_of_birth = datetime.strptime(row['date_of_birth'], '%m/%d/%Y').date()
-                        except ValueError:
-                            errors.append(f'Row {row_num}: Invalid date format for date_of_birth')
-                            continue
-                
-                participant = Participant(
-                    first_name=row['first_name'].strip(),
-                    last_name=row['last_name'].strip(),
-                    date_of_birth=date_of_birth,
-                    grade_level=row.get('grade_level', '').strip(),
-                    student_id=row.get('student_id', '').strip(),
-                    email=row.get('email', '').strip(),
-                    phone=row.get('phone', '').strip(),
-                    medical_conditions=row.get('medical_conditions', '').strip(),
-                    medications=row.get('medications', '').strip(),
-                    allergies=row.get('allergies', '').strip(),
-                    dietary_restrictions=row.get('dietary_restrictions', '').strip(),
-                    emergency_contact_1_name=row.get('emergency_contact_1_name', '').strip(),
-                    emergency_contact_1_phone=row.get('emergency_contact_1_phone', '').strip(),
-                    emergency_contact_1_relationship=row.get('emergency_contact_1_relationship', '').strip(),
-                    trip_id=trip.id,
-                    user_id=current_user.id,
-                    status='registered'
-                )
-                
-                db.session.add(participant)
-                participants_added += 1
-                
-            except Exception as e:
-                errors.append(f'Row {row_num}: {str(e)}')
-        
-        if participants_added > 0:
-            db.session.commit()
-        
+    # Large rosters are stored and imported by a background job
+    background = request.form.get('background', 'false').lower() == 'true'
+    if background or (request.content_length or 0) > current_app.config['PARTICIPANT_IMPORT_INLINE_LIMIT']:
+        input_path = os.path.join(jobs_folder(), f'upload_{uuid.uuid4().hex}.csv')
+        file.save(input_path)
+        job = enqueue_job('participant_import', current_user.id, trip_id=trip.id, input_path=input_path)
         return jsonify({
             'success': True,
-            'participants_added': participants_added,
-            'errors': errors,
-            'message': f'Successfully added {participants_added} participants'
-        })
-        
+            'job': job.serialize(),
+            'status_url': url_for('api.get_job', job_id=job.id),
+            'message': 'Import started; progress will be reported as it runs'
+        }), 202
+    
+    # Stream rows from the upload and insert them in chunks; each chunk is
+    # committed as it goes, so failures still report what was added
+    importer = ParticipantImporter(trip, registered_by_id=current_user.id)
+    try:
+        result = importer.run(open_text_stream(file))
     except Exception as e:
         db.session.rollback()
         current_app.logger.error(f'Error uploading CSV: {str(e)}')
-        return jsonify({'error': 'Failed to process CSV file'}), 500
+        return jsonify({
+            'error': 'Failed to process CSV file',
+            'participants_added': importer.result.added,
+            'errors': importer.result.messages
+        }), 500
+    
+    if result.read_error:
+        return jsonify({
+            'error': result.read_error,
+            'participants_added': result.added,
+            'errors': result.messages
+        }), 400
+    
+    return jsonify({
+        'success': True,
+        'participants_added': result.added,
+        'errors': result.messages,
+        'message': f'Successfully added {result.added} participants'
+    })
 
 
 @bp.route('/<int:id>/participants/<int:pid>/consent')
@@ -496,55 +491,35 @@ def end_trip(id):
 @login_required
 def export_participants(id):
     """Export participant list as CSV"""
+    return export_trip_data(id, 'participants')
+
+
+@bp.route('/<int:id>/export/<dataset>')
+@login_required
+def export_trip_data(id, dataset):
+    """Stream a trip's participants, payments, bookings or GPS track as CSV or XLSX"""
     trip = Trip.query.get_or_404(id)
     
     # Check permissions
     if not current_user.is_admin() and trip.organizer_id != current_user.id:
-        flash('You do not have permission to export participants.', 'error')
+        flash('You do not have permission to export trip data.', 'error')
+        return redirect(url_for('trips.trip_detail', id=trip.id))
+    
+    if dataset not in TRIP_EXPORTS:
+        abort(404)
+    
+    export_format = request.args.get('format', 'csv')
+    if export_format not in EXPORT_FORMATS:
+        flash('Unsupported export format.', 'error')
         return redirect(url_for('trips.trip_detail', id=trip.id))
     
-    # Create CSV response
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Write header
-    writer.writerow([
-        'First Name', 'Last Name', 'Grade Level', 'Student ID', 'Email', 'Phone',
-        'Status', 'Payment Status', 'Amount Paid', 'Outstanding Balance',
-        'Medical Conditions', 'Medications', 'Allergies', 'Dietary Restrictions',
-        'Emergency Contact 1', 'Emergency Phone 1', 'Emergency Relationship 1'
-    ])
-    
-    # Write participant data
-    for participant in trip.participants.all():
-        writer.writerow([
-            participant.first_name,
-            participant.last_name,
-            participant.grade_level or '',
-            participant.student_id or '',
-            participant.email or '',
-            participant.phone or '',
-            participant.status,
-            participant.payment_status,
-            float(participant.amount_paid or 0),
-            participant.outstanding_balance,
-            participant.medical_conditions or '',
-            participant.medications or '',
-            participant.allergies or '',
-            participant.dietary_restrictions or '',
-            participant.emergency_contact_1_name or '',
-            participant.emergency_contact_1_phone or '',
-            participant.emergency_contact_1_relationship or ''
-        ])
-    
-    output.seek(0)
-    
-    # Create response
-    response = make_response(output.getvalue())
-    response.headers['Content-Type'] = 'text/csv'
-    response.headers['Content-Disposition'] = f'attachment; filename="{trip.title}_participants.csv"'
-    
-    return response
+    columns, build_query = TRIP_EXPORTS[dataset]
+    filename = f'{secure_filename(trip.title) or "trip"}_{dataset}'
+    try:
+        return export_response(columns, build_query(trip.id), filename, export_format)
+    except ExportUnavailable as e:
+        flash(str(e), 'error')
+        return redirect(url_for('trips.trip_detail', id=trip.id))
 
 
 @bp.route('/<int:id>/report')
@@ -558,30 +533,4 @@ def trip_report(id):
         flash('You do not have permission to view this report.', 'error')
         return redirect(url_for('trips.trip_detail', id=trip.id))
     
-    # Calculate report data
-    total_participants = trip.participants.count()
-    confirmed_participants = trip.participants.filter_by(status='confirmed').count()
-    total_revenue = trip.get_total_revenue()
-    
-    # Payment statistics
-    paid_participants = trip.participants.filter_by(payment_status='paid').count()
-    partial_participants = trip.participants.filter_by(payment_status='partial').count()
-    pending_participants = trip.participants.filter_by(payment_status='pending').count()
-    
-    # Booking statistics
-    total_bookings = trip.bookings.count()
-    confirmed_bookings = trip.bookings.filter_by(status='confirmed').count()
-    
-    report_data = {
-        'trip': trip,
-        'total_participants': total_participants,
-        'confirmed_participants': confirmed_participants,
-        'total_revenue': total_revenue,
-        'paid_participants': paid_participants,
-        'partial_participants': partial_participants,
-        'pending_participants': pending_participants,
-        'total_bookings': total_bookings,
-        'confirmed_bookings': confirmed_bookings
-    }
-    
-    return render_template('trips/report.html', **report_data)
\ No newline at end of file
+    return render_template('trips/report.html', trip=trip, **get_trip_report(trip))
\ No newline at end of file
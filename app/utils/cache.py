@@ -0,0 +1,42 @@
+"""
+Small in-process caches
+
+These live per worker process. Anything cached here must be safe to serve
+slightly stale for up to its TTL, since other workers cannot invalidate it.
+"""
+import threading
+import time
+
+
+class TTLCache:
+    """Thread-safe key/value cache whose entries expire after `ttl` seconds"""
+
+    def __init__(self, ttl):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.RLock()
+
+    def get(self, key, loader):
+        """Return the cached value for key, calling loader() on a miss or expiry"""
+        now = time.monotonic()
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        with self._lock:
+            # Another thread may have loaded it while we waited
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                return entry[1]
+
+            value = loader()
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            return value
+
+    def invalidate(self, key=None):
+        """Drop one key, or every key when key is None"""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
@@ -0,0 +1,226 @@
+"""
+PDF document rendering
+
+WeasyPrint takes hundreds of milliseconds to seconds of CPU per document,
+so it runs in a pool of DOCUMENT_WORKERS processes instead of the request
+(with eventlet the request only waits on the result, it does not block the
+hub). Each worker parses the shared print stylesheets once at start-up.
+
+Finished PDFs are cached on disk under a content key: the caller's version
+of the document (e.g. a consent's id, version and last update) plus the
+template version, a hash of the template source and shared stylesheets.
+The key doubles as the ETag, so a client that already has the document
+gets a 304 without anything being rendered or read. Keys start with the
+document's kind and record id, so writing a new version of a document
+removes its older versions from the cache.
+"""
+import glob
+import hashlib
+import mimetypes
+import os
+import uuid
+from concurrent.futures import TimeoutError as RenderTimeout, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from flask import current_app, render_template, request, send_file
+from weasyprint import HTML, CSS
+
+from app.utils.workers import WorkerPool
+
+# Shared print stylesheets, relative to the static folder
+DOCUMENT_STYLESHEETS = ('css/documents.css',)
+
+# Base URL documents are rendered against; only static files below it are fetched
+DOCUMENT_BASE_URL = 'http://documents.local/'
+
+_template_versions = {}
+
+# Worker process state, set by _init_worker
+_stylesheets = None
+_static_folder = None
+_static_url_path = None
+
+
+class DocumentRenderError(Exception):
+    """Raised when a document cannot be rendered"""
+
+
+def _init_worker(static_folder, static_url_path):
+    """Parse the shared stylesheets once per worker process"""
+    global _stylesheets, _static_folder, _static_url_path
+    _static_folder = static_folder
+    _static_url_path = static_url_path.rstrip('/')
+    _stylesheets = [
+        CSS(filename=os.path.join(static_folder, stylesheet))
+        for stylesheet in DOCUMENT_STYLESHEETS
+    ]
+
+
+def _fetch_static(url):
+    """URL fetcher serving static files only, so documents never reach out to the network"""
+    prefix = DOCUMENT_BASE_URL.rstrip('/') + _static_url_path + '/'
+    if not url.startswith(prefix):
+        raise ValueError(f'Document resource not allowed: {url}')
+
+    root = os.path.realpath(_static_folder)
+    path = os.path.realpath(os.path.join(root, url[len(prefix):].split('?')[0]))
+    if not path.startswith(root + os.sep):
+        raise ValueError(f'Document resource not allowed: {url}')
+    with open(path, 'rb') as f:
+        return {'string': f.read(), 'mime_type': mimetypes.guess_type(path)[0], 'filename': os.path.basename(path)}
+
+
+def _render_pdf(html):
+    """Render HTML to PDF bytes; runs in a worker process"""
+    return HTML(string=html, base_url=DOCUMENT_BASE_URL, url_fetcher=_fetch_static).write_pdf(
+        stylesheets=_stylesheets
+    )
+
+
+pool = WorkerPool(
+    'DOCUMENT_WORKERS',
+    initializer=_init_worker,
+    initargs=lambda app: (app.static_folder, app.static_url_path)
+)
+
+
+def render_pdf(html):
+    """
+    Render HTML to PDF bytes in the worker pool
+    With DOCUMENT_WORKERS set to 0 (tests), renders in this process.
+    """
+    if not current_app.config.get('DOCUMENT_WORKERS'):
+        if _stylesheets is None:
+            _init_worker(current_app.static_folder, current_app.static_url_path)
+        return _render_pdf(html)
+
+    try:
+        future = pool.get().submit(_render_pdf, html)
+        return future.result(timeout=current_app.config['DOCUMENT_RENDER_TIMEOUT'])
+    except RenderTimeout as e:
+        future.cancel()
+        raise DocumentRenderError('Document rendering timed out') from e
+    except BrokenProcessPool as e:
+        pool.shutdown()
+        raise DocumentRenderError('Document worker pool failed') from e
+
+
+def template_version(template):
+    """Hash of a document template's source and the shared stylesheets"""
+    version = _template_versions.get(template)
+    if version is None or current_app.debug:
+        env = current_app.jinja_env
+        source, _, _ = env.loader.get_source(env, template)
+        digest = hashlib.sha256(source.encode('utf-8'))
+        for stylesheet in DOCUMENT_STYLESHEETS:
+            with open(os.path.join(current_app.static_folder, stylesheet), 'rb') as f:
+                digest.update(f.read())
+        version = _template_versions[template] = digest.hexdigest()
+    return version
+
+
+def document_key(template, *version_parts):
+    """
+    Content key for a document: its template version plus the caller's version parts
+    version_parts start with the document's kind and record id (e.g. 'consent',
+    consent.id), which prefix the key so older versions can be found.
+    """
+    digest = hashlib.sha256(template_version(template).encode('utf-8'))
+    digest.update(repr(version_parts).encode('utf-8'))
+    kind, record_id = version_parts[:2]
+    return f'{kind}_{record_id}_{digest.hexdigest()}'
+
+
+def _document_path(key):
+    folder = current_app.config['DOCUMENT_CACHE_FOLDER']
+    os.makedirs(folder, exist_ok=True)
+    return os.path.join(folder, f'{key}.pdf')
+
+
+def _save_pdf(path, pdf):
+    """Write a cached PDF and remove older versions of the same document"""
+    temp_path = f'{path}.{uuid.uuid4().hex}.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(pdf)
+    os.replace(temp_path, path)
+
+    prefix = path.rsplit('_', 1)[0]
+    for stale in glob.glob(f'{prefix}_*.pdf'):
+        if stale != path:
+            try:
+                os.remove(stale)
+            except FileNotFoundError:
+                pass
+
+
+def cached_document(template, key, **context):
+    """Path of the cached PDF for key, rendering the template on a miss"""
+    path = _document_path(key)
+    if not os.path.exists(path):
+        _save_pdf(path, render_pdf(render_template(template, **context)))
+    return path
+
+
+def cached_documents(documents, progress=None):
+    """
+    Paths of the cached PDFs for many (template, key, context) documents
+    Misses are all submitted to the worker pool at once and rendered in
+    parallel. progress(done) is called as each document becomes available.
+    """
+    paths = [_document_path(key) for _, key, _ in documents]
+    misses = [
+        (path, template, context)
+        for path, (template, _, context) in zip(paths, documents)
+        if not os.path.exists(path)
+    ]
+
+    done = len(documents) - len(misses)
+    if progress:
+        progress(done)
+
+    if not current_app.config.get('DOCUMENT_WORKERS'):
+        for path, template, context in misses:
+            _save_pdf(path, render_pdf(render_template(template, **context)))
+            done += 1
+            if progress:
+                progress(done)
+        return paths
+
+    executor = pool.get()
+    # Each worker may take up to DOCUMENT_RENDER_TIMEOUT per document it is given
+    rounds = -(-len(misses) // current_app.config['DOCUMENT_WORKERS'])
+    futures = {
+        executor.submit(_render_pdf, render_template(template, **context)): path
+        for path, template, context in misses
+    }
+    try:
+        for future in as_completed(futures, timeout=current_app.config['DOCUMENT_RENDER_TIMEOUT'] * rounds):
+            _save_pdf(futures[future], future.result())
+            done += 1
+            if progress:
+                progress(done)
+    except RenderTimeout as e:
+        # Drop renders still queued; ones already running finish in their worker
+        for future in futures:
+            future.cancel()
+        raise DocumentRenderError('Document rendering timed out') from e
+    except BrokenProcessPool as e:
+        pool.shutdown()
+        raise DocumentRenderError('Document worker pool failed') from e
+    return paths
+
+
+def pdf_response(template, version_parts, download_name, **context):
+    """
+    PDF response for a document, served from the cache with conditional GET
+    version_parts must change whenever anything shown in the document does.
+    """
+    key = document_key(template, *version_parts)
+    if request.if_none_match.contains(key):
+        response = current_app.response_class(status=304)
+        response.set_etag(key)
+    else:
+        path = cached_document(template, key, **context)
+        response = send_file(path, mimetype='application/pdf', download_name=download_name, etag=key)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
@@ -0,0 +1,110 @@
+"""
+Streaming tabular exports
+
+An export is a list of (header, SQL expression) columns and a query that
+selects exactly those expressions. Rows are read from a server-side cursor
+in chunks of EXPORT_CHUNK_SIZE (yield_per) and written out as they arrive,
+so memory stays flat however many rows are exported:
+
+- CSV is streamed to the client as a chunked response.
+- XLSX (when openpyxl is installed) is written in openpyxl's write-only
+  mode to a temporary file, then sent.
+"""
+import csv
+import io
+import tempfile
+from decimal import Decimal
+from flask import Response, current_app, send_file, stream_with_context
+
+try:
+    import openpyxl
+except ImportError:  # XLSX export is optional
+    openpyxl = None
+
+# Formats offered to users; XLSX only when openpyxl is installed
+EXPORT_FORMATS = ('csv', 'xlsx') if openpyxl is not None else ('csv',)
+
+
+class ExportUnavailable(Exception):
+    """Raised when an export format is unknown or its dependency is missing"""
+
+
+def projected_query(session, columns):
+    """Query selecting only the export's column expressions"""
+    return session.query(*[expression for _, expression in columns])
+
+
+def iter_rows(query, chunk_size=None):
+    """Yield result rows from a server-side cursor, chunk_size rows at a time"""
+    chunk_size = chunk_size or current_app.config.get('EXPORT_CHUNK_SIZE', 1000)
+    yield from query.yield_per(chunk_size)
+
+
+def _cell(value):
+    """Plain cell value: blanks for NULL, floats for Decimal"""
+    if value is None:
+        return ''
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+
+def csv_chunks(headers, rows, rows_per_chunk=500):
+    """Encode rows as CSV text, yielding about rows_per_chunk rows at a time"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(headers)
+
+    pending = 0
+    for row in rows:
+        writer.writerow([_cell(value) for value in row])
+        pending += 1
+        if pending >= rows_per_chunk:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    yield buffer.getvalue()
+
+
+def write_xlsx(headers, rows, target, title='Export'):
+    """Write rows to an XLSX file object with openpyxl's constant-memory writer"""
+    if openpyxl is None:
+        raise ExportUnavailable('XLSX export requires openpyxl')
+
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=title[:31])
+    sheet.append(headers)
+    for row in rows:
+        sheet.append([float(value) if isinstance(value, Decimal) else value for value in row])
+    workbook.save(target)
+
+
+def export_response(columns, query, filename, export_format='csv'):
+    """
+    Response streaming the query's rows as CSV or XLSX
+    filename is given without extension.
+    """
+    headers = [header for header, _ in columns]
+
+    if export_format == 'csv':
+        response = Response(
+            stream_with_context(csv_chunks(headers, iter_rows(query))),
+            mimetype='text/csv'
+        )
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}.csv"'
+        return response
+
+    if export_format == 'xlsx':
+        target = tempfile.TemporaryFile()
+        write_xlsx(headers, iter_rows(query), target)
+        target.seek(0)
+        return send_file(
+            target,
+            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            as_attachment=True,
+            download_name=f'{filename}.xlsx'
+        )
+
+    raise ExportUnavailable(f'Unknown export format: {export_format}')
@@ -0,0 +1,209 @@
+"""
+Uploaded image pipeline
+
+An upload is streamed to disk while it is hashed and stored once under its
+content key (the first 32 hex digits of its SHA-256), so re-uploads of the
+same file are free. Resizing happens in the IMAGE_WORKERS process pool:
+each rendition of the upload's kind is written as WebP and JPEG. JPEG
+sources are decoded with Pillow's draft() at the smallest DCT scale that
+still covers the largest rendition, which skips most of the decoding work
+for camera-sized photos.
+
+Public renditions live in MEDIA_FOLDER under names derived from the content
+key and are served from /media with a one-year immutable Cache-Control.
+Originals, and previews of private uploads (vendor verification documents),
+stay in UPLOAD_ORIGINALS_FOLDER.
+"""
+import hashlib
+import os
+import re
+import uuid
+from collections import namedtuple
+from flask import current_app, url_for
+from PIL import Image, ImageOps
+
+from app.utils.workers import WorkerPool
+
+# kind -> rendition -> (width, height, crop to fill)
+IMAGE_RENDITIONS = {
+    'profile': {
+        'avatar': (80, 80, True),
+        'card': (300, 300, True),
+        'retina': (600, 600, True),
+    },
+    'ad': {
+        'card': (600, 300, False),
+        'retina': (1200, 600, False),
+    },
+    'document': {
+        'preview': (1000, 1000, False),
+    },
+}
+
+# Kinds whose renditions are not publicly served
+PRIVATE_KINDS = ('document',)
+
+# extension -> (Pillow format, save options)
+RENDITION_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpg': ('JPEG', {'quality': 85, 'optimize': True, 'progressive': True}),
+}
+
+IMAGE_FORMATS = {'JPEG': 'jpg', 'PNG': 'png', 'GIF': 'gif', 'WEBP': 'webp'}
+CONTENT_KEY = re.compile(r'^[0-9a-f]{32}$')
+
+# A stored upload: its content key, original file name, and file extension
+StoredUpload = namedtuple('StoredUpload', 'key filename extension')
+
+pool = WorkerPool('IMAGE_WORKERS')
+
+
+class InvalidUpload(ValueError):
+    """Raised when an upload is not an accepted image or document"""
+
+
+def _shard(folder, key):
+    path = os.path.join(folder, key[:2])
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def original_path(key, extension):
+    return os.path.join(_shard(current_app.config['UPLOAD_ORIGINALS_FOLDER'], key), f'{key}.{extension}')
+
+
+def rendition_folder(key, kind):
+    folder = 'UPLOAD_ORIGINALS_FOLDER' if kind in PRIVATE_KINDS else 'MEDIA_FOLDER'
+    return _shard(current_app.config[folder], key)
+
+
+def renditions_exist(key, kind):
+    """Whether every rendition of a stored image has been written"""
+    folder = rendition_folder(key, kind)
+    return all(
+        os.path.exists(os.path.join(folder, f'{key}_{name}.{extension}'))
+        for name in IMAGE_RENDITIONS[kind]
+        for extension in RENDITION_FORMATS
+    )
+
+
+def _stream_to_disk(file_storage, folder):
+    """Copy an upload to a temp file in folder, returning (temp path, content key)"""
+    os.makedirs(folder, exist_ok=True)
+    temp_path = os.path.join(folder, f'upload_{uuid.uuid4().hex}.tmp')
+    digest = hashlib.sha256()
+    with open(temp_path, 'wb') as f:
+        for chunk in iter(lambda: file_storage.stream.read(64 * 1024), b''):
+            digest.update(chunk)
+            f.write(chunk)
+    return temp_path, digest.hexdigest()[:32]
+
+
+def _sniff(path, allow_pdf):
+    """File extension for an accepted upload, or None"""
+    with open(path, 'rb') as f:
+        if allow_pdf and f.read(5) == b'%PDF-':
+            return 'pdf'
+    try:
+        with Image.open(path) as img:
+            return IMAGE_FORMATS.get(img.format)
+    except (OSError, Image.DecompressionBombError):
+        return None
+
+
+def save_upload(file_storage, kind):
+    """
+    Store an upload under its content key and queue its renditions
+    Raises InvalidUpload unless it is an image (or, for documents, a PDF).
+    """
+    folder = current_app.config['UPLOAD_ORIGINALS_FOLDER']
+    temp_path, key = _stream_to_disk(file_storage, folder)
+    try:
+        extension = _sniff(temp_path, allow_pdf=kind in PRIVATE_KINDS)
+        if extension is None:
+            raise InvalidUpload('Unsupported file type')
+
+        path = original_path(key, extension)
+        if not os.path.exists(path):
+            os.replace(temp_path, path)
+        # The same file may have been stored before, possibly as another kind
+        if extension != 'pdf' and not renditions_exist(key, kind):
+            queue_renditions(key, path, kind)
+    finally:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+
+    return StoredUpload(key, file_storage.filename, extension)
+
+
+def process_image(source_path, dest_folder, key, renditions):
+    """
+    Write every rendition of an image as WebP and JPEG; runs in a worker process
+    Returns the names of the files written.
+    """
+    written = []
+    with Image.open(source_path) as img:
+        if img.format == 'JPEG':
+            img.draft('RGB', (
+                max(width for width, _, _ in renditions.values()),
+                max(height for _, height, _ in renditions.values())
+            ))
+        img = ImageOps.exif_transpose(img)
+        img = img.convert('RGBA' if img.mode in ('RGBA', 'LA', 'P') else 'RGB')
+
+        # Largest first, each later rendition resized from the same decoded image
+        for name, (width, height, crop) in sorted(renditions.items(), key=lambda item: -item[1][0] * item[1][1]):
+            if crop:
+                rendition = ImageOps.fit(img, (width, height), Image.Resampling.LANCZOS)
+            else:
+                rendition = img.copy()
+                rendition.thumbnail((width, height), Image.Resampling.LANCZOS)
+
+            for extension, (image_format, options) in RENDITION_FORMATS.items():
+                output = rendition
+                if image_format == 'JPEG' and output.mode == 'RGBA':
+                    output = Image.new('RGB', rendition.size, (255, 255, 255))
+                    output.paste(rendition, mask=rendition.getchannel('A'))
+
+                filename = f'{key}_{name}.{extension}'
+                temp_path = os.path.join(dest_folder, f'{filename}.{uuid.uuid4().hex}.tmp')
+                output.save(temp_path, image_format, **options)
+                os.replace(temp_path, os.path.join(dest_folder, filename))
+                written.append(filename)
+    return written
+
+
+def queue_renditions(key, source_path, kind):
+    """
+    Generate an upload's renditions in the worker pool without waiting
+    With IMAGE_WORKERS set to 0 (tests), they are generated before this returns.
+    """
+    args = (source_path, rendition_folder(key, kind), key, IMAGE_RENDITIONS[kind])
+    if not pool.size:
+        process_image(*args)
+        return
+
+    logger = current_app.logger
+
+    def log_failure(future):
+        if future.exception() is not None:
+            logger.error(f'Image renditions failed for {key}: {future.exception()}')
+
+    pool.get().submit(process_image, *args).add_done_callback(log_failure)
+
+
+def media_url(key, rendition, extension='webp'):
+    """URL of a public rendition of a stored image"""
+    return url_for('main.media', filename=f'{key[:2]}/{key}_{rendition}.{extension}')
+
+
+def image_url(value, rendition='card', extension='webp', legacy_folder='uploads/profiles'):
+    """
+    URL for an image column that holds a content key
+    Values from before the pipeline are plain file names under legacy_folder.
+    """
+    if not value:
+        return None
+    if CONTENT_KEY.match(value):
+        return media_url(value, rendition, extension)
+    return url_for('static', filename=f'{legacy_folder}/{value}')
@@ -0,0 +1,63 @@
+"""
+Fast JSON provider for API responses
+
+Uses orjson when it is installed and falls back to the standard library
+otherwise. Either way, date and datetime values are encoded as ISO 8601
+strings and Decimal values as floats, so serializers can hand back column
+values as they are instead of converting each field.
+"""
+import decimal
+from datetime import date
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """JSON provider backed by orjson, with the default provider as fallback"""
+
+    @staticmethod
+    def default(o):
+        if isinstance(o, decimal.Decimal):
+            return float(o)
+        if isinstance(o, date):
+            return o.isoformat()
+        return DefaultJSONProvider.default(o)
+
+    def _orjson_options(self, indent=None, sort_keys=None):
+        option = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys if sort_keys is None else sort_keys:
+            option |= orjson.OPT_SORT_KEYS
+        if indent:
+            option |= orjson.OPT_INDENT_2
+        return option
+
+    def dumps(self, obj, **kwargs):
+        if orjson is None or set(kwargs) - {'indent', 'separators', 'sort_keys', 'default'}:
+            kwargs.setdefault('default', self.default)
+            return super().dumps(obj, **kwargs)
+
+        return orjson.dumps(
+            obj,
+            default=kwargs.get('default', self.default),
+            option=self._orjson_options(kwargs.get('indent'), kwargs.get('sort_keys'))
+        ).decode('utf-8')
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        if orjson is None:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+
+        # Encode straight to bytes, skipping the str round trip
+        body = orjson.dumps(obj, default=self.default, option=self._orjson_options(indent))
+        return self._app.response_class(body + b'\n', mimetype=self.mimetype)
@@ -0,0 +1,37 @@
+"""
+Request-scoped memoization
+
+Values are stored on flask.g and tied to the current request, so repeated
+calls while handling one request (e.g. rendering a page and its navbar)
+reuse the first result, and the next request starts empty even when the
+app context is shared, as in tests.
+"""
+import functools
+from flask import g, request, has_request_context
+
+
+def _request_cache():
+    """Get the memo dict for the current request"""
+    current = request._get_current_object()
+    memo = g.get('_request_memo')
+    if memo is None or memo[0] is not current:
+        memo = g._request_memo = (current, {})
+    return memo[1]
+
+
+def request_memoize(func):
+    """Cache a function's result per positional arguments for the current request"""
+    key_prefix = f'{func.__module__}.{func.__qualname__}'
+
+    @functools.wraps(func)
+    def wrapper(*args):
+        if not has_request_context():
+            return func(*args)
+
+        cache = _request_cache()
+        key = (key_prefix,) + args
+        if key not in cache:
+            cache[key] = func(*args)
+        return cache[key]
+
+    return wrapper
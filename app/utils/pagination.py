@@ -0,0 +1,142 @@
+"""
+Keyset (cursor) pagination helpers
+
+Pages are fetched with a WHERE clause on the sort key of the last row seen
+instead of OFFSET, so every page costs the same no matter how deep it is.
+"""
+import base64
+import json
+from datetime import date, datetime
+from decimal import Decimal
+from sqlalchemy import and_, or_
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor is malformed or for another sort order"""
+
+
+class KeysetPage:
+    """One page of keyset-paginated results"""
+
+    def __init__(self, items, next_cursor, per_page, total=None):
+        self.items = items
+        self.next_cursor = next_cursor
+        self.per_page = per_page
+        self.total = total
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def serialize(self):
+        data = {
+            'per_page': self.per_page,
+            'has_next': self.has_next,
+            'next_cursor': self.next_cursor
+        }
+        if self.total is not None:
+            data['total'] = self.total
+        return data
+
+
+def _encode_value(value):
+    """Tag values that JSON cannot round-trip on its own"""
+    if isinstance(value, datetime):
+        return ['dt', value.isoformat()]
+    if isinstance(value, date):
+        return ['d', value.isoformat()]
+    if isinstance(value, Decimal):
+        return ['n', str(value)]
+    return ['v', value]
+
+
+def _decode_value(tagged):
+    tag, value = tagged
+    if tag == 'dt':
+        return datetime.fromisoformat(value)
+    if tag == 'd':
+        return date.fromisoformat(value)
+    if tag == 'n':
+        return Decimal(value)
+    return value
+
+
+def encode_cursor(sort_name, values):
+    """Build an opaque cursor token from the sort key values of a row"""
+    payload = {'s': sort_name, 'k': [_encode_value(v) for v in values]}
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(token, sort_name):
+    """Decode a cursor token, checking it belongs to the same sort order"""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        values = [_decode_value(v) for v in payload['k']]
+    except (ValueError, KeyError, TypeError) as e:
+        raise InvalidCursor('Invalid pagination cursor') from e
+
+    if payload.get('s') != sort_name:
+        raise InvalidCursor('Cursor does not match the requested sort order')
+    return values
+
+
+def _after_clause(sort_keys, values):
+    """WHERE clause selecting rows strictly after `values` in sort order"""
+    clauses = []
+    for i, (expression, direction) in enumerate(sort_keys):
+        equal_prefix = [sort_keys[j][0] == values[j] for j in range(i)]
+        value = values[i]
+        if isinstance(value, bool):
+            # Booleans only support equality; False sorts before True
+            if value != (direction == 'desc'):
+                continue
+            step = expression == (not value)
+        elif direction == 'desc':
+            step = expression < value
+        else:
+            step = expression > value
+        clauses.append(and_(*equal_prefix, step))
+    return or_(*clauses)
+
+
+def keyset_paginate(query, sort_name, sort_keys, cursor=None, per_page=20, with_total=False):
+    """
+    Paginate a query by its sort keys
+
+    Args:
+        query: ORM query for a single entity, without ORDER BY
+        sort_name: Name of the sort order, stored in the cursor
+        sort_keys: List of (expression, 'asc'|'desc'); the last key must be
+            unique per row (usually the primary key)
+        cursor: Token from a previous page's next_cursor, or None
+        per_page: Page size; values below 1 are treated as 1
+        with_total: Also run a COUNT over the filtered query
+
+    Returns:
+        KeysetPage
+    """
+    per_page = max(1, per_page)
+    total = query.order_by(None).count() if with_total else None
+
+    if cursor:
+        values = decode_cursor(cursor, sort_name)
+        if len(values) != len(sort_keys):
+            raise InvalidCursor('Cursor does not match the requested sort order')
+        query = query.filter(_after_clause(sort_keys, values))
+
+    # Select the key values alongside each row to build the next cursor
+    key_columns = [expression.label(f'_sort_key_{i}') for i, (expression, _) in enumerate(sort_keys)]
+    ordering = [
+        expression.desc() if direction == 'desc' else expression.asc()
+        for expression, direction in sort_keys
+    ]
+    rows = query.add_columns(*key_columns).order_by(*ordering).limit(per_page + 1).all()
+
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        next_cursor = encode_cursor(sort_name, list(rows[-1][1:]))
+
+    return KeysetPage([row[0] for row in rows], next_cursor, per_page, total)
@@ -7,9 +7,11 @@ from flask_login import current_user
 from flask_mail import Message
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from weasyprint import HTML, CSS
 from io import BytesIO
 from app.extensions import mail
+from app.utils.documents import document_key, cached_document
+
+INVOICE_TEMPLATE = 'invoices/booking_invoice.html'
 
 def roles_required(*roles):
     """Decorator to require specific user roles"""
@@ -114,6 +116,15 @@ def send_sms(phone, message):
         current_app.logger.error(f'Failed to send SMS to {phone}: {str(e)}')
         return False
 
+def invoice_version(booking):
+    """Values that change whenever anything shown on a booking's invoice does"""
+    organizer = booking.trip.organizer
+    return (
+        'invoice', booking.id, booking.updated_at,
+        booking.vendor.updated_at, booking.trip.updated_at,
+        organizer.updated_at if organizer else None
+    )
+
 def generate_invoice_pdf(booking):
     """
     Generate PDF invoice for a booking
@@ -125,13 +136,12 @@ def generate_invoice_pdf(booking):
         BytesIO object containing the PDF data
     """
     try:
-        # Render HTML template for invoice
-        html_content = render_template('invoices/booking_invoice.html', booking=booking)
+        # Rendered in the document worker pool, or read from the PDF cache
+        key = document_key(INVOICE_TEMPLATE, *invoice_version(booking))
+        path = cached_document(INVOICE_TEMPLATE, key, booking=booking)
         
-        # Create PDF from HTML
-        pdf_buffer = BytesIO()
-        HTML(string=html_content).write_pdf(pdf_buffer)
-        pdf_buffer.seek(0)
+        with open(path, 'rb') as f:
+            pdf_buffer = BytesIO(f.read())
         
         current_app.logger.info(f'Invoice PDF generated for booking {booking.id}')
         return pdf_buffer
@@ -247,56 +257,13 @@ def process_csv_participants(csv_file, trip):
     Returns:
         tuple: (success_count, error_list)
     """
-    import csv
-    from io import StringIO
-    from app.models import Participant
     from app.extensions import db
-    
-    success_count = 0
-    errors = []
+    from app.trips.importer import ParticipantImporter, open_text_stream
     
     try:
-        # Read CSV content
-        csv_content = csv_file.read().decode('utf-8')
-        csv_file = StringIO(csv_content)
-        
-        reader = csv.DictReader(csv_file)
-        
-        for row_num, row in enumerate(reader, start=2):  # Start at 2 because row 1 is headers
-            try:
-                # Validate required fields
-                if not row.get('first_name') or not row.get('last_name'):
-                    errors.append(f"Row {row_num}: First name and last name are required")
-                    continue
-                
-                # Create participant
-                participant = Participant(
-                    first_name=row['first_name'].strip(),
-                    last_name=row['last_name'].strip(),
-                    email=row.get('email', '').strip() or None,
-                    phone=row.get('phone', '').strip() or None,
-                    grade_level=row.get('grade_level', '').strip() or None,
-                    student_id=row.get('student_id', '').strip() or None,
-                    medical_conditions=row.get('medical_conditions', '').strip() or None,
-                    allergies=row.get('allergies', '').strip() or None,
-                    dietary_restrictions=row.get('dietary_restrictions', '').strip() or None,
-                    emergency_contact_1_name=row.get('emergency_contact_1_name', '').strip() or None,
-                    emergency_contact_1_phone=row.get('emergency_contact_1_phone', '').strip() or None,
-                    emergency_contact_1_relationship=row.get('emergency_contact_1_relationship', '').strip() or None,
-                    trip_id=trip.id
-                )
-                
-                db.session.add(participant)
-                success_count += 1
-                
-            except Exception as e:
-                errors.append(f"Row {row_num}: {str(e)}")
-        
-        if success_count > 0:
-            db.session.commit()
-            
+        result = ParticipantImporter(trip).run(open_text_stream(csv_file))
     except Exception as e:
-        errors.append(f"Failed to process CSV file: {str(e)}")
         db.session.rollback()
+        return 0, [f"Failed to process CSV file: {str(e)}"]
     
-    return success_count, errors
\ No newline at end of file
+    return result.added, result.messages
\ No newline at end of file
@@ -0,0 +1,56 @@
+"""
+Process pools for CPU-heavy work (PDF rendering, image resizing)
+
+Each pool is sized from a config key and started on first use with the
+'spawn' start method, which is safe from eventlet-patched processes.
+A size of 0 means "run in this process", which tests rely on.
+"""
+import atexit
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from flask import current_app
+
+
+class WorkerPool:
+    """Lazily started ProcessPoolExecutor sized by app.config[size_key]"""
+
+    def __init__(self, size_key, initializer=None, initargs=None):
+        self.size_key = size_key
+        self.initializer = initializer
+        # Called with the app to build the initializer's arguments
+        self.initargs = initargs
+        self._executor = None
+        self._lock = threading.Lock()
+
+    @property
+    def size(self):
+        return current_app.config.get(self.size_key) or 0
+
+    def get(self):
+        """The running executor, started if needed"""
+        with self._lock:
+            if self._executor is None:
+                app = current_app._get_current_object()
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.size,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=self.initializer,
+                    initargs=self.initargs(app) if self.initargs else ()
+                )
+                atexit.register(self._executor.shutdown, wait=False)
+            return self._executor
+
+    def warm(self):
+        """Start every worker process now instead of on the first tasks"""
+        if self.size:
+            executor = self.get()
+            for future in [executor.submit(int) for _ in range(self.size)]:
+                future.result()
+
+    def shutdown(self):
+        """Stop the worker processes; the next task starts a new pool"""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+            self._executor = None
@@ -0,0 +1,25 @@
+from sqlalchemy import event
+
+
+class QueryCounter:
+    """Record SQL statements executed against the engine"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.statements = []
+        self.parameters = []
+
+    @property
+    def count(self):
+        return len(self.statements)
+
+    def _before_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self.statements.append(statement)
+        self.parameters.append(parameters)
+
+    def __enter__(self):
+        event.listen(self.engine, 'before_cursor_execute', self._before_execute)
+        return self
+
+    def __exit__(self, *args):
+        event.remove(self.engine, 'before_cursor_execute', self._before_execute)
@@ -0,0 +1,191 @@
+import threading
+import unittest
+from datetime import date, timedelta
+from decimal import Decimal
+from flask_testing import TestCase
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.vendor import Vendor
+from app.models.advertisement import Advertisement
+from app.vendor.ad_events import AdEventAggregator
+from app.vendor.ad_index import get_ads_for_user, invalidate_ad_index
+
+from helpers import QueryCounter
+
+
+class AdEventAggregatorTestCase(TestCase):
+    """Ad impressions and clicks are buffered and flushed with atomic increments"""
+
+    def create_app(self):
+        return create_app('testing')
+
+    def setUp(self):
+        db.create_all()
+
+        user = User(email='vendor@test.com', first_name='Test', last_name='Vendor', role='vendor')
+        user.password = 'password123'
+        db.session.add(user)
+        db.session.commit()
+
+        vendor = Vendor(
+            business_name='Test Transport',
+            contact_email='vendor@test.com',
+            contact_phone='+254700000000',
+            user_id=user.id
+        )
+        db.session.add(vendor)
+        db.session.commit()
+
+        self.ad = Advertisement(
+            title='Spring Safari',
+            content='Book now',
+            target_audience='all',
+            start_date=date.today(),
+            end_date=date.today() + timedelta(days=7),
+            budget=Decimal('5.00'),
+            cost_per_click=Decimal('2.00'),
+            vendor_id=vendor.id
+        )
+        db.session.add(self.ad)
+        db.session.commit()
+
+        self.events = AdEventAggregator()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+
+    def reload_ad(self):
+        db.session.expire_all()
+        return db.session.get(Advertisement, self.ad.id)
+
+    def test_impressions_flushed_in_one_batch(self):
+        """Concurrent impressions are all counted and written on flush"""
+        def record():
+            with self.app.app_context():
+                for _ in range(200):
+                    self.events.record_impression(self.ad)
+
+        threads = [threading.Thread(target=record) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.reload_ad().impressions, 0)
+        self.events.flush()
+        self.assertEqual(self.reload_ad().impressions, 800)
+
+    def test_clicks_capped_at_budget(self):
+        """Clicks past the budget are counted but not charged"""
+        charges = [self.events.record_click(self.ad) for _ in range(4)]
+        self.assertEqual(charges, [Decimal('2.00'), Decimal('2.00'), Decimal('1.00'), Decimal('0')])
+        self.assertTrue(self.events.is_exhausted(self.ad.id))
+
+        self.events.flush()
+        ad = self.reload_ad()
+        self.assertEqual(ad.clicks, 4)
+        self.assertEqual(ad.total_spent, Decimal('5.00'))
+
+    def test_failed_flush_keeps_counts(self):
+        """Counts survive a failed flush and are written by the next one"""
+        self.events.record_impression(self.ad)
+        write = self.events._write
+
+        def fail(pending):
+            raise RuntimeError('database unavailable')
+
+        self.events._write = fail
+        self.assertEqual(self.events.flush(), 0)
+        self.assertEqual(self.events.pending_counts(self.ad.id)[0], 1)
+
+        self.events._write = write
+        self.events.flush()
+        self.assertEqual(self.reload_ad().impressions, 1)
+
+
+class AdIndexTestCase(TestCase):
+    """Ad slots are filled from the in-memory index with targeting applied"""
+
+    def create_app(self):
+        return create_app('testing')
+
+    def setUp(self):
+        db.create_all()
+        invalidate_ad_index()
+
+        vendor_user = User(email='vendor@test.com', first_name='Test', last_name='Vendor', role='vendor')
+        vendor_user.password = 'password123'
+        self.teacher = User(email='teacher@test.com', first_name='Test', last_name='Teacher', role='teacher')
+        self.teacher.password = 'password123'
+        db.session.add_all([vendor_user, self.teacher])
+        db.session.commit()
+
+        vendor = Vendor(
+            business_name='Test Transport',
+            contact_email='vendor@test.com',
+            contact_phone='+254700000000',
+            user_id=vendor_user.id
+        )
+        db.session.add(vendor)
+        db.session.commit()
+
+        def ad(title, **kwargs):
+            values = dict(
+                title=title,
+                content='Book now',
+                target_audience='all',
+                placement='sidebar',
+                start_date=date.today(),
+                end_date=date.today() + timedelta(days=7),
+                vendor_id=vendor.id
+            )
+            values.update(kwargs)
+            return Advertisement(**values)
+
+        db.session.add_all([
+            ad('Everyone'),
+            ad('Teachers', target_audience='teachers'),
+            ad('Parents', target_audience='parents'),
+            ad('Middle school', grade_levels=['6-8']),
+            ad('Nairobi', locations=['Nairobi']),
+            ad('Header', placement='header'),
+            ad('Next month', start_date=date.today() + timedelta(days=30), end_date=date.today() + timedelta(days=40)),
+            ad('Spent', budget=Decimal('10.00'), total_spent=Decimal('10.00')),
+        ])
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        invalidate_ad_index()
+
+    def titles(self, **kwargs):
+        return [ad.title for ad in get_ads_for_user(self.teacher, **kwargs)]
+
+    def test_targeting(self):
+        """Audience, placement, dates, budget and JSON targeting are applied"""
+        self.assertEqual(self.titles(placement='sidebar'), ['Everyone', 'Teachers'])
+        self.assertEqual(self.titles(placement='sidebar', grade_level='6-8'), ['Everyone', 'Teachers', 'Middle school'])
+        self.assertEqual(self.titles(placement='sidebar', location='Nairobi, Kenya'), ['Everyone', 'Teachers', 'Nairobi'])
+        self.assertEqual(self.titles(), ['Everyone', 'Teachers', 'Header'])
+
+    def test_serving_runs_no_queries(self):
+        """A warm index fills ad slots without touching the database"""
+        self.titles(placement='sidebar')
+        with QueryCounter(db.engine) as counter:
+            self.titles(placement='sidebar')
+            self.titles(placement='header', grade_level='6-8')
+        self.assertEqual(counter.count, 0)
+
+    def test_edit_refreshes_index(self):
+        """Committing an ad change rebuilds the index"""
+        self.assertIn('Teachers', self.titles(placement='sidebar'))
+        Advertisement.query.filter_by(title='Teachers').first().pause_campaign()
+        self.assertNotIn('Teachers', self.titles(placement='sidebar'))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+import unittest
+from datetime import date, timedelta
+from decimal import Decimal
+from flask_testing import TestCase
+from sqlalchemy import update
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.trip import Trip
+from app.models.participant import Participant
+from app.models.consent import Consent
+
+from helpers import QueryCounter
+
+
+class ConsentStatusTestCase(TestCase):
+    """consent_complete follows signing, and consent counts are batched"""
+
+    def create_app(self):
+        return create_app('testing')
+
+    def setUp(self):
+        db.create_all()
+
+        self.teacher = User(email='teacher@test.com', first_name='Test', last_name='Teacher', role='teacher')
+        self.teacher.password = 'password123'
+        db.session.add(self.teacher)
+        db.session.commit()
+        self.teacher_id = self.teacher.id
+
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.teacher_id)
+            session['_fresh'] = True
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+
+    def make_trip(self, participants=0, signed=0):
+        """A consent-required trip whose first `signed` participants have signed their consent"""
+        trip = Trip(
+            title='Museum Visit',
+            destination='Nairobi',
+            start_date=date.today() + timedelta(days=10),
+            end_date=date.today() + timedelta(days=11),
+            price_per_student=Decimal('1000.00'),
+            max_participants=1000,
+            consent_required=True,
+            status='active',
+            organizer_id=self.teacher_id
+        )
+        db.session.add(trip)
+        db.session.flush()
+
+        for i in range(participants):
+            participant = Participant(first_name=f'First{i}', last_name=f'Last{i}', trip_id=trip.id,
+                                      consent_complete=i < signed)
+            db.session.add(participant)
+            db.session.flush()
+            db.session.add(Consent(consent_type='trip_participation', title='Trip consent', content='I agree',
+                                   participant_id=participant.id, is_signed=i < signed))
+        db.session.commit()
+        return trip
+
+    def consent_for(self, participant, **kwargs):
+        consent = Consent(consent_type='trip_participation', title='Trip consent', content='I agree',
+                          participant_id=participant.id, **kwargs)
+        db.session.add(consent)
+        db.session.commit()
+        return consent
+
+    def test_flag_follows_sign_and_revoke(self):
+        trip = self.make_trip()
+        participant = Participant(first_name='Amina', last_name='Otieno', trip_id=trip.id)
+        db.session.add(participant)
+        db.session.commit()
+        first = self.consent_for(participant)
+        second = self.consent_for(participant)
+        self.assertFalse(participant.has_all_consents())
+
+        first.sign_consent('Parent Otieno', 'parent', 'parent@test.com')
+        self.assertTrue(participant.consent_complete)
+        self.assertTrue(participant.has_all_consents())
+
+        second.sign_consent('Parent Otieno', 'parent', 'parent@test.com')
+        first.revoke_consent()
+        # Still covered by the other signed consent
+        self.assertTrue(participant.consent_complete)
+
+        second.revoke_consent()
+        self.assertFalse(participant.consent_complete)
+        self.assertFalse(participant.has_all_consents())
+
+    def test_sync_consent_flags_fixes_drift(self):
+        trip = self.make_trip(participants=4, signed=2)
+        participants = Participant.query.filter_by(trip_id=trip.id).order_by(Participant.id).all()
+        db.session.execute(update(Participant).where(Participant.id.in_([
+            participants[0].id, participants[3].id
+        ])).values(consent_complete=db.not_(Participant.consent_complete)))
+        db.session.commit()
+
+        result = self.app.test_cli_runner().invoke(args=['sync-consent-flags'])
+        self.assertIn('Updated consent status for 2 participants', result.output)
+
+        db.session.expire_all()
+        self.assertEqual([p.consent_complete for p in participants], [True, True, False, False])
+        result = self.app.test_cli_runner().invoke(args=['sync-consent-flags'])
+        self.assertIn('Updated consent status for 0 participants', result.output)
+
+    def test_status_counts(self):
+        busy = self.make_trip(participants=3, signed=1)
+        empty = self.make_trip()
+        participants = Participant.query.filter_by(trip_id=busy.id).order_by(Participant.id).all()
+        self.consent_for(participants[0])
+
+        self.assertEqual(Consent.status_counts_for_trips([busy.id, empty.id]), {
+            busy.id: {'signed': 1, 'pending': 3},
+            empty.id: {'signed': 0, 'pending': 0},
+        })
+        self.assertEqual(Consent.status_counts_for_participants(p.id for p in participants), {
+            participants[0].id: {'signed': 1, 'pending': 1},
+            participants[1].id: {'signed': 0, 'pending': 1},
+            participants[2].id: {'signed': 0, 'pending': 1},
+        })
+        self.assertEqual(Consent.status_counts_for_trips([]), {})
+
+    def count_queries(self, url):
+        # Expire rather than expunge: the logged-in user stays cached on g between requests
+        db.session.expire_all()
+        with QueryCounter(db.engine) as counter:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return counter.count, response.get_json()
+
+    def test_trip_list_query_count_is_constant(self):
+        self.make_trip(participants=2, signed=1)
+        few, data = self.count_queries('/teacher/api/trips?per_page=20')
+        self.assertEqual(data['trips'][0]['pending_consents'], 1)
+
+        for _ in range(19):
+            self.make_trip(participants=30, signed=10)
+        many, data = self.count_queries('/teacher/api/trips?per_page=20')
+        self.assertEqual(len(data['trips']), 20)
+        self.assertEqual(sorted(trip['pending_consents'] for trip in data['trips']), [1] + [20] * 19)
+        self.assertEqual(many, few)
+
+    def test_trip_detail_query_count_is_constant(self):
+        small = self.make_trip(participants=2, signed=1).id
+        large = self.make_trip(participants=60, signed=20).id
+
+        few, data = self.count_queries(f'/teacher/api/trips/{small}')
+        self.assertEqual([p['consent_status'] for p in data['trip']['participants']], ['signed', 'pending'])
+
+        many, data = self.count_queries(f'/teacher/api/trips/{large}')
+        participants = data['trip']['participants']
+        self.assertEqual(sum(p['consent_status'] == 'signed' for p in participants), 20)
+        self.assertEqual(sum(p['consents_pending'] for p in participants), 40)
+        self.assertEqual(many, few)
+
+
+if __name__ == '__main__':
+    unittest.main()
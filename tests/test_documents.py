@@ -0,0 +1,261 @@
+import io
+import os
+import shutil
+import unittest
+import zipfile
+from concurrent.futures import Future
+from datetime import date, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+from flask_testing import TestCase
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.trip import Trip
+from app.models.participant import Participant
+from app.models.consent import Consent
+from app.utils import documents
+from app.trips.paperwork import CONSENT_TEMPLATE
+
+
+class ConsentDocumentTestCase(TestCase):
+    """Consent PDFs are rendered once per version and served with conditional GET"""
+
+    def create_app(self):
+        return create_app('testing')
+
+    def setUp(self):
+        db.create_all()
+
+        teacher = User(email='teacher@test.com', first_name='Test', last_name='Teacher', role='teacher')
+        teacher.password = 'password123'
+        self.parent = User(email='parent@test.com', first_name='Test', last_name='Parent', role='parent')
+        self.parent.password = 'password123'
+        db.session.add_all([teacher, self.parent])
+        db.session.commit()
+
+        trip = Trip(
+            title='Museum Visit',
+            destination='Nairobi',
+            start_date=date.today() + timedelta(days=10),
+            end_date=date.today() + timedelta(days=11),
+            price_per_student=Decimal('1000.00'),
+            organizer_id=teacher.id
+        )
+        db.session.add(trip)
+        db.session.commit()
+
+        self.participant = Participant(first_name='Amina', last_name='Otieno', trip_id=trip.id, user_id=self.parent.id)
+        db.session.add(self.participant)
+        db.session.commit()
+
+        self.consent = Consent(
+            consent_type='trip_participation',
+            title='Trip Participation',
+            content='I consent.',
+            participant_id=self.participant.id,
+            parent_id=self.parent.id
+        )
+        db.session.add(self.consent)
+        db.session.commit()
+        self.consent.sign_consent('Test Parent', 'parent', 'parent@test.com', signature_data='typed:Test Parent')
+
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.parent.id)
+            session['_fresh'] = True
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        shutil.rmtree(self.app.config['DOCUMENT_CACHE_FOLDER'], ignore_errors=True)
+
+    def test_consent_pdf_cached_and_conditional(self):
+        """The second request is served from the cache; a matching ETag gets a 304"""
+        url = f'/parents/consent-pdf/{self.participant.id}'
+        with patch.object(documents, '_render_pdf', wraps=documents._render_pdf) as render:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.mimetype, 'application/pdf')
+            self.assertTrue(response.data.startswith(b'%PDF'))
+            etag = response.headers['ETag']
+            response.close()
+
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.headers['ETag'], etag)
+            response.close()
+
+            response = self.client.get(url, headers={'If-None-Match': etag})
+            self.assertEqual(response.status_code, 304)
+            self.assertIn('private', response.headers['Cache-Control'])
+
+            self.assertEqual(render.call_count, 1)
+
+    def test_new_consent_version_renders_again(self):
+        """Changing the consent invalidates the cached PDF"""
+        url = f'/parents/consent-pdf/{self.participant.id}'
+        etag = self.client.get(url).headers['ETag']
+
+        self.consent.version = '1.1'
+        db.session.commit()
+
+        response = self.client.get(url, headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response.headers['ETag'], etag)
+
+    def test_new_version_replaces_cached_file(self):
+        """Writing a new version removes the old one but not other documents"""
+        folder = self.app.config['DOCUMENT_CACHE_FOLDER']
+        # Another consent, and a medical summary for the same record id
+        other_paths = [
+            os.path.join(folder, documents.document_key(CONSENT_TEMPLATE, kind, record_id, '1.0') + '.pdf')
+            for kind, record_id in [('consent', self.consent.id + 1), ('medical', self.consent.id)]
+        ]
+        os.makedirs(folder, exist_ok=True)
+        for path in other_paths:
+            documents._save_pdf(path, b'%PDF-1.7')
+
+        url = f'/parents/consent-pdf/{self.participant.id}'
+        self.client.get(url).close()
+        self.consent.version = '1.1'
+        db.session.commit()
+        etag = self.client.get(url).headers['ETag'].strip('"')
+
+        self.assertEqual(sorted(os.listdir(folder)),
+                         sorted([f'{etag}.pdf'] + [os.path.basename(path) for path in other_paths]))
+        self.assertTrue(etag.startswith(f'consent_{self.consent.id}_'))
+
+
+class PaperworkPackTestCase(TestCase):
+    """Paperwork packs bundle consent forms and medical summaries for a whole trip"""
+
+    def create_app(self):
+        return create_app('testing')
+
+    def setUp(self):
+        db.create_all()
+
+        self.teacher = User(email='teacher@test.com', first_name='Test', last_name='Teacher', role='teacher')
+        self.teacher.password = 'password123'
+        db.session.add(self.teacher)
+        db.session.commit()
+
+        self.trip = Trip(
+            title='Museum Visit',
+            destination='Nairobi',
+            start_date=date.today() + timedelta(days=10),
+            end_date=date.today() + timedelta(days=11),
+            price_per_student=Decimal('1000.00'),
+            organizer_id=self.teacher.id
+        )
+        db.session.add(self.trip)
+        db.session.commit()
+
+        participants = [
+            Participant(first_name=f'First{i}', last_name=f'Last{i}', trip_id=self.trip.id)
+            for i in range(5)
+        ]
+        db.session.add_all(participants)
+        db.session.commit()
+        for participant in participants[:3]:
+            consent = Consent(
+                consent_type='trip_participation',
+                title='Trip Participation',
+                content='I consent.',
+                participant_id=participant.id
+            )
+            db.session.add(consent)
+            db.session.commit()
+            consent.sign_consent('Parent', 'parent', 'parent@test.com', signature_data='typed:Parent')
+
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.teacher.id)
+            session['_fresh'] = True
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        shutil.rmtree(self.app.config['DOCUMENT_CACHE_FOLDER'], ignore_errors=True)
+
+    def build_pack(self):
+        response = self.client.post('/api/jobs', json={'job_type': 'trip_paperwork', 'trip_id': self.trip.id})
+        self.assertEqual(response.status_code, 202)
+        job = response.get_json()['job']
+        self.assertEqual(job['status'], 'completed')
+        return job
+
+    def test_zip_pack_reuses_cached_documents(self):
+        """Every participant gets a medical summary, signed ones a consent; renders are reused"""
+        with patch.object(documents, '_render_pdf', wraps=documents._render_pdf) as render:
+            job = self.build_pack()
+            self.assertEqual(job['total_rows'], 8)
+            self.assertEqual(render.call_count, 8)
+
+            download = self.client.get(f"/api/jobs/{job['id']}/download")
+            self.assertEqual(download.status_code, 200)
+            self.assertEqual(download.mimetype, 'application/zip')
+            names = zipfile.ZipFile(io.BytesIO(download.data)).namelist()
+            download.close()
+            self.assertEqual(len(names), 8)
+            self.assertIn('001_Last0_First0_consent.pdf', names)
+            self.assertIn('005_Last4_First4_medical.pdf', names)
+
+            self.build_pack()
+            self.assertEqual(render.call_count, 8)
+
+    def test_unknown_pack_format_rejected(self):
+        response = self.client.post('/api/jobs', json={'job_type': 'trip_paperwork', 'trip_id': self.trip.id, 'format': 'docx'})
+        self.assertEqual(response.status_code, 400)
+
+
+class StalledExecutor:
+    """Executor whose tasks never start, like a pool busy with hung renders"""
+
+    def __init__(self):
+        self.futures = []
+
+    def submit(self, fn, *args):
+        future = Future()
+        self.futures.append(future)
+        return future
+
+
+class DocumentTimeoutTestCase(TestCase):
+    """Renders that outlast DOCUMENT_RENDER_TIMEOUT are cancelled and reported"""
+
+    def create_app(self):
+        app = create_app('testing')
+        app.config['DOCUMENT_WORKERS'] = 2
+        app.config['DOCUMENT_RENDER_TIMEOUT'] = 0.01
+        return app
+
+    def setUp(self):
+        self.executor = StalledExecutor()
+        self.patches = [
+            patch.object(documents.pool, 'get', return_value=self.executor),
+            patch.object(documents, 'render_template', return_value='<p>Document</p>'),
+        ]
+        for patcher in self.patches:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in self.patches:
+            patcher.stop()
+        shutil.rmtree(self.app.config['DOCUMENT_CACHE_FOLDER'], ignore_errors=True)
+
+    def test_render_pdf_timeout(self):
+        with self.assertRaises(documents.DocumentRenderError):
+            documents.render_pdf('<p>Document</p>')
+        self.assertTrue(self.executor.futures[0].cancelled())
+
+    def test_cached_documents_timeout(self):
+        pending = [('documents/consent.html', f'key{i}', {}) for i in range(3)]
+        with self.assertRaises(documents.DocumentRenderError):
+            documents.cached_documents(pending)
+        self.assertEqual(len(self.executor.futures), 3)
+        self.assertTrue(all(future.cancelled() for future in self.executor.futures))
+
+
+if __name__ == '__main__':
+    unittest.main()
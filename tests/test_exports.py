@@ -0,0 +1,132 @@
+import io
+import unittest
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from flask_testing import TestCase
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.trip import Trip
+from app.models.participant import Participant
+from app.models.payment import Payment
+from app.models.location import Location
+from app.utils.exports import EXPORT_FORMATS, openpyxl, write_xlsx
+
+from helpers import QueryCounter
+
+
+class TripExportTestCase(TestCase):
+    """Trip exports stream projected rows without per-row queries"""
+
+    def create_app(self):
+        return create_app('testing')
+
+    def setUp(self):
+        db.create_all()
+
+        self.teacher = User(email='teacher@test.com', first_name='Test', last_name='Teacher', role='teacher')
+        self.teacher.password = 'password123'
+        db.session.add(self.teacher)
+        db.session.commit()
+
+        self.trip = Trip(
+            title='Museum Visit',
+            destination='Nairobi',
+            start_date=date.today() + timedelta(days=10),
+            end_date=date.today() + timedelta(days=11),
+            price_per_student=Decimal('1000.00'),
+            max_participants=100,
+            organizer_id=self.teacher.id
+        )
+        db.session.add(self.trip)
+        db.session.commit()
+
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.teacher.id)
+            session['_fresh'] = True
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+
+    def count_queries(self, func):
+        with QueryCounter(db.engine) as counter:
+            result = func()
+        return result, counter.statements
+
+    def test_participant_export(self):
+        """Participant rows include the outstanding balance from the trip price"""
+        participants = [
+            Participant(first_name=f'First{i}', last_name=f'Last{i:02d}', trip_id=self.trip.id,
+                        amount_paid=Decimal('250.00') if i == 0 else None)
+            for i in range(30)
+        ]
+        db.session.add_all(participants)
+        db.session.commit()
+        db.session.expire_all()
+
+        def export():
+            response = self.client.get(f'/trips/{self.trip.id}/export/participants')
+            return response, response.get_data(as_text=True)
+
+        (response, body), statements = self.count_queries(export)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/csv')
+        lines = body.strip().splitlines()
+        self.assertEqual(len(lines), 31)
+        self.assertTrue(lines[0].startswith('First Name,Last Name'))
+        self.assertIn('First0,Last00,,,,,registered,pending,250.0,750.0', lines[1])
+        exports = [s for s in statements if 'FROM participants' in s]
+        self.assertEqual(len(exports), 1)
+
+    def test_payment_and_location_exports(self):
+        """Payments carry the participant's name; the GPS track is in time order"""
+        participant = Participant(first_name='Amina', last_name='Otieno', trip_id=self.trip.id)
+        db.session.add(participant)
+        db.session.commit()
+        db.session.add(Payment(amount=Decimal('500.00'), payment_method='mpesa', trip_id=self.trip.id, participant_id=participant.id))
+        start = datetime(2026, 1, 1, 8, 0)
+        db.session.add_all([
+            Location(latitude=-1.28 + i / 1000, longitude=36.82, device_id='phone-1', timestamp=start + timedelta(minutes=i),
+                     trip_id=self.trip.id, user_id=self.teacher.id)
+            for i in reversed(range(5))
+        ])
+        db.session.commit()
+
+        payments = self.client.get(f'/trips/{self.trip.id}/export/payments').get_data(as_text=True)
+        self.assertEqual(len(payments.strip().splitlines()), 2)
+        self.assertIn('Amina,Otieno', payments)
+
+        track = self.client.get(f'/trips/{self.trip.id}/export/locations').get_data(as_text=True)
+        rows = track.strip().splitlines()[1:]
+        self.assertEqual(len(rows), 5)
+        self.assertTrue(rows[0].startswith('2026-01-01 08:00:00'))
+
+    def test_unknown_dataset(self):
+        """Unknown datasets are not found"""
+        response = self.client.get(f'/trips/{self.trip.id}/export/passwords')
+        self.assertEqual(response.status_code, 404)
+
+    @unittest.skipIf(openpyxl is not None, 'openpyxl is installed')
+    def test_xlsx_hidden_without_openpyxl(self):
+        self.assertEqual(EXPORT_FORMATS, ('csv',))
+        response = self.client.get(f'/trips/{self.trip.id}/export/participants?format=xlsx')
+        self.assertEqual(response.status_code, 302)
+
+    @unittest.skipIf(openpyxl is None, 'openpyxl is not installed')
+    def test_write_xlsx(self):
+        self.assertIn('xlsx', EXPORT_FORMATS)
+        target = io.BytesIO()
+        write_xlsx(['Name', 'Paid'], [('Amina', Decimal('250.00')), ('Brian', None)], target)
+
+        target.seek(0)
+        sheet = openpyxl.load_workbook(target).active
+        self.assertEqual(
+            [list(row) for row in sheet.iter_rows(values_only=True)],
+            [['Name', 'Paid'], ['Amina', 250.0], ['Brian', None]]
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from flask_testing import TestCase
+from PIL import Image
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.utils.images import process_image, IMAGE_RENDITIONS
+
+
+def jpeg_bytes(size=(2000, 1500), color=(200, 40, 40)):
+    buffer = io.BytesIO()
+    Image.new('RGB', size, color).save(buffer, 'JPEG')
+    return buffer.getvalue()
+
+
+class ProcessImageTestCase(unittest.TestCase):
+    """Renditions are written in every format at their target sizes"""
+
+    def setUp(self):
+        self.folder = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.folder, ignore_errors=True)
+
+    def test_profile_renditions(self):
+        source = os.path.join(self.folder, 'source.jpg')
+        with open(source, 'wb') as f:
+            f.write(jpeg_bytes())
+
+        written = process_image(source, self.folder, 'abc', IMAGE_RENDITIONS['profile'])
+        self.assertEqual(len(written), 6)
+        with Image.open(os.path.join(self.folder, 'abc_avatar.webp')) as img:
+            self.assertEqual((img.format, img.size), ('WEBP', (80, 80)))
+        with Image.open(os.path.join(self.folder, 'abc_retina.jpg')) as img:
+            self.assertEqual((img.format, img.size), ('JPEG', (600, 600)))
+
+    def test_transparent_png_fits_inside_box(self):
+        source = os.path.join(self.folder, 'source.png')
+        Image.new('RGBA', (1600, 400), (0, 0, 255, 128)).save(source)
+
+        process_image(source, self.folder, 'ad', IMAGE_RENDITIONS['ad'])
+        with Image.open(os.path.join(self.folder, 'ad_card.jpg')) as img:
+            self.assertEqual((img.mode, img.size), ('RGB', (600, 150)))
+        with Image.open(os.path.join(self.folder, 'ad_retina.webp')) as img:
+            self.assertEqual(img.size, (1200, 300))
+
+
+class ProfilePictureTestCase(TestCase):
+    """Profile pictures go through the image pipeline"""
+
+    def create_app(self):
+        return create_app('testing')
+
+    def setUp(self):
+        db.create_all()
+
+        self.user = User(email='teacher@test.com', first_name='Test', last_name='Teacher', role='teacher')
+        self.user.password = 'password123'
+        db.session.add(self.user)
+        db.session.commit()
+
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.user.id)
+            session['_fresh'] = True
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        shutil.rmtree(self.app.config['UPLOAD_ORIGINALS_FOLDER'], ignore_errors=True)
+        shutil.rmtree(self.app.config['MEDIA_FOLDER'], ignore_errors=True)
+
+    def upload(self, data, filename='me.jpg'):
+        return self.client.post('/profile/edit', data={
+            'first_name': 'Test',
+            'last_name': 'Teacher',
+            'profile_picture': (io.BytesIO(data), filename)
+        }, content_type='multipart/form-data')
+
+    def test_upload_stores_content_addressed_renditions(self):
+        """The picture is stored by content key and its renditions are served with long caching"""
+        data = jpeg_bytes()
+        response = self.upload(data)
+        self.assertEqual(response.status_code, 302)
+
+        key = db.session.get(User, self.user.id).profile_picture
+        self.assertRegex(key, r'^[0-9a-f]{32}$')
+
+        media = self.client.get(f'/media/{key[:2]}/{key}_card.webp')
+        self.assertEqual(media.status_code, 200)
+        self.assertIn('immutable', media.headers['Cache-Control'])
+        self.assertIn('max-age=31536000', media.headers['Cache-Control'])
+        media.close()
+
+        # Same bytes, same key
+        self.upload(data, 'copy.jpg')
+        self.assertEqual(db.session.get(User, self.user.id).profile_picture, key)
+
+    def test_non_image_rejected(self):
+        """A file that is not an image is rejected even with an image extension"""
+        response = self.upload(b'not an image', 'fake.jpg')
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(db.session.get(User, self.user.id).profile_picture)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import io
+import unittest
+from datetime import date, timedelta
+from decimal import Decimal
+from flask_testing import TestCase
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.trip import Trip
+from app.models.participant import Participant
+from app.models.job import Job
+
+
+class ImportJobTestCase(TestCase):
+    """Participant imports and exports run as jobs with downloadable results"""
+
+    def create_app(self):
+        return create_app('testing')
+
+    def setUp(self):
+        db.create_all()
+
+        self.teacher = User(email='teacher@test.com', first_name='Test', last_name='Teacher', role='teacher')
+        self.teacher.password = 'password123'
+        db.session.add(self.teacher)
+        db.session.commit()
+
+        self.trip = Trip(
+            title='Museum Visit',
+            destination='Nairobi',
+            start_date=date.today() + timedelta(days=10),
+            end_date=date.today() + timedelta(days=11),
+            price_per_student=Decimal('1000.00'),
+            max_participants=1000,
+            organizer_id=self.teacher.id
+        )
+        db.session.add(self.trip)
+        db.session.commit()
+
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.teacher.id)
+            session['_fresh'] = True
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+
+    def test_background_import_with_error_report(self):
+        """A background upload records progress and an error report"""
+        lines = ['first_name,last_name,student_id'] + [f'First{i},Last{i},S{i}' for i in range(300)] + [',Missing,X1']
+        response = self.client.post(
+            f'/trips/{self.trip.id}/participants/upload_csv',
+            data={'file': (io.BytesIO('\n'.join(lines).encode('utf-8')), 'roster.csv'), 'background': 'true'},
+            content_type='multipart/form-data'
+        )
+        self.assertEqual(response.status_code, 202)
+        job = response.get_json()['job']
+        self.assertEqual(job['status'], 'completed')
+        self.assertEqual(job['rows_done'], 300)
+        self.assertEqual(job['rows_failed'], 1)
+        self.assertEqual(job['total_rows'], 301)
+        self.assertEqual(Participant.query.filter_by(trip_id=self.trip.id).count(), 300)
+
+        report = self.client.get(f"/api/jobs/{job['id']}/download")
+        self.assertEqual(report.status_code, 200)
+        self.assertIn(b'302,"Missing required fields (first_name, last_name)"', report.data)
+
+    def test_export_job(self):
+        """An export job writes every participant to a downloadable CSV"""
+        db.session.add_all([
+            Participant(first_name=f'First{i}', last_name=f'Last{i}', trip_id=self.trip.id)
+            for i in range(25)
+        ])
+        db.session.commit()
+
+        response = self.client.post('/api/jobs', json={'job_type': 'participant_export', 'trip_id': self.trip.id})
+        self.assertEqual(response.status_code, 202)
+        job_id = response.get_json()['job']['id']
+        self.assertEqual(db.session.get(Job, job_id).status, 'completed')
+
+        export = self.client.get(f'/api/jobs/{job_id}/download')
+        self.assertEqual(export.status_code, 200)
+        self.assertEqual(export.data.decode('utf-8').strip().count('\n'), 25)
+
+    def test_unknown_job_type_rejected(self):
+        """Only export job types can be started from the API"""
+        response = self.client.post('/api/jobs', json={'job_type': 'participant_import', 'trip_id': self.trip.id})
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import json
+import unittest
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from unittest.mock import patch
+from flask_testing import TestCase
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.trip import Trip
+from app.models.participant import Participant
+from app.models.location import Location
+from app.utils import json_provider
+
+
+class JSONProviderTests:
+    """Encoding shared by the orjson path and the standard library fallback"""
+
+    def create_app(self):
+        return create_app('testing')
+
+    def setUp(self):
+        db.create_all()
+
+        teacher = User(email='teacher@test.com', first_name='Test', last_name='Teacher', role='teacher')
+        teacher.password = 'password123'
+        db.session.add(teacher)
+        db.session.commit()
+
+        self.trip = Trip(title='Museum Visit', destination='Nairobi',
+                         start_date=date.today() + timedelta(days=10),
+                         end_date=date.today() + timedelta(days=11),
+                         price_per_student=Decimal('1250.50'), organizer_id=teacher.id)
+        db.session.add(self.trip)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+
+    def test_dates_and_decimals(self):
+        encoded = self.app.json.dumps({
+            'day': date(2026, 3, 1),
+            'moment': datetime(2026, 3, 1, 8, 30, 15, 250000),
+            'amount': Decimal('12.50'),
+        })
+        self.assertEqual(json.loads(encoded), {
+            'day': '2026-03-01',
+            'moment': '2026-03-01T08:30:15.250000',
+            'amount': 12.5,
+        })
+
+    def test_sort_keys_and_indent(self):
+        data = {'b': 1, 'a': {'d': 2, 'c': 3}}
+
+        sorted_keys = json.loads(self.app.json.dumps(data))
+        self.assertEqual(list(sorted_keys), ['a', 'b'])
+        self.assertEqual(list(sorted_keys['a']), ['c', 'd'])
+        self.assertEqual(list(json.loads(self.app.json.dumps(data, sort_keys=False))), ['b', 'a'])
+
+        self.assertNotIn('\n', self.app.json.dumps(data))
+        indented = self.app.json.dumps(data, indent=2)
+        self.assertIn('\n  "a"', indented)
+        self.assertEqual(json.loads(indented), data)
+
+    def test_response(self):
+        response = self.app.json.response({'b': 1, 'a': date(2026, 3, 1)})
+        self.assertEqual(response.mimetype, 'application/json')
+        self.assertEqual(response.get_data(as_text=True).count('\n'), 1)
+        self.assertEqual(list(response.get_json()), ['a', 'b'])
+        self.assertEqual(response.get_json()['a'], '2026-03-01')
+
+        self.app.json.compact = False
+        self.assertIn('\n  "a"', self.app.json.response({'b': 1, 'a': 2}).get_data(as_text=True))
+
+    def test_native_serialize_round_trip(self):
+        """serialize(native=True) encodes to what serialize() already holds"""
+        participant = Participant(first_name='Amina', last_name='Otieno', trip_id=self.trip.id,
+                                  date_of_birth=date(2014, 5, 17), amount_paid=Decimal('500.25'))
+        location = Location(name='Gate', latitude=-1.2921, longitude=36.8219, device_id='phone-1',
+                            location_type='checkin', trip_id=self.trip.id,
+                            timestamp=datetime(2026, 3, 1, 8, 30, 15, 250000))
+        db.session.add_all([participant, location])
+        db.session.commit()
+
+        for record in (participant, location):
+            with self.subTest(record=record):
+                native = self.app.json.loads(self.app.json.dumps(record.serialize(native=True)))
+                self.assertEqual(native, json.loads(json.dumps(record.serialize())))
+
+
+@unittest.skipIf(json_provider.orjson is None, 'orjson is not installed')
+class OrjsonProviderTestCase(JSONProviderTests, TestCase):
+
+    def test_encoder(self):
+        self.assertEqual(self.app.json.dumps({'b': 1, 'a': 2}), '{"a":2,"b":1}')
+
+
+class StdlibProviderTestCase(JSONProviderTests, TestCase):
+    """The same behaviour when orjson is not installed"""
+
+    def setUp(self):
+        patcher = patch.object(json_provider, 'orjson', None)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        super().setUp()
+
+    def test_encoder(self):
+        self.assertEqual(self.app.json.dumps({'b': 1, 'a': 2}), '{"a": 2, "b": 1}')
+
+
+if __name__ == '__main__':
+    unittest.main()
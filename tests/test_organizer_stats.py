@@ -0,0 +1,161 @@
+import unittest
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from flask_testing import TestCase
+from sqlalchemy import event
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.trip import Trip
+from app.models.participant import Participant
+from app.models.consent import Consent
+from app.models.organizer_stats import OrganizerStats
+
+from helpers import QueryCounter
+
+
+class OrganizerStatsTestCase(TestCase):
+    """Teacher dashboard statistics are marked stale by changes and recomputed on read"""
+
+    def create_app(self):
+        return create_app('testing')
+
+    def setUp(self):
+        db.create_all()
+
+        self.teacher = User(email='teacher@test.com', first_name='Test', last_name='Teacher', role='teacher')
+        self.teacher.password = 'password123'
+        self.other_teacher = User(email='other@test.com', first_name='Other', last_name='Teacher', role='teacher')
+        self.other_teacher.password = 'password123'
+        db.session.add_all([self.teacher, self.other_teacher])
+        db.session.commit()
+
+        self.trip = Trip(
+            title='Museum Visit',
+            destination='Nairobi',
+            start_date=date.today() + timedelta(days=10),
+            end_date=date.today() + timedelta(days=11),
+            price_per_student=Decimal('1000.00'),
+            organizer_id=self.teacher.id,
+            status='active'
+        )
+        db.session.add(self.trip)
+        db.session.commit()
+
+        self.participant = Participant(first_name='Amina', last_name='Otieno', trip_id=self.trip.id,
+                                       status='confirmed')
+        db.session.add(self.participant)
+        db.session.commit()
+
+        OrganizerStats.refresh([self.teacher.id, self.other_teacher.id])
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+
+    def login(self, user):
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(user.id)
+            session['_fresh'] = True
+
+    def is_stale(self, organizer_id):
+        row = db.session.get(OrganizerStats, organizer_id)
+        db.session.refresh(row)
+        return row.is_stale
+
+    def test_participant_added(self):
+        db.session.add(Participant(first_name='Brian', last_name='Kamau', trip_id=self.trip.id))
+        db.session.commit()
+
+        self.assertTrue(self.is_stale(self.teacher.id))
+        self.assertFalse(self.is_stale(self.other_teacher.id))
+
+    def test_participant_cancelled(self):
+        self.participant.cancel_participation()
+
+        self.assertTrue(self.is_stale(self.teacher.id))
+        self.assertFalse(self.is_stale(self.other_teacher.id))
+        stats = OrganizerStats.get_for(self.teacher.id, max_age=300)
+        self.assertEqual((stats.confirmed_students, stats.active_participants), (0, 0))
+
+    def test_consent_signed(self):
+        consent = Consent(consent_type='trip_participation', title='Trip consent', content='I agree',
+                          participant_id=self.participant.id)
+        db.session.add(consent)
+        db.session.commit()
+        OrganizerStats.refresh([self.teacher.id])
+
+        consent.sign_consent('Parent Otieno', 'parent', 'parent@test.com')
+
+        self.assertTrue(self.is_stale(self.teacher.id))
+        self.assertFalse(self.is_stale(self.other_teacher.id))
+        self.assertEqual(OrganizerStats.get_for(self.teacher.id, max_age=300).consent_completion, 100.0)
+
+    def test_trip_reassigned(self):
+        """Both the previous and the new organizer are marked stale"""
+        self.trip.organizer_id = self.other_teacher.id
+        db.session.commit()
+
+        self.assertTrue(self.is_stale(self.teacher.id))
+        self.assertTrue(self.is_stale(self.other_teacher.id))
+        self.assertEqual(OrganizerStats.get_for(self.teacher.id, max_age=300).total_trips, 0)
+        self.assertEqual(OrganizerStats.get_for(self.other_teacher.id, max_age=300).total_trips, 1)
+
+    def test_max_age(self):
+        row = db.session.get(OrganizerStats, self.teacher.id)
+        self.assertFalse(row.needs_refresh(max_age=300))
+
+        row.refreshed_at = datetime.now() - timedelta(seconds=301)
+        db.session.commit()
+        self.assertTrue(row.needs_refresh(max_age=300))
+
+        refreshed = OrganizerStats.get_for(self.teacher.id, max_age=300)
+        self.assertFalse(refreshed.needs_refresh(max_age=300))
+
+    def test_concurrent_first_read(self):
+        """A row inserted by another request after the missing-row check is reused"""
+        db.session.query(OrganizerStats).delete()
+        db.session.commit()
+
+        inserted = []
+
+        def insert_after_read(conn, cursor, statement, parameters, context, executemany):
+            # Another request commits the row just after refresh() found none
+            if not inserted and 'organizer_stats.organizer_id IN' in statement:
+                inserted.append(True)
+                cursor.connection.execute(
+                    'INSERT INTO organizer_stats (organizer_id, total_trips, upcoming_trips, '
+                    'confirmed_students, active_participants, consented_participants, is_stale, '
+                    'refreshed_at) VALUES (?, 0, 0, 0, 0, 0, 0, ?)',
+                    (self.teacher.id, datetime.now().isoformat(' '))
+                )
+
+        event.listen(db.engine, 'after_cursor_execute', insert_after_read)
+        try:
+            stats = OrganizerStats.get_for(self.teacher.id, max_age=300)
+        finally:
+            event.remove(db.engine, 'after_cursor_execute', insert_after_read)
+
+        self.assertTrue(inserted)
+        self.assertEqual((stats.total_trips, stats.confirmed_students), (1, 1))
+        self.assertEqual(OrganizerStats.query.count(), 1)
+
+    def test_fresh_stats_single_read(self):
+        """The dashboard endpoint reads a fresh row by primary key and nothing else"""
+        self.login(self.teacher)
+
+        with QueryCounter(db.engine) as counter:
+            response = self.client.get('/teacher/api/dashboard/stats')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['stats']['confirmed_students'], 1)
+
+        statements = [statement for statement in counter.statements if 'FROM users' not in statement]
+        self.assertEqual(len(statements), 1)
+        self.assertIn('FROM organizer_stats', statements[0])
+        self.assertIn('WHERE organizer_stats.organizer_id = ?', statements[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
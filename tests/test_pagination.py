@@ -0,0 +1,129 @@
+import unittest
+from datetime import date, timedelta
+from decimal import Decimal
+from flask_testing import TestCase
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.trip import Trip
+from app.utils.pagination import keyset_paginate, InvalidCursor
+
+
+class KeysetPaginationTestCase(TestCase):
+    """Walking keyset pages returns every row once, in sort order"""
+
+    def create_app(self):
+        return create_app('testing')
+
+    def setUp(self):
+        db.create_all()
+
+        teacher = User(email='teacher@test.com', first_name='Test', last_name='Teacher', role='teacher')
+        teacher.password = 'password123'
+        db.session.add(teacher)
+        db.session.commit()
+
+        # Repeated prices and featured flags so page boundaries fall inside ties
+        prices = ['500.00', '500.00', '500.00', '800.00', '800.00', '1000.00', '1200.00', '500.00']
+        for i, price in enumerate(prices):
+            db.session.add(Trip(
+                title=f'Trip {i}',
+                destination='Nairobi',
+                start_date=date.today() + timedelta(days=10 + i),
+                end_date=date.today() + timedelta(days=12 + i),
+                price_per_student=Decimal(price),
+                status='active',
+                featured=i % 3 == 0,
+                organizer_id=teacher.id
+            ))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+
+    def walk(self, sort_keys, per_page=3):
+        """Ids of every page in turn, following next_cursor to the end"""
+        pages = []
+        cursor = None
+        while True:
+            page = keyset_paginate(Trip.query, 'test', sort_keys, cursor=cursor, per_page=per_page)
+            pages.append([trip.id for trip in page.items])
+            if not page.has_next:
+                return pages
+            cursor = page.next_cursor
+
+    def assertWalksInOrder(self, sort_keys):
+        expected = [trip.id for trip in Trip.query.order_by(*[
+            key.desc() if direction == 'desc' else key.asc() for key, direction in sort_keys
+        ])]
+        for per_page in (1, 2, 3, 8):
+            with self.subTest(per_page=per_page):
+                pages = self.walk(sort_keys, per_page)
+                self.assertEqual([trip_id for page in pages for trip_id in page], expected)
+                self.assertTrue(all(0 < len(page) <= per_page for page in pages))
+
+    def test_duplicate_sort_values(self):
+        """Ties on the leading key are broken by id, so none are skipped or repeated"""
+        self.assertWalksInOrder([(Trip.price_per_student, 'asc'), (Trip.id, 'asc')])
+        self.assertWalksInOrder([(Trip.price_per_student, 'desc'), (Trip.id, 'desc')])
+
+    def test_mixed_directions(self):
+        self.assertWalksInOrder([(Trip.price_per_student, 'asc'), (Trip.id, 'desc')])
+        self.assertWalksInOrder([(Trip.price_per_student, 'desc'), (Trip.start_date, 'asc'), (Trip.id, 'asc')])
+
+    def test_boolean_keys(self):
+        self.assertWalksInOrder([(Trip.featured, 'desc'), (Trip.id, 'asc')])
+        self.assertWalksInOrder([(Trip.featured, 'asc'), (Trip.price_per_student, 'desc'), (Trip.id, 'desc')])
+
+    def test_cursor_for_another_sort(self):
+        sort_keys = [(Trip.price_per_student, 'asc'), (Trip.id, 'asc')]
+        page = keyset_paginate(Trip.query, 'price-low', sort_keys, per_page=2)
+
+        with self.assertRaises(InvalidCursor):
+            keyset_paginate(Trip.query, 'price-high', sort_keys, cursor=page.next_cursor, per_page=2)
+        with self.assertRaises(InvalidCursor):
+            keyset_paginate(Trip.query, 'price-low', sort_keys, cursor='not-a-cursor', per_page=2)
+
+    def test_cursor_for_another_sort_api(self):
+        first = self.client.get('/api/trips?sort_by=price-low&cursor=&per_page=2').get_json()
+        cursor = first['pagination']['next_cursor']
+
+        response = self.client.get(f'/api/trips?sort_by=price-high&cursor={cursor}&per_page=2')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(response.get_json()['success'])
+
+    def test_total(self):
+        sort_keys = [(Trip.price_per_student, 'asc'), (Trip.id, 'asc')]
+        self.assertIsNone(keyset_paginate(Trip.query, 'test', sort_keys, per_page=2).total)
+
+        page = keyset_paginate(Trip.query.filter(Trip.price_per_student == 500), 'test', sort_keys,
+                               per_page=2, with_total=True)
+        self.assertEqual(page.total, 4)
+        self.assertEqual(page.serialize()['total'], 4)
+        # The count ignores the cursor
+        page = keyset_paginate(Trip.query, 'test', sort_keys, cursor=page.next_cursor, per_page=2, with_total=True)
+        self.assertEqual(page.total, 8)
+
+        data = self.client.get('/api/trips?sort_by=price-low&cursor=&per_page=2&include_total=true').get_json()
+        self.assertEqual(data['pagination']['total'], 8)
+        data = self.client.get('/api/trips?sort_by=price-low&cursor=&per_page=2').get_json()
+        self.assertNotIn('total', data['pagination'])
+
+    def test_per_page_clamped(self):
+        sort_keys = [(Trip.price_per_student, 'asc'), (Trip.id, 'asc')]
+        for per_page in (0, -1):
+            with self.subTest(per_page=per_page):
+                page = keyset_paginate(Trip.query, 'test', sort_keys, per_page=per_page)
+                self.assertEqual(len(page.items), 1)
+                self.assertTrue(page.has_next)
+
+        data = self.client.get('/api/trips?cursor=&per_page=0').get_json()
+        self.assertEqual((len(data['trips']), data['pagination']['per_page']), (1, 1))
+        data = self.client.get('/api/trips?cursor=&per_page=500').get_json()
+        self.assertEqual((len(data['trips']), data['pagination']['per_page']), (8, 100))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,131 @@
+import unittest
+from datetime import date, timedelta
+from decimal import Decimal
+from flask_testing import TestCase
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.trip import Trip
+from app.models.participant import Participant
+from app.models.consent import Consent
+from app.models.notification import Notification
+from app.parent_comm.loaders import load_parent_home
+
+from helpers import QueryCounter
+
+
+class ParentHomeTestCase(TestCase):
+    """The parent home view model counts unread notifications and children in SQL"""
+
+    def create_app(self):
+        return create_app('testing')
+
+    def setUp(self):
+        db.create_all()
+
+        teacher = User(email='teacher@test.com', first_name='Test', last_name='Teacher', role='teacher')
+        teacher.password = 'password123'
+        self.parent = User(email='parent@test.com', first_name='Test', last_name='Parent', role='parent')
+        self.parent.password = 'password123'
+        db.session.add_all([teacher, self.parent])
+        db.session.commit()
+
+        self.trips = []
+        for i in range(2):
+            trip = Trip(title=f'Trip {i}', destination='Nairobi',
+                        start_date=date.today() + timedelta(days=10 + i),
+                        end_date=date.today() + timedelta(days=12 + i),
+                        price_per_student=Decimal('1000.00'), organizer_id=teacher.id)
+            db.session.add(trip)
+            self.trips.append(trip)
+        db.session.commit()
+
+        # The same child registered on both trips
+        self.participants = [
+            Participant(first_name='Amina', last_name='Otieno', student_id='S1',
+                        trip_id=trip.id, user_id=self.parent.id)
+            for trip in self.trips
+        ]
+        db.session.add_all(self.participants)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+
+    def notify(self, related_data, is_read=False, recipient=None):
+        db.session.add(Notification(title='Update', message='Trip update', notification_type='trip_update',
+                                    related_data=related_data, is_read=is_read,
+                                    recipient_id=(recipient or self.parent).id))
+
+    def test_unread_counts(self):
+        first, second = self.trips
+        self.notify({'trip_id': first.id})
+        self.notify({'trip_id': first.id})
+        self.notify({'trip_id': second.id})
+        self.notify({'trip_id': second.id}, is_read=True)
+        # Notifications without a trip count towards the total only
+        self.notify({'payment_id': 7})
+        self.notify(['not', 'an', 'object'])
+        self.notify(None)
+        db.session.commit()
+
+        home = load_parent_home(self.parent.id)
+
+        self.assertEqual([child.unread_notifications for child in home.children], [2, 1])
+        self.assertEqual(home.unread_total, 6)
+
+    def test_unread_counts_constant_queries(self):
+        for i in range(20):
+            self.notify({'trip_id': self.trips[i % 2].id})
+        db.session.commit()
+        parent_id = self.parent.id
+
+        with QueryCounter(db.engine) as counter:
+            home = load_parent_home(parent_id)
+
+        self.assertEqual(home.unread_total, 20)
+        self.assertEqual(counter.count, 3)
+        notification_queries = [statement for statement in counter.statements if 'FROM notifications' in statement]
+        self.assertEqual(len(notification_queries), 1)
+        self.assertIn('GROUP BY', notification_queries[0])
+
+    def test_children_count_from_consents(self):
+        """Children are the participants the parent has consent forms for"""
+        self.assertEqual(load_parent_home(self.parent.id).children_count, 0)
+
+        other_parent = User(email='other@test.com', first_name='Other', last_name='Parent', role='parent')
+        other_parent.password = 'password123'
+        db.session.add(other_parent)
+        db.session.commit()
+
+        first, second = self.participants
+        for participant, consent_type in [(first, 'trip_participation'), (first, 'medical'),
+                                          (second, 'trip_participation')]:
+            db.session.add(Consent(consent_type=consent_type, title='Consent', content='I agree',
+                                   participant_id=participant.id, parent_id=self.parent.id))
+        db.session.add(Consent(consent_type='trip_participation', title='Consent', content='I agree',
+                               participant_id=first.id, parent_id=other_parent.id))
+        db.session.commit()
+
+        self.assertEqual(load_parent_home(self.parent.id).children_count, 2)
+        self.assertEqual(self.parent.get_children_count(), 2)
+        self.assertEqual(load_parent_home(other_parent.id).children_count, 1)
+
+    def test_children_count_queried_on_use(self):
+        home = load_parent_home(self.parent.id)
+
+        with QueryCounter(db.engine) as counter:
+            home.unread_total
+            home.upcoming_trips_count
+        self.assertEqual(counter.count, 0)
+
+        with QueryCounter(db.engine) as counter:
+            home.children_count
+            home.children_count
+        self.assertEqual(counter.count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+import csv
+import io
+import unittest
+from datetime import date, timedelta
+from decimal import Decimal
+from flask_testing import TestCase
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.trip import Trip
+from app.models.participant import Participant
+from app.trips.importer import ParticipantImporter
+
+from helpers import QueryCounter
+
+
+class ParticipantImportTestCase(TestCase):
+    """CSV participant uploads are streamed and inserted in chunks"""
+
+    ROWS = 2000
+
+    def create_app(self):
+        return create_app('testing')
+
+    def setUp(self):
+        db.create_all()
+
+        self.teacher = User(email='teacher@test.com', first_name='Test', last_name='Teacher', role='teacher')
+        self.teacher.password = 'password123'
+        db.session.add(self.teacher)
+        db.session.commit()
+
+        self.trip = Trip(
+            title='Museum Visit',
+            destination='Nairobi',
+            start_date=date.today() + timedelta(days=10),
+            end_date=date.today() + timedelta(days=11),
+            price_per_student=Decimal('1000.00'),
+            max_participants=self.ROWS + 100,
+            organizer_id=self.teacher.id
+        )
+        db.session.add(self.trip)
+        db.session.commit()
+
+        db.session.add(Participant(first_name='Existing', last_name='Student', student_id='S5', trip_id=self.trip.id))
+        db.session.commit()
+
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.teacher.id)
+            session['_fresh'] = True
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+
+    def upload(self, lines):
+        data = '\n'.join(['first_name,last_name,student_id,date_of_birth'] + lines).encode('utf-8')
+        return self.client.post(
+            f'/trips/{self.trip.id}/participants/upload_csv',
+            data={'file': (io.BytesIO(data), 'roster.csv')},
+            content_type='multipart/form-data'
+        )
+
+    def test_large_roster_query_count(self):
+        """A large roster is imported with a few chunked inserts"""
+        lines = [f'First{i},Last{i},S{i},2012-05-01' for i in range(self.ROWS)]
+
+        with QueryCounter(db.engine) as counter:
+            response = self.upload(lines)
+
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()
+        self.assertEqual(data['participants_added'], self.ROWS - 1)
+        self.assertEqual(data['errors'], ['Row 7: Duplicate student_id S5'])
+        self.assertLess(counter.count, 20)
+        self.assertEqual(Participant.query.filter_by(trip_id=self.trip.id).count(), self.ROWS)
+
+    def test_bad_rows_reported_without_aborting(self):
+        """Invalid rows are reported and the remaining rows are still imported"""
+        response = self.upload([
+            'Amina,Otieno,A1,2012-05-01',
+            ',Missing,A2,',
+            'Brian,Kamau,A1,',
+            'Cynthia,Wanjiru,A3,31/31/2012',
+            'David,Mwangi,A4,05/01/2012',
+        ])
+
+        data = response.get_json()
+        self.assertEqual(data['participants_added'], 2)
+        self.assertEqual(data['errors'], [
+            'Row 3: Missing required fields (first_name, last_name)',
+            'Row 4: Duplicate student_id A1',
+            'Row 5: Invalid date format for date_of_birth',
+        ])
+
+    def test_capacity_checked_against_counter(self):
+        """The import stops at the trip's capacity"""
+        self.trip.max_participants = 2
+        db.session.commit()
+
+        data = self.upload([f'First{i},Last{i},C{i},' for i in range(5)]).get_json()
+        self.assertEqual(data['participants_added'], 2)
+        self.assertEqual(data['errors'], ['Row 4: Trip has reached maximum capacity'])
+
+    def test_unreadable_row_keeps_earlier_chunks(self):
+        """A parse error stops the import but keeps and reports the rows already saved"""
+        oversized = 'x' * (csv.field_size_limit() + 1)
+        lines = ['first_name,last_name'] + [f'First{i},Last{i}' for i in range(5)] + [f'Bad,{oversized}', 'Never,Read']
+        importer = ParticipantImporter(self.trip, chunk_size=2)
+        result = importer.run(io.StringIO('\n'.join(lines)))
+
+        self.assertEqual(result.added, 5)
+        self.assertTrue(result.read_error.startswith('Could not read CSV file'))
+        self.assertEqual(result.errors[-1].row, 7)
+        self.assertEqual(Participant.query.filter_by(trip_id=self.trip.id).count(), 6)
+
+    def test_undecodable_upload_reports_partial_import(self):
+        data = '\n'.join(['first_name,last_name'] + [f'First{i},Last{i}' for i in range(1500)]).encode('utf-8')
+        response = self.client.post(
+            f'/trips/{self.trip.id}/participants/upload_csv',
+            data={'file': (io.BytesIO(data + b'\nBad,\xff\xfe\n'), 'roster.csv')},
+            content_type='multipart/form-data'
+        )
+
+        self.assertEqual(response.status_code, 400)
+        data = response.get_json()
+        self.assertIn('Could not read CSV file', data['error'])
+        self.assertGreater(data['participants_added'], 0)
+        self.assertEqual(data['participants_added'], Participant.query.filter_by(trip_id=self.trip.id).count() - 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+import gzip
+import json
+import shutil
+import unittest
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from flask_testing import TestCase
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.trip import Trip
+from app.models.location import Location
+from app.safety.tracks import encode_polyline, simplify
+
+
+class TrackHelpersTestCase(unittest.TestCase):
+    """Polyline encoding and Douglas-Peucker simplification"""
+
+    def test_encode_polyline(self):
+        """Matches the reference example from Google's polyline documentation"""
+        points = [(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)]
+        self.assertEqual(encode_polyline(points), '_p~iF~ps|U_ulLnnqC_mqNvxq`@')
+
+    def test_simplify(self):
+        """Points within the tolerance of a straight line are dropped"""
+        straight = [(-1.0 + i * 0.0001, 36.0, None, None) for i in range(100)]
+        self.assertEqual(simplify(straight, 5), [straight[0], straight[-1]])
+
+        corner = straight[:50] + [(straight[49][0], 36.0 + i * 0.0001, None, None) for i in range(1, 50)]
+        simplified = simplify(corner, 5)
+        self.assertEqual(len(simplified), 3)
+        self.assertEqual(simplified[1], straight[49])
+
+
+class TrackExportTestCase(TestCase):
+    """Trip tracks export as GPX, GeoJSON or polylines"""
+
+    def create_app(self):
+        return create_app('testing')
+
+    def setUp(self):
+        db.create_all()
+
+        self.teacher = User(email='teacher@test.com', first_name='Test', last_name='Teacher', role='teacher')
+        self.teacher.password = 'password123'
+        db.session.add(self.teacher)
+        db.session.commit()
+
+        self.trip = Trip(
+            title='Coast & Parks',
+            destination='Mombasa',
+            start_date=date.today() - timedelta(days=3),
+            end_date=date.today() - timedelta(days=1),
+            price_per_student=Decimal('1000.00'),
+            organizer_id=self.teacher.id
+        )
+        db.session.add(self.trip)
+        db.session.commit()
+
+        start = datetime(2026, 3, 1, 9, 0)
+        db.session.add_all([
+            Location(latitude=-4.05 + i * 0.001, longitude=39.66, device_id=device, timestamp=start + timedelta(minutes=i),
+                     trip_id=self.trip.id, user_id=self.teacher.id)
+            for device in ('bus-1', 'bus-2') for i in range(20)
+        ])
+        db.session.commit()
+
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.teacher.id)
+            session['_fresh'] = True
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+        shutil.rmtree(self.app.config['TRACK_CACHE_FOLDER'], ignore_errors=True)
+
+    def test_geojson_track(self):
+        """One LineString per device, in time order"""
+        response = self.client.get(f'/safety/trips/{self.trip.id}/track?format=geojson')
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.get_data(as_text=True))
+        self.assertEqual([f['properties']['device_id'] for f in data['features']], ['bus-1', 'bus-2'])
+        coordinates = data['features'][0]['geometry']['coordinates']
+        self.assertEqual(len(coordinates), 20)
+        self.assertEqual(coordinates[0], [39.66, -4.05])
+        self.assertEqual(data['features'][0]['properties']['coordTimes'][0], '2026-03-01T09:00:00')
+
+    def test_simplified_gpx_for_device(self):
+        """A straight track simplifies to its end points"""
+        response = self.client.get(f'/safety/trips/{self.trip.id}/track?format=gpx&device_id=bus-2&tolerance=10')
+        self.assertEqual(response.status_code, 200)
+        body = response.get_data(as_text=True)
+        self.assertIn('<name>Coast &amp; Parks</name>', body)
+        self.assertEqual(body.count('<trk>'), 1)
+        self.assertEqual(body.count('<trkpt '), 2)
+
+    def test_completed_trip_track_is_cached(self):
+        """Completed trips are served gzipped from the cache, and re-encoded when the track changes"""
+        self.trip.status = 'completed'
+        db.session.commit()
+
+        url = f'/safety/trips/{self.trip.id}/track?format=polyline'
+        response = self.client.get(url, headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        data = json.loads(gzip.decompress(response.data))
+        self.assertEqual([track['points'] for track in data['tracks']], [20, 20])
+        response.close()
+
+        db.session.add(Location(latitude=-4.0, longitude=39.7, device_id='bus-1',
+                                timestamp=datetime(2026, 3, 1, 10, 0), trip_id=self.trip.id))
+        db.session.commit()
+
+        response = self.client.get(url)
+        self.assertNotIn('Content-Encoding', response.headers)
+        data = json.loads(response.get_data(as_text=True))
+        self.assertEqual([track['points'] for track in data['tracks']], [21, 20])
+
+    def test_invalid_tolerance(self):
+        response = self.client.get(f'/safety/trips/{self.trip.id}/track?tolerance=abc')
+        self.assertEqual(response.status_code, 400)
+
+
+if __name__ == '__main__':
+    unittest.main()
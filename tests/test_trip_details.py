@@ -0,0 +1,105 @@
+import unittest
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from flask_testing import TestCase
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.trip import Trip
+from app.models.participant import Participant
+from app.models.location import Location
+
+from helpers import QueryCounter
+
+
+class TripDetailsTestCase(TestCase):
+    """Trip detail and summary endpoints count participants and list waypoints in SQL"""
+
+    def create_app(self):
+        return create_app('testing')
+
+    def setUp(self):
+        db.create_all()
+
+        teacher = User(email='teacher@test.com', first_name='Test', last_name='Teacher', role='teacher')
+        teacher.password = 'password123'
+        db.session.add(teacher)
+        db.session.commit()
+
+        self.trip, self.other_trip = [
+            Trip(title=title, destination='Nairobi',
+                 start_date=date.today() + timedelta(days=10),
+                 end_date=date.today() + timedelta(days=12),
+                 price_per_student=Decimal('1000.00'), max_participants=10,
+                 status='active', organizer_id=teacher.id)
+            for title in ('Museum Visit', 'Park Visit')
+        ]
+        db.session.add_all([self.trip, self.other_trip])
+        db.session.commit()
+
+        for i, status in enumerate(['confirmed', 'confirmed', 'confirmed', 'registered', 'registered', 'cancelled']):
+            db.session.add(Participant(first_name='Student', last_name=str(i), trip_id=self.trip.id, status=status))
+        db.session.add(Participant(first_name='Other', last_name='Student', trip_id=self.other_trip.id,
+                                   status='confirmed'))
+
+        start = datetime(2026, 3, 1, 8, 0)
+        locations = [
+            ('Lunch stop', 'activity', True, self.trip, 3),
+            ('Main gate', 'checkin', True, self.trip, 1),
+            (None, None, True, self.trip, 2),
+            ('Bus fix', 'waypoint', True, self.trip, 4),
+            ('Clinic', 'emergency', True, self.trip, 5),
+            ('Bad fix', 'checkin', False, self.trip, 6),
+            ('Other gate', 'checkin', True, self.other_trip, 0),
+        ]
+        for name, location_type, is_valid, trip, hours in locations:
+            db.session.add(Location(name=name, location_type=location_type, is_valid=is_valid,
+                                    latitude=-1.29, longitude=36.82, device_id='phone-1',
+                                    trip_id=trip.id, timestamp=start + timedelta(hours=hours)))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+
+    def test_waypoints_for_trip(self):
+        """Only valid check-ins and activities of the trip, in time order"""
+        waypoints = Location.get_waypoints_for_trip(self.trip.id)
+        self.assertEqual([waypoint.name for waypoint in waypoints], ['Main gate', 'Lunch stop'])
+        self.assertEqual([waypoint.location_type for waypoint in waypoints], ['checkin', 'activity'])
+        self.assertEqual(Location.get_waypoints_for_trip(self.trip.id + 100), [])
+
+    def test_details(self):
+        response = self.client.get(f'/api/trip/{self.trip.id}')
+        self.assertEqual(response.status_code, 200)
+        trip = response.get_json()['trip']
+
+        # Registered participants are reported as pending
+        self.assertEqual(trip['participant_breakdown'], {
+            'confirmed': 3, 'pending': 2, 'cancelled': 1, 'completed': 0
+        })
+        self.assertEqual((trip['current_participants'], trip['available_spots']), (3, 7))
+        self.assertEqual([location['name'] for location in trip['locations']], ['Main gate', 'Lunch stop'])
+        self.assertEqual(trip['locations'][0]['timestamp'], '2026-03-01T09:00:00')
+
+    def test_summary(self):
+        trip_id = self.trip.id
+        db.session.expunge_all()
+
+        with QueryCounter(db.engine) as counter:
+            response = self.client.get(f'/api/trip/{trip_id}/summary')
+
+        self.assertEqual(response.status_code, 200)
+        trip = response.get_json()['trip']
+        self.assertEqual((trip['title'], trip['available_spots']), ('Museum Visit', 7))
+        self.assertTrue(trip['registration_open'])
+        self.assertEqual(counter.count, 1)
+
+    def test_missing_trip(self):
+        self.assertEqual(self.client.get('/api/trip/999').status_code, 404)
+        self.assertEqual(self.client.get('/api/trip/999/summary').status_code, 404)
+
+
+if __name__ == '__main__':
+    unittest.main()
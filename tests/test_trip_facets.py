@@ -0,0 +1,121 @@
+import unittest
+from datetime import date, timedelta
+from decimal import Decimal
+from flask_testing import TestCase
+from werkzeug.datastructures import MultiDict
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.trip import Trip
+from app.api.main.trips import compute_trip_facets, build_price_histogram, parse_trip_filters
+
+
+class TripFacetsTestCase(TestCase):
+    """Each facet is counted against every active filter except its own"""
+
+    def create_app(self):
+        return create_app('testing')
+
+    def setUp(self):
+        db.create_all()
+
+        teacher = User(email='teacher@test.com', first_name='Test', last_name='Teacher', role='teacher')
+        teacher.password = 'password123'
+        db.session.add(teacher)
+        db.session.commit()
+
+        trips = [
+            ('wildlife', '6-8', '500.00', 'active'),
+            ('science', '9-12', '1000.00', 'active'),
+            ('history', '6-8', '1500.00', 'active'),
+            ('art', '3-5', '2000.00', 'active'),
+            ('marine', '9-12', '3000.00', 'draft'),
+        ]
+        for i, (category, grade_level, price, status) in enumerate(trips):
+            db.session.add(Trip(
+                title=f'Trip {i}',
+                destination='Nairobi',
+                category=category,
+                grade_level=grade_level,
+                start_date=date.today() + timedelta(days=10),
+                end_date=date.today() + timedelta(days=12),
+                price_per_student=Decimal(price),
+                status=status,
+                organizer_id=teacher.id
+            ))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+
+    def facets(self, **args):
+        return compute_trip_facets(parse_trip_filters(MultiDict(args)))
+
+    def counts(self, facet):
+        return {item['name']: item['count'] for item in facet}
+
+    def test_unfiltered(self):
+        facets = self.facets()
+        self.assertEqual(facets['total'], 4)
+        self.assertEqual(self.counts(facets['categories']), {'art': 1, 'history': 1, 'science': 1, 'wildlife': 1})
+        self.assertEqual(self.counts(facets['grade_levels']), {'3-5': 1, '6-8': 2, '9-12': 1})
+        self.assertEqual(self.counts(facets['durations']), {'full': 0, 'multi': 4, 'week': 0})
+        self.assertEqual([bucket['count'] for bucket in facets['price_histogram']], [1, 1, 0, 1, 1])
+
+    def test_category_filter(self):
+        """Picking a category keeps the other categories but narrows the other facets"""
+        facets = self.facets(category='science')
+        self.assertEqual(facets['total'], 2)
+        self.assertEqual(self.counts(facets['categories']), {'art': 1, 'history': 1, 'science': 1, 'wildlife': 1})
+        self.assertEqual(self.counts(facets['grade_levels']), {'6-8': 1, '9-12': 1})
+        self.assertEqual(sum(bucket['count'] for bucket in facets['price_histogram']), 2)
+
+    def test_price_filter(self):
+        facets = self.facets(min_price='1000', max_price='2000')
+        self.assertEqual(facets['total'], 3)
+        self.assertEqual(self.counts(facets['categories']), {'art': 1, 'history': 1, 'science': 1})
+        self.assertEqual(self.counts(facets['grade_levels']), {'3-5': 1, '6-8': 1, '9-12': 1})
+        # The histogram ignores the price filter itself
+        self.assertEqual(sum(bucket['count'] for bucket in facets['price_histogram']), 4)
+
+    def test_grade_filter(self):
+        facets = self.facets(grade_level='6-8')
+        self.assertEqual(facets['total'], 2)
+        self.assertEqual(self.counts(facets['categories']), {'history': 1, 'wildlife': 1})
+        self.assertEqual(self.counts(facets['grade_levels']), {'3-5': 1, '6-8': 2, '9-12': 1})
+        self.assertEqual(facets['price_histogram'][0]['min'], 500.0)
+        self.assertEqual(facets['price_histogram'][-1]['max'], 1500.0)
+
+    def test_combined_filters(self):
+        facets = self.facets(category='science', grade_level='6-8')
+        self.assertEqual(facets['total'], 1)
+        self.assertEqual(self.counts(facets['categories']), {'history': 1, 'wildlife': 1})
+        self.assertEqual(self.counts(facets['grade_levels']), {'6-8': 1, '9-12': 1})
+
+    def test_histogram_buckets(self):
+        self.assertEqual(build_price_histogram([], 5), [])
+        self.assertEqual(build_price_histogram([700.0, 700.0], 5), [{'min': 700.0, 'max': 700.0, 'count': 2}])
+
+        buckets = build_price_histogram([100.0, 150.0, 200.0], 2)
+        self.assertEqual(buckets, [
+            {'min': 100.0, 'max': 150.0, 'count': 1},
+            {'min': 150.0, 'max': 200.0, 'count': 2},
+        ])
+
+    def test_histogram_single_price_and_empty_results(self):
+        facets = self.facets(category='history', grade_level='6-8')
+        self.assertEqual(facets['price_histogram'], [{'min': 1500.0, 'max': 1500.0, 'count': 1}])
+
+        facets = self.facets(category='technology')
+        self.assertEqual(facets['total'], 0)
+        self.assertEqual(facets['price_histogram'], [])
+
+        response = self.client.get('/api/trips/facets?category=technology')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.get_json()['facets']['price_histogram'], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
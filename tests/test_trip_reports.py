@@ -0,0 +1,136 @@
+import unittest
+from datetime import date, timedelta
+from decimal import Decimal
+from flask_testing import TestCase
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.vendor import Vendor
+from app.models.trip import Trip
+from app.models.participant import Participant
+from app.models.booking import Booking
+from app.trips import reports
+from app.trips.reports import compute_trip_report, get_trip_report
+
+from helpers import QueryCounter
+
+
+class TripReportTestCase(TestCase):
+    """Trip reports aggregate every breakdown in two queries"""
+
+    def create_app(self):
+        return create_app('testing')
+
+    def setUp(self):
+        db.create_all()
+        reports._report_cache.invalidate()
+
+        self.teacher = User(email='teacher@test.com', first_name='Test', last_name='Teacher', role='teacher')
+        self.teacher.password = 'password123'
+        vendor_user = User(email='vendor@test.com', first_name='Test', last_name='Vendor', role='vendor')
+        vendor_user.password = 'password123'
+        db.session.add_all([self.teacher, vendor_user])
+        db.session.commit()
+
+        self.vendor = Vendor(
+            business_name='Test Transport',
+            contact_email='vendor@test.com',
+            contact_phone='+254700000000',
+            user_id=vendor_user.id
+        )
+        self.trip = Trip(
+            title='Museum Visit',
+            destination='Nairobi',
+            start_date=date.today() + timedelta(days=10),
+            end_date=date.today() + timedelta(days=11),
+            price_per_student=Decimal('1000.00'),
+            max_participants=100,
+            organizer_id=self.teacher.id
+        )
+        db.session.add_all([self.vendor, self.trip])
+        db.session.commit()
+
+        participants = [
+            ('confirmed', 'paid', Decimal('1000.00')),
+            ('confirmed', 'partial', Decimal('400.00')),
+            ('confirmed', 'pending', None),
+            ('registered', 'pending', None),
+            ('cancelled', 'refunded', Decimal('1000.00')),
+        ]
+        db.session.add_all([
+            Participant(first_name=f'First{i}', last_name=f'Last{i}', trip_id=self.trip.id,
+                        status=status, payment_status=payment_status, amount_paid=amount_paid)
+            for i, (status, payment_status, amount_paid) in enumerate(participants)
+        ])
+        db.session.add_all([
+            Booking(trip_id=self.trip.id, vendor_id=self.vendor.id, booking_type='transportation',
+                    status='confirmed', quoted_amount=Decimal('500.00'), final_amount=Decimal('450.00')),
+            Booking(trip_id=self.trip.id, vendor_id=self.vendor.id, booking_type='activity',
+                    status='pending', quoted_amount=Decimal('300.00')),
+        ])
+        db.session.commit()
+        db.session.refresh(self.trip)
+
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.teacher.id)
+            session['_fresh'] = True
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+
+    def count_queries(self, func):
+        with QueryCounter(db.engine) as counter:
+            result = func()
+        return result, counter.statements
+
+    def test_report_figures(self):
+        """Breakdowns match the participant and booking rows"""
+        report, statements = self.count_queries(lambda: compute_trip_report(self.trip))
+        self.assertEqual(len(statements), 2)
+
+        self.assertEqual(report['total_participants'], 5)
+        self.assertEqual(report['confirmed_participants'], 3)
+        self.assertEqual(report['total_revenue'], 3000.0)
+        self.assertEqual(report['total_revenue'], self.trip.get_total_revenue())
+        self.assertEqual(
+            (report['paid_participants'], report['partial_participants'], report['pending_participants']),
+            (1, 1, 2)
+        )
+        self.assertEqual(report['participant_statuses']['cancelled'], 1)
+        self.assertEqual(report['payment_statuses']['refunded'], 1)
+        self.assertEqual(report['amount_collected'], 2400.0)
+        # Four active participants owe 4000 and have paid 1400
+        self.assertEqual(report['amount_outstanding'], 2600.0)
+
+        self.assertEqual((report['total_bookings'], report['confirmed_bookings']), (2, 1))
+        self.assertEqual(report['booking_statuses']['pending'], 1)
+        self.assertEqual(report['booking_costs'], 450.0)
+
+    def test_completed_report_cached(self):
+        """A completed trip's report is computed once per trip update"""
+        self.trip.status = 'completed'
+        db.session.commit()
+        db.session.refresh(self.trip)
+
+        first, statements = self.count_queries(lambda: get_trip_report(self.trip))
+        self.assertEqual(len(statements), 2)
+        second, statements = self.count_queries(lambda: get_trip_report(self.trip))
+        self.assertEqual(statements, [])
+        self.assertEqual(first, second)
+
+    def test_active_report_not_cached(self):
+        get_trip_report(self.trip)
+        _, statements = self.count_queries(lambda: get_trip_report(self.trip))
+        self.assertEqual(len(statements), 2)
+
+    def test_report_page(self):
+        response = self.client.get(f'/trips/{self.trip.id}/report')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'3/5 confirmed', response.data)
+        self.assertIn(b'$2600.00', response.data)
+
+
+if __name__ == '__main__':
+    unittest.main()
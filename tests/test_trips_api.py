@@ -0,0 +1,116 @@
+import unittest
+from datetime import date, timedelta
+from decimal import Decimal
+from flask_testing import TestCase
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.trip import Trip
+from app.models.participant import Participant
+
+from helpers import QueryCounter
+
+
+class TripSerializationTestCase(TestCase):
+    """Query counts for trip list endpoints must not grow with page size"""
+
+    def create_app(self):
+        return create_app('testing')
+
+    def setUp(self):
+        db.create_all()
+
+        self.teachers = []
+        for i in range(3):
+            teacher = User(
+                email=f'teacher{i}@test.com',
+                first_name='Teacher',
+                last_name=str(i),
+                role='teacher'
+            )
+            teacher.password = 'password123'
+            db.session.add(teacher)
+            self.teachers.append(teacher)
+        db.session.commit()
+
+        for i in range(12):
+            trip = Trip(
+                title=f'Trip {i}',
+                destination='Nairobi',
+                start_date=date.today() + timedelta(days=10 + i),
+                end_date=date.today() + timedelta(days=12 + i),
+                price_per_student=Decimal('1000.00'),
+                status='active',
+                featured=True,
+                consent_required=False,
+                organizer_id=self.teachers[i % 3].id
+            )
+            db.session.add(trip)
+            db.session.flush()
+
+            for j in range(i % 4):
+                db.session.add(Participant(
+                    first_name='Student',
+                    last_name=str(j),
+                    trip_id=trip.id,
+                    status='confirmed' if j % 2 == 0 else 'registered'
+                ))
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+
+    def count_queries(self, url):
+        # Start every request with an empty identity map
+        db.session.expunge_all()
+        with QueryCounter(db.engine) as counter:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return counter.count, response.get_json()
+
+    def test_serialize_many_matches_serialize(self):
+        """Batch serialization produces the same JSON shape as serialize()"""
+        trips = Trip.query.order_by(Trip.id).all()
+        expected = [trip.serialize() for trip in trips]
+
+        db.session.expunge_all()
+        trips = Trip.query.order_by(Trip.id).all()
+        self.assertEqual(Trip.serialize_many(trips), expected)
+
+    def test_catalog_query_count_is_constant(self):
+        """/api/trips costs the same number of queries for 3 or 12 trips"""
+        small, data = self.count_queries('/api/trips?per_page=3&sort_by=price-low')
+        self.assertEqual(len(data['trips']), 3)
+
+        large, data = self.count_queries('/api/trips?per_page=12&sort_by=price-low')
+        self.assertEqual(len(data['trips']), 12)
+
+        self.assertEqual(small, large)
+
+    def test_featured_query_count_is_constant(self):
+        """/api/trips/featured costs the same number of queries for any limit"""
+        small, data = self.count_queries('/api/trips/featured?limit=2')
+        self.assertEqual(data['count'], 2)
+
+        large, data = self.count_queries('/api/trips/featured?limit=12')
+        self.assertEqual(data['count'], 12)
+
+        self.assertEqual(small, large)
+
+    def test_confirmed_counts_are_batch_loaded(self):
+        """Preloaded counts match the per-trip confirmed participant count"""
+        trips = Trip.query.order_by(Trip.id).all()
+        expected = {
+            trip.id: len([p for p in trip.participants if p.status == 'confirmed'])
+            for trip in trips
+        }
+
+        db.session.expunge_all()
+        trips = Trip.preload_for_serialization(Trip.query.order_by(Trip.id).all())
+        self.assertEqual({trip.id: trip.current_participants for trip in trips}, expected)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+import unittest
+from datetime import datetime, timedelta
+from flask_testing import TestCase
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.profiles.search import search_users
+
+from helpers import QueryCounter
+
+
+class UserSearchTestCase(TestCase):
+    """Admin user search uses anchored matches and keyset pages"""
+
+    def create_app(self):
+        return create_app('testing')
+
+    def setUp(self):
+        db.create_all()
+
+        self.admin = User(email='admin@test.com', first_name='Site', last_name='Admin', role='admin')
+        self.admin.password = 'password123'
+        db.session.add(self.admin)
+
+        start = datetime.now() - timedelta(days=30)
+        names = [
+            ('Jane', 'Wanjiku', 'parent'),
+            ('John', 'Otieno', 'parent'),
+            ('Janet', 'Kamau', 'teacher'),
+            ('Peter', 'Janeway', 'parent'),
+            ('Mary', 'Achieng', 'vendor'),
+        ]
+        for i, (first_name, last_name, role) in enumerate(names):
+            user = User(
+                email=f'{first_name.lower()}.{last_name.lower()}@example.com',
+                first_name=first_name,
+                last_name=last_name,
+                role=role,
+                created_at=start + timedelta(days=i)
+            )
+            user.password = 'password123'
+            db.session.add(user)
+        db.session.commit()
+
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.admin.id)
+            session['_fresh'] = True
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+
+    def emails(self, page):
+        return [user.email for user in page.items]
+
+    def test_search_text_maintained(self):
+        user = User.query.filter_by(first_name='Jane').one()
+        self.assertEqual(user.search_text, 'jane wanjiku jane.wanjiku@example.com')
+
+        user.last_name = 'Mwangi'
+        db.session.commit()
+        self.assertEqual(user.search_text, 'jane mwangi jane.wanjiku@example.com')
+
+    def test_name_prefix_search(self):
+        """Each word must start a first name, last name or email"""
+        self.assertEqual(
+            self.emails(search_users('jan')),
+            ['peter.janeway@example.com', 'janet.kamau@example.com', 'jane.wanjiku@example.com']
+        )
+        self.assertEqual(self.emails(search_users('Jane Wan')), ['jane.wanjiku@example.com'])
+        # Not anchored mid-word
+        self.assertEqual(self.emails(search_users('anjik')), [])
+
+    def test_email_prefix_search(self):
+        self.assertEqual(self.emails(search_users('john.otieno@')), ['john.otieno@example.com'])
+        self.assertEqual(self.emails(search_users('%@example.com')), [])
+
+    def test_role_filter_and_keyset_pages(self):
+        first = search_users(role='parent', per_page=2)
+        self.assertEqual(self.emails(first), ['peter.janeway@example.com', 'john.otieno@example.com'])
+        self.assertTrue(first.has_next)
+
+        second = search_users(role='parent', cursor=first.next_cursor, per_page=2)
+        self.assertEqual(self.emails(second), ['jane.wanjiku@example.com'])
+        self.assertFalse(second.has_next)
+
+    def test_no_unanchored_like(self):
+        with QueryCounter(db.engine) as counter:
+            search_users('jane wan').items
+
+        parameters = counter.parameters[-1]
+        patterns = [value for value in parameters if isinstance(value, str)]
+        self.assertEqual(len(patterns), 6)
+        for pattern in patterns:
+            self.assertTrue(pattern.endswith('%'), pattern)
+            self.assertFalse(pattern.startswith('%'), pattern)
+
+    def test_admin_users_list(self):
+        response = self.client.get('/users?search=jan&role=parent')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'peter.janeway@example.com', response.data)
+        self.assertIn(b'jane.wanjiku@example.com', response.data)
+        self.assertNotIn(b'janet.kamau@example.com', response.data)
+
+    def test_admin_users_list_invalid_cursor(self):
+        response = self.client.get('/users?cursor=not-a-cursor&search=jan')
+        self.assertEqual(response.status_code, 302)
+        self.assertNotIn('cursor', response.location)
+
+
+if __name__ == '__main__':
+    unittest.main()
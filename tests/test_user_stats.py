@@ -0,0 +1,171 @@
+import unittest
+from datetime import date, timedelta
+from decimal import Decimal
+from flask_testing import TestCase
+from sqlalchemy import insert
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.trip import Trip
+from app.models.participant import Participant
+from app.models.consent import Consent
+from app.models.vendor import Vendor
+from app.models.booking import Booking
+
+from helpers import QueryCounter
+
+
+class UserStatsTestCase(TestCase):
+    """User helper statistics run a bounded number of queries on large data sets"""
+
+    TRIPS = 40
+    PARTICIPANTS_PER_TRIP = 50
+    BOOKINGS = 2000
+
+    def create_app(self):
+        return create_app('testing')
+
+    def setUp(self):
+        db.create_all()
+
+        self.teacher = User(email='teacher@test.com', first_name='Test', last_name='Teacher', role='teacher')
+        self.teacher.password = 'password123'
+        self.parent = User(email='parent@test.com', first_name='Test', last_name='Parent', role='parent')
+        self.parent.password = 'password123'
+        self.vendor_user = User(email='vendor@test.com', first_name='Test', last_name='Vendor', role='vendor')
+        self.vendor_user.password = 'password123'
+        db.session.add_all([self.teacher, self.parent, self.vendor_user])
+        db.session.commit()
+
+        self.vendor = Vendor(
+            business_name='Test Transport',
+            contact_email='vendor@test.com',
+            contact_phone='+254700000000',
+            user_id=self.vendor_user.id
+        )
+        db.session.add(self.vendor)
+        db.session.commit()
+
+        db.session.execute(insert(Trip), [
+            {
+                'title': f'Trip {i}',
+                'destination': 'Nairobi',
+                'start_date': date.today() + timedelta(days=10 + i),
+                'end_date': date.today() + timedelta(days=12 + i),
+                'price_per_student': Decimal('1000.00'),
+                'status': 'active',
+                'organizer_id': self.teacher.id
+            }
+            for i in range(self.TRIPS)
+        ])
+        trip_ids = [trip_id for (trip_id,) in db.session.query(Trip.id).order_by(Trip.id)]
+
+        db.session.execute(insert(Participant), [
+            {
+                'first_name': 'Student',
+                'last_name': f'{i}-{j}',
+                'student_id': f'S{i}-{j}' if j else 'S-parent',
+                'trip_id': trip_id,
+                'user_id': self.parent.id if j == 0 else None
+            }
+            for i, trip_id in enumerate(trip_ids)
+            for j in range(self.PARTICIPANTS_PER_TRIP)
+        ])
+
+        # The parent signs a participation consent for their child on every trip
+        db.session.execute(insert(Consent), [
+            {
+                'consent_type': 'trip_participation',
+                'title': 'Trip consent',
+                'content': 'I agree',
+                'participant_id': participant_id,
+                'parent_id': self.parent.id
+            }
+            for (participant_id,) in db.session.query(Participant.id).filter_by(user_id=self.parent.id)
+        ])
+
+        db.session.execute(insert(Booking), [
+            {
+                'booking_type': 'transportation',
+                'status': 'completed',
+                'rating': (i % 5) + 1 if i % 4 else None,
+                'trip_id': trip_ids[i % len(trip_ids)],
+                'vendor_id': self.vendor.id
+            }
+            for i in range(self.BOOKINGS)
+        ])
+        db.session.commit()
+
+        self.ratings = [(i % 5) + 1 for i in range(self.BOOKINGS) if i % 4]
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+
+    def login(self, user):
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(user.id)
+            session['_fresh'] = True
+
+    def test_total_students_single_query(self):
+        """get_total_students is one aggregate query, memoized per request"""
+        with self.app.test_request_context():
+            teacher = db.session.get(User, self.teacher.id)
+            with QueryCounter(db.engine) as counter:
+                total = teacher.get_total_students()
+                teacher.get_total_students()
+            self.assertEqual(total, self.TRIPS * self.PARTICIPANTS_PER_TRIP)
+            self.assertEqual(counter.count, 1)
+
+    def test_average_rating_single_query(self):
+        """get_average_rating is one aggregate query, memoized per request"""
+        with self.app.test_request_context():
+            vendor_user = db.session.get(User, self.vendor_user.id)
+            with QueryCounter(db.engine) as counter:
+                average = vendor_user.get_average_rating()
+                vendor_user.get_average_rating()
+            self.assertAlmostEqual(average, sum(self.ratings) / len(self.ratings))
+            self.assertEqual(counter.count, 1)
+
+    def test_average_rating_without_vendor_profile(self):
+        """Users without a vendor profile average 0.0"""
+        with self.app.test_request_context():
+            self.assertEqual(self.teacher.get_average_rating(), 0.0)
+
+    def test_parent_counts(self):
+        """Parent counts come from one shared loader plus a consent count"""
+        with self.app.test_request_context():
+            parent = db.session.get(User, self.parent.id)
+            with QueryCounter(db.engine) as counter:
+                children = parent.get_children_count()
+                upcoming = parent.get_upcoming_trips_count()
+            # One participant row per trip, each with its own consent
+            self.assertEqual(children, self.TRIPS)
+            self.assertEqual(upcoming, self.TRIPS)
+            self.assertLessEqual(counter.count, 4)
+
+    def test_memo_does_not_leak_between_requests(self):
+        """A new request recomputes the statistics"""
+        with self.app.test_request_context():
+            self.assertEqual(self.teacher.get_total_students(), self.TRIPS * self.PARTICIPANTS_PER_TRIP)
+
+        trip = Trip.query.first()
+        db.session.add(Participant(first_name='Late', last_name='Joiner', trip_id=trip.id))
+        db.session.commit()
+
+        with self.app.test_request_context():
+            self.assertEqual(self.teacher.get_total_students(), self.TRIPS * self.PARTICIPANTS_PER_TRIP + 1)
+
+    def test_teacher_profile_query_count(self):
+        """The teacher profile page runs a fixed number of queries"""
+        self.login(self.teacher)
+        db.session.expire_all()
+        with QueryCounter(db.engine) as counter:
+            response = self.client.get('/profile')
+        self.assertEqual(response.status_code, 200)
+        self.assertLessEqual(counter.count, 5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,140 @@
+import unittest
+from datetime import date, timedelta
+from decimal import Decimal
+from flask_testing import TestCase
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.trip import Trip
+from app.models.vendor import Vendor
+from app.models.booking import Booking
+from app.vendor.availability import (
+    find_available_vendors, get_availability_index, invalidate_availability_index
+)
+
+
+class VendorAvailabilityTestCase(TestCase):
+    """The in-memory availability index agrees with Vendor.is_available"""
+
+    def create_app(self):
+        return create_app('testing')
+
+    def setUp(self):
+        db.create_all()
+        invalidate_availability_index()
+
+        self.teacher = User(email='teacher@test.com', first_name='Test', last_name='Teacher', role='teacher')
+        self.teacher.password = 'password123'
+        db.session.add(self.teacher)
+        db.session.commit()
+
+        self.bus = self.make_vendor('Savanna Buses', 'transportation', 60, 4.5)
+        self.van = self.make_vendor('City Vans', 'transportation', 14, 4.8)
+        self.lodge = self.make_vendor('Lakeside Lodge', 'accommodation', 80, 4.0)
+
+        self.start = date.today() + timedelta(days=30)
+        self.trip = self.make_trip(self.start, self.start + timedelta(days=2))
+        self.booking = Booking(booking_type='transportation', status='confirmed', quoted_amount=Decimal('500.00'),
+                               trip_id=self.trip.id, vendor_id=self.bus.id)
+        db.session.add(self.booking)
+        db.session.commit()
+
+    def tearDown(self):
+        invalidate_availability_index()
+        db.session.remove()
+        db.drop_all()
+
+    def make_vendor(self, name, business_type, capacity, rating):
+        user = User(email=f'{name.split()[0].lower()}@test.com', first_name=name, last_name='Vendor', role='vendor')
+        user.password = 'password123'
+        db.session.add(user)
+        db.session.commit()
+
+        vendor = Vendor(business_name=name, business_type=business_type, capacity=capacity, average_rating=rating,
+                        contact_email=user.email, contact_phone='+254700000000', user_id=user.id,
+                        is_verified=True, is_active=True)
+        db.session.add(vendor)
+        db.session.commit()
+        return vendor
+
+    def make_trip(self, start_date, end_date):
+        trip = Trip(title='Museum Visit', destination='Nairobi', start_date=start_date, end_date=end_date,
+                    price_per_student=Decimal('1000.00'), organizer_id=self.teacher.id)
+        db.session.add(trip)
+        db.session.commit()
+        return trip
+
+    def test_inclusive_boundaries(self):
+        """A range touching a busy trip on either end is not free, as in Vendor.is_available"""
+        calendar = get_availability_index().calendars[self.bus.id]
+        end = self.start + timedelta(days=2)
+
+        ranges = {
+            'trip ends on start date': (end, end + timedelta(days=3)),
+            'trip starts on end date': (self.start - timedelta(days=3), self.start),
+            'inside the trip': (self.start + timedelta(days=1), self.start + timedelta(days=1)),
+            'day after the trip': (end + timedelta(days=1), end + timedelta(days=3)),
+            'day before the trip': (self.start - timedelta(days=3), self.start - timedelta(days=1)),
+        }
+        for name, (start_date, end_date) in ranges.items():
+            with self.subTest(name):
+                self.assertEqual(
+                    calendar.is_free(start_date, end_date),
+                    self.bus.is_available(start_date, end_date)
+                )
+
+        self.assertFalse(calendar.is_free(end, end + timedelta(days=3)))
+        self.assertFalse(calendar.is_free(self.start - timedelta(days=3), self.start))
+        self.assertTrue(calendar.is_free(end + timedelta(days=1), end + timedelta(days=3)))
+
+    def test_type_and_capacity_filters(self):
+        start_date, end_date = self.start, self.start + timedelta(days=1)
+
+        self.assertEqual(
+            [vendor.id for vendor in find_available_vendors(start_date, end_date)],
+            [self.van.id, self.lodge.id]
+        )
+        self.assertEqual(
+            [vendor.id for vendor in find_available_vendors(start_date, end_date, business_type='transportation')],
+            [self.van.id]
+        )
+        self.assertEqual(
+            [vendor.id for vendor in find_available_vendors(start_date, end_date, min_capacity=20)],
+            [self.lodge.id]
+        )
+        self.assertEqual(
+            find_available_vendors(start_date, end_date, business_type='transportation', min_capacity=20), []
+        )
+
+    def test_confirmation_commit_drops_index(self):
+        trip = self.make_trip(self.start + timedelta(days=10), self.start + timedelta(days=11))
+        booking = Booking(booking_type='transportation', quoted_amount=Decimal('300.00'),
+                          trip_id=trip.id, vendor_id=self.van.id)
+        db.session.add(booking)
+        db.session.commit()
+
+        index = get_availability_index()
+        self.assertTrue(index.calendars[self.van.id].is_free(trip.start_date, trip.end_date))
+
+        booking.confirm_booking()
+        rebuilt = get_availability_index()
+        self.assertIsNot(rebuilt, index)
+        self.assertFalse(rebuilt.calendars[self.van.id].is_free(trip.start_date, trip.end_date))
+
+    def test_rollback_keeps_index(self):
+        index = get_availability_index()
+
+        self.booking.status = 'cancelled'
+        db.session.flush()
+        db.session.rollback()
+        self.assertIs(get_availability_index(), index)
+
+        # The discarded change does not drop the index on a later commit either
+        self.teacher.first_name = 'Renamed'
+        db.session.commit()
+        self.assertIs(get_availability_index(), index)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import time
+import unittest
+from unittest.mock import patch
+from flask_testing import TestCase
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.vendor import Vendor
+from app.vendor import directory
+from app.vendor.directory import search_vendors, get_directory_facets
+
+
+class VendorDirectoryTestCase(TestCase):
+    """Directory filters are anchored prefix matches with user input escaped"""
+
+    def create_app(self):
+        return create_app('testing')
+
+    def setUp(self):
+        db.create_all()
+        directory._facet_cache.invalidate()
+
+        vendors = [
+            ('Savanna Safaris', 'transportation', 'Nairobi', 'Nairobi County', 4.6, True, True),
+            ('Rift Valley Tours', 'transportation', 'Nakuru', 'Nakuru County', 4.1, False, True),
+            ('Coast Lodge', 'accommodation', 'Mombasa', 'Mombasa County', 3.5, True, True),
+            ('Closed Caterers', 'catering', 'Nairobi', 'Nairobi County', 5.0, True, False),
+        ]
+        self.vendors = {}
+        for i, (name, business_type, city, state, rating, verified, active) in enumerate(vendors):
+            user = User(email=f'vendor{i}@test.com', first_name=name, last_name='Vendor', role='vendor')
+            user.password = 'password123'
+            db.session.add(user)
+            db.session.flush()
+            vendor = Vendor(business_name=name, business_type=business_type, city=city, state=state,
+                            average_rating=rating, is_verified=verified, is_active=active,
+                            description=f'{name} in {city}', contact_email=user.email,
+                            contact_phone='+254700000000', user_id=user.id)
+            db.session.add(vendor)
+            self.vendors[name] = vendor
+        db.session.commit()
+
+    def tearDown(self):
+        directory._facet_cache.invalidate()
+        db.session.remove()
+        db.drop_all()
+
+    def names(self, **filters):
+        return [vendor.business_name for vendor in search_vendors(filters).items]
+
+    def test_type_rating_and_verified_filters(self):
+        self.assertEqual(self.names(type='transportation'), ['Savanna Safaris', 'Rift Valley Tours'])
+        self.assertEqual(self.names(min_rating=4), ['Savanna Safaris', 'Rift Valley Tours'])
+        self.assertEqual(self.names(verified_only=True), ['Savanna Safaris', 'Coast Lodge'])
+
+    def test_location_filter(self):
+        self.assertEqual(self.names(location='Nai'), ['Savanna Safaris'])
+        self.assertEqual(self.names(location='Mombasa Co'), ['Coast Lodge'])
+        # Wildcards in the location are literal
+        self.assertEqual(self.names(location='%'), [])
+        self.assertEqual(self.names(location='N_'), [])
+
+    def test_search_matches_word_prefixes(self):
+        self.assertEqual(self.names(search='saf'), ['Savanna Safaris'])
+        self.assertEqual(self.names(search='valley nak'), ['Rift Valley Tours'])
+        self.assertEqual(self.names(search='Lodge'), ['Coast Lodge'])
+        # Not anchored mid-word
+        self.assertEqual(self.names(search='afari'), [])
+        self.assertEqual(self.names(search='%'), ['Savanna Safaris', 'Coast Lodge', 'Rift Valley Tours'])
+
+    def test_pagination(self):
+        first = search_vendors({}, page=1, per_page=2)
+        self.assertEqual([vendor.business_name for vendor in first.items], ['Savanna Safaris', 'Coast Lodge'])
+        self.assertEqual(first.total, 3)
+        self.assertTrue(first.has_next)
+
+        second = search_vendors({}, page=2, per_page=2)
+        self.assertEqual([vendor.business_name for vendor in second.items], ['Rift Valley Tours'])
+        self.assertFalse(second.has_next)
+
+    def test_facets(self):
+        facets = get_directory_facets()
+        self.assertEqual(facets['business_types'], [
+            {'value': 'accommodation', 'count': 1},
+            {'value': 'transportation', 'count': 2},
+        ])
+        self.assertEqual([city['value'] for city in facets['cities']], ['Mombasa', 'Nairobi', 'Nakuru'])
+        self.assertEqual(facets['rating_bands'], [
+            {'value': 3, 'count': 3},
+            {'value': 4, 'count': 2},
+            {'value': 4.5, 'count': 1},
+        ])
+
+    def test_facets_are_cached(self):
+        facets = get_directory_facets()
+        self.vendors['Closed Caterers'].is_active = True
+        db.session.commit()
+        self.assertIs(get_directory_facets(), facets)
+
+        # Expired after VENDOR_FACETS_TTL seconds
+        later = time.monotonic() + self.app.config.get('VENDOR_FACETS_TTL', 300) + 1
+        with patch('app.utils.cache.time.monotonic', return_value=later):
+            refreshed = get_directory_facets()
+        self.assertIsNot(refreshed, facets)
+        self.assertIn({'value': 'catering', 'count': 1}, refreshed['business_types'])
+
+
+if __name__ == '__main__':
+    unittest.main()
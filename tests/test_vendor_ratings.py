@@ -0,0 +1,135 @@
+import unittest
+from datetime import date, timedelta
+from decimal import Decimal
+from flask_testing import TestCase
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.trip import Trip
+from app.models.vendor import Vendor
+from app.models.booking import Booking
+
+
+class VendorRatingTestCase(TestCase):
+    """Reviews keep the vendor's running rating totals in step"""
+
+    def create_app(self):
+        return create_app('testing')
+
+    def setUp(self):
+        db.create_all()
+
+        teacher = User(email='teacher@test.com', first_name='Test', last_name='Teacher', role='teacher')
+        teacher.password = 'password123'
+        vendor_user = User(email='vendor@test.com', first_name='Test', last_name='Vendor', role='vendor')
+        vendor_user.password = 'password123'
+        db.session.add_all([teacher, vendor_user])
+        db.session.commit()
+
+        self.vendor = Vendor(
+            business_name='Test Transport',
+            contact_email='vendor@test.com',
+            contact_phone='+254700000000',
+            user_id=vendor_user.id
+        )
+        trip = Trip(
+            title='Museum Visit',
+            destination='Nairobi',
+            start_date=date.today() + timedelta(days=10),
+            end_date=date.today() + timedelta(days=11),
+            price_per_student=Decimal('1000.00'),
+            organizer_id=teacher.id
+        )
+        db.session.add_all([self.vendor, trip])
+        db.session.commit()
+
+        self.bookings = [
+            Booking(booking_type='transportation', quoted_amount=Decimal('500.00'),
+                    trip_id=trip.id, vendor_id=self.vendor.id)
+            for _ in range(3)
+        ]
+        db.session.add_all(self.bookings)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+
+    def assertTotals(self, rating_sum, total_reviews, average_rating):
+        vendor = db.session.get(Vendor, self.vendor.id)
+        db.session.refresh(vendor)
+        self.assertEqual((vendor.rating_sum, vendor.total_reviews), (rating_sum, total_reviews))
+        self.assertAlmostEqual(vendor.average_rating, average_rating)
+
+    def test_new_review(self):
+        for booking in self.bookings[:2]:
+            booking.complete_booking()
+
+        self.bookings[0].add_review(4, 'Good')
+        self.assertTotals(4, 1, 4.0)
+        self.bookings[1].add_review(5, 'Great')
+        self.assertTotals(9, 2, 4.5)
+
+    def test_edited_review(self):
+        """Editing keeps the count and swaps the old rating out of the sum"""
+        for booking in self.bookings[:2]:
+            booking.complete_booking()
+        self.bookings[0].add_review(4, 'Good')
+        self.bookings[1].add_review(2, 'Late')
+
+        self.bookings[1].add_review(5, 'Late, but made up for it')
+        self.assertTotals(9, 2, 4.5)
+
+    def test_removed_review(self):
+        for booking in self.bookings[:2]:
+            booking.complete_booking()
+        self.bookings[0].add_review(4, 'Good')
+        self.bookings[1].add_review(2, 'Late')
+
+        self.bookings[1].remove_review()
+        self.assertTotals(4, 1, 4.0)
+        self.bookings[0].remove_review()
+        self.assertTotals(0, 0, 0.0)
+
+    def test_review_before_completion(self):
+        """A review left on an open booking only counts once it is completed"""
+        self.bookings[0].add_review(3, 'Booked quickly')
+        self.assertTotals(0, 0, 0.0)
+
+        self.bookings[0].complete_booking()
+        self.assertTotals(3, 1, 3.0)
+
+        # Completing again does not count it twice
+        self.bookings[0].complete_booking()
+        self.assertTotals(3, 1, 3.0)
+
+    def test_reconcile_ratings(self):
+        for booking, rating in zip(self.bookings, (5, 4, 3)):
+            booking.complete_booking()
+            booking.add_review(rating, 'Fine')
+        self.assertEqual(Vendor.reconcile_ratings(), 0)
+
+        other_user = User(email='other@test.com', first_name='Other', last_name='Vendor', role='vendor')
+        other_user.password = 'password123'
+        db.session.add(other_user)
+        db.session.commit()
+        other = Vendor(business_name='Other Catering', contact_email='other@test.com',
+                       contact_phone='+254700000001', user_id=other_user.id)
+        db.session.add(other)
+        db.session.commit()
+
+        vendor = db.session.get(Vendor, self.vendor.id)
+        vendor.rating_sum, vendor.total_reviews, vendor.average_rating = 2, 7, 1.0
+        other.rating_sum, other.total_reviews, other.average_rating = 10, 2, 5.0
+        db.session.commit()
+
+        self.assertEqual(Vendor.reconcile_ratings(), 2)
+        self.assertTotals(12, 3, 4.0)
+        db.session.refresh(other)
+        self.assertEqual((other.rating_sum, other.total_reviews, other.average_rating), (0, 0, 0.0))
+        self.assertEqual(Vendor.reconcile_ratings(), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
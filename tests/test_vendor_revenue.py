@@ -0,0 +1,173 @@
+import unittest
+from datetime import date, timedelta
+from decimal import Decimal
+from flask_testing import TestCase
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.trip import Trip
+from app.models.vendor import Vendor
+from app.models.booking import Booking
+from app.models.vendor_revenue import VendorRevenueRollup
+from app.vendor.analytics import booking_page, booking_status_counts, revenue_totals
+
+from helpers import QueryCounter
+
+
+class VendorRevenueTestCase(TestCase):
+    """Vendor revenue rollups and the booking dashboard"""
+
+    def create_app(self):
+        return create_app('testing')
+
+    def setUp(self):
+        db.create_all()
+
+        self.teacher = User(email='teacher@test.com', first_name='Test', last_name='Teacher', role='teacher')
+        self.teacher.password = 'password123'
+        self.vendor_user = User(email='vendor@test.com', first_name='Test', last_name='Vendor', role='vendor')
+        self.vendor_user.password = 'password123'
+        db.session.add_all([self.teacher, self.vendor_user])
+        db.session.commit()
+
+        self.vendor = Vendor(
+            business_name='Test Transport',
+            contact_email='vendor@test.com',
+            contact_phone='+254700000000',
+            user_id=self.vendor_user.id
+        )
+        self.trip = Trip(
+            title='Museum Visit',
+            destination='Nairobi',
+            start_date=date.today() + timedelta(days=10),
+            end_date=date.today() + timedelta(days=11),
+            price_per_student=Decimal('1000.00'),
+            organizer_id=self.teacher.id
+        )
+        db.session.add_all([self.vendor, self.trip])
+        db.session.commit()
+
+        self.bookings = [
+            Booking(
+                booking_type='transportation',
+                quoted_amount=Decimal('100.00') * (i + 1),
+                trip_id=self.trip.id,
+                vendor_id=self.vendor.id
+            )
+            for i in range(30)
+        ]
+        db.session.add_all(self.bookings)
+        db.session.commit()
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+
+    def login(self, user):
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(user.id)
+            session['_fresh'] = True
+
+    def test_completion_updates_rollup(self):
+        """Completing a booking adds its amount to the month's rollup once"""
+        for booking in self.bookings[:5]:
+            booking.complete_booking()
+        self.bookings[0].complete_booking()
+
+        rollup = db.session.get(VendorRevenueRollup, (self.vendor.id, date.today().replace(day=1)))
+        self.assertEqual(rollup.completed_bookings, 5)
+        self.assertEqual(rollup.revenue, Decimal('1500.00'))
+        self.assertEqual(revenue_totals(self.vendor.id)['revenue'], Decimal('1500.00'))
+
+    def test_rebuild_matches_incremental_rollups(self):
+        """Rebuilding from bookings gives the same rows as incremental updates"""
+        for booking in self.bookings[:7]:
+            booking.complete_booking()
+        incremental = [row.serialize() for row in VendorRevenueRollup.query.all()]
+
+        VendorRevenueRollup.rebuild()
+        self.assertEqual([row.serialize() for row in VendorRevenueRollup.query.all()], incremental)
+
+    def test_status_counts(self):
+        """Status counts cover every status in one grouped query"""
+        for booking in self.bookings[:10]:
+            booking.confirm_booking()
+        for booking in self.bookings[:4]:
+            booking.complete_booking()
+
+        counts = booking_status_counts(self.vendor.id)
+        self.assertEqual(counts['pending'], 20)
+        self.assertEqual(counts['confirmed'], 6)
+        self.assertEqual(counts['completed'], 4)
+        self.assertEqual(counts['cancelled'], 0)
+
+    def test_booking_data_pagination(self):
+        """The dashboard data endpoint pages through bookings with a cursor"""
+        self.login(self.vendor_user)
+        seen = []
+        cursor = ''
+        while True:
+            response = self.client.get(f'/vendor/{self.vendor.id}/bookings/data?per_page=8&cursor={cursor}')
+            self.assertEqual(response.status_code, 200)
+            data = response.get_json()
+            seen.extend(booking['id'] for booking in data['bookings'])
+            if not data['pagination']['has_next']:
+                break
+            cursor = data['pagination']['next_cursor']
+
+        self.assertEqual(sorted(seen), sorted(booking.id for booking in self.bookings))
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_booking_data_page_size_bounds(self):
+        self.login(self.vendor_user)
+        for per_page, expected in (('0', 1), ('-5', 1), ('500', 30)):
+            with self.subTest(per_page=per_page):
+                response = self.client.get(f'/vendor/{self.vendor.id}/bookings/data?per_page={per_page}')
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(len(response.get_json()['bookings']), expected)
+
+    def test_booking_pages_include_null_dates(self):
+        """Bookings whose status was set without its date still appear on some page"""
+        for booking in self.bookings[:5]:
+            booking.confirm_booking()
+        for booking in self.bookings[5:12]:
+            booking.status = 'confirmed'  # confirmed_date left NULL
+        db.session.commit()
+
+        seen = []
+        cursor = None
+        while True:
+            page = booking_page(self.vendor.id, 'confirmed', cursor=cursor, per_page=3)
+            seen.extend(booking.id for booking in page.items)
+            if not page.has_next:
+                break
+            cursor = page.next_cursor
+
+        self.assertEqual(sorted(seen), sorted(booking.id for booking in self.bookings[:12]))
+        self.assertEqual(len(seen), len(set(seen)))
+        # Recently confirmed bookings come before older unconfirmed ones
+        self.assertEqual(set(seen[:5]), {booking.id for booking in self.bookings[:5]})
+
+    def test_dashboard_query_count_is_constant(self):
+        """The booking dashboard runs the same number of queries for more bookings"""
+        self.login(self.vendor_user)
+
+        def count_queries():
+            db.session.expire_all()
+            with QueryCounter(db.engine) as counter:
+                response = self.client.get(f'/vendor/{self.vendor.id}/bookings')
+            self.assertEqual(response.status_code, 200)
+            return counter.count
+
+        before = count_queries()
+        db.session.add_all([
+            Booking(booking_type='catering', trip_id=self.trip.id, vendor_id=self.vendor.id)
+            for _ in range(50)
+        ])
+        db.session.commit()
+        self.assertEqual(count_queries(), before)
+
+
+if __name__ == '__main__':
+    unittest.main()
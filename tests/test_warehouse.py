@@ -0,0 +1,173 @@
+import unittest
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from flask_testing import TestCase
+
+from app import create_app
+from app.extensions import db
+from app.models.user import User
+from app.models.vendor import Vendor
+from app.models.trip import Trip
+from app.models.participant import Participant
+from app.models.payment import Payment
+from app.models.booking import Booking
+from app.models.warehouse import (
+    EtlWatermark, TripDimension, ParticipantFact, PaymentFact, BookingFact, TripDailyFact
+)
+from app.admin.warehouse import run_etl, dashboard_data
+
+from helpers import QueryCounter
+
+
+class WarehouseTestCase(TestCase):
+    """The warehouse loads incrementally and the admin dashboard reads only from it"""
+
+    def create_app(self):
+        return create_app('testing')
+
+    def setUp(self):
+        db.create_all()
+
+        self.admin = User(email='admin@test.com', first_name='Test', last_name='Admin', role='admin')
+        self.admin.password = 'password123'
+        teacher = User(email='teacher@test.com', first_name='Test', last_name='Teacher', role='teacher')
+        teacher.password = 'password123'
+        vendor_user = User(email='vendor@test.com', first_name='Test', last_name='Vendor', role='vendor')
+        vendor_user.password = 'password123'
+        db.session.add_all([self.admin, teacher, vendor_user])
+        db.session.commit()
+
+        self.vendor = Vendor(
+            business_name='Test Transport',
+            business_type='transportation',
+            contact_email='vendor@test.com',
+            contact_phone='+254700000000',
+            user_id=vendor_user.id,
+            average_rating=4.5
+        )
+        self.trip = Trip(
+            title='Museum Visit',
+            destination='Nairobi',
+            start_date=date.today() + timedelta(days=10),
+            end_date=date.today() + timedelta(days=11),
+            price_per_student=Decimal('1000.00'),
+            max_participants=100,
+            organizer_id=teacher.id,
+            status='active'
+        )
+        db.session.add_all([self.vendor, self.trip])
+        db.session.commit()
+
+        today = datetime.now()
+        self.participants = [
+            Participant(first_name='Amina', last_name='Otieno', trip_id=self.trip.id, status='confirmed',
+                        payment_status='paid', amount_paid=Decimal('1000.00'), registration_date=today),
+            Participant(first_name='Brian', last_name='Kamau', trip_id=self.trip.id,
+                        registration_date=today - timedelta(days=1)),
+        ]
+        db.session.add_all(self.participants)
+        db.session.commit()
+
+        db.session.add_all([
+            Payment(amount=Decimal('1000.00'), payment_method='mpesa', status='completed', payment_date=today,
+                    trip_id=self.trip.id, participant_id=self.participants[0].id, payer_name='Parent Otieno'),
+            Booking(trip_id=self.trip.id, vendor_id=self.vendor.id, booking_type='transportation',
+                    status='pending', quoted_amount=Decimal('500.00')),
+        ])
+        db.session.commit()
+
+        with self.client.session_transaction() as session:
+            session['_user_id'] = str(self.admin.id)
+            session['_fresh'] = True
+
+    def tearDown(self):
+        db.session.remove()
+        db.drop_all()
+
+    def count_queries(self, func):
+        with QueryCounter(db.engine) as counter:
+            result = func()
+        return result, counter.statements
+
+    def test_full_load(self):
+        loaded = run_etl()
+        self.assertEqual(loaded, {
+            'trips': 1, 'vendors': 1, 'participants': 2, 'payments': 1, 'bookings': 1, 'trip_daily': 1
+        })
+
+        self.assertEqual(TripDimension.query.one().destination, 'Nairobi')
+        self.assertEqual(BookingFact.query.one().amount, Decimal('500.00'))
+        self.assertEqual(PaymentFact.query.one().payment_date, date.today())
+
+        days = {row.day: row for row in TripDailyFact.query.all()}
+        self.assertEqual(days[date.today()].registrations, 1)
+        self.assertEqual(days[date.today()].payments, 1)
+        self.assertEqual(days[date.today()].revenue, Decimal('1000.00'))
+        self.assertEqual(days[date.today() - timedelta(days=1)].registrations, 1)
+
+    def test_incremental_load(self):
+        """Only rows past the watermark (less the overlap) are read again"""
+        run_etl()
+        self.app.config['WAREHOUSE_ETL_OVERLAP'] = 0
+        for watermark in EtlWatermark.query.all():
+            watermark.high_water += timedelta(seconds=1)
+        db.session.commit()
+
+        self.assertEqual(run_etl(), {
+            'trips': 0, 'vendors': 0, 'participants': 0, 'payments': 0, 'bookings': 0, 'trip_daily': 0
+        })
+
+        participant = db.session.get(Participant, self.participants[1].id)
+        participant.status = 'confirmed'
+        participant.updated_at = datetime.now() + timedelta(seconds=5)
+        db.session.commit()
+
+        loaded = run_etl()
+        self.assertEqual(loaded['participants'], 1)
+        self.assertEqual(loaded['trip_daily'], 1)
+        self.assertEqual(loaded['trips'], 0)
+        self.assertEqual(db.session.get(ParticipantFact, participant.id).status, 'confirmed')
+
+    def test_full_reload_drops_deleted_rows(self):
+        run_etl()
+        Booking.query.delete()
+        db.session.commit()
+
+        run_etl()
+        self.assertEqual(BookingFact.query.count(), 1)
+        self.assertEqual(run_etl(full=True)['bookings'], 0)
+        self.assertEqual(BookingFact.query.count(), 0)
+
+    def test_dashboard_data(self):
+        run_etl()
+        data = dashboard_data()
+
+        self.assertEqual(data['active_trips'], 1)
+        self.assertEqual(data['pending_bookings'], 1)
+        self.assertEqual(data['revenue_30d'], 1000.0)
+        self.assertIsNone(data['revenue_change'])
+        self.assertEqual(data['active_participants'], 2)
+        self.assertEqual(data['outstanding_balance'], 1000.0)
+        self.assertEqual(data['trips'][0][1:], (1, 1000.0))
+        self.assertEqual(data['vendors'][0][1], 1)
+        self.assertEqual(data['monthly'][-1]['revenue'], 1000.0)
+        self.assertEqual(len(data['revenue_trend']), 6)
+
+    def test_dashboard_reads_warehouse_only(self):
+        run_etl()
+        live_tables = ('trips', 'vendors', 'participants', 'payments', 'bookings', 'locations')
+
+        response, statements = self.count_queries(lambda: self.client.get('/admin/dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'Nairobi', response.data)
+        self.assertIn(b'Parent Otieno', response.data)
+
+        for statement in statements:
+            if 'users' in statement:
+                continue  # Flask-Login loading the admin
+            for table in live_tables:
+                self.assertNotRegex(statement, rf'\b(FROM|JOIN) {table}\b')
+
+
+if __name__ == '__main__':
+    unittest.main()